@@ -140,6 +140,20 @@ def tables_for_meta(meta):
 		sqlite_with_rowid=False,
 	)
 
+	# Table for whether rules are batch rules, taking all their
+	# entities at once, rather than one at a time
+	Table(
+		"rule_batch",
+		meta,
+		Column("rule", TEXT, primary_key=True),
+		Column("branch", TEXT, primary_key=True, default="trunk"),
+		Column("turn", INT, primary_key=True, default=0),
+		Column("tick", INT, primary_key=True, default=0),
+		Column("batch", BLOB, default=b"\xc2"),
+		ForeignKeyConstraint(("rule",), ["rules.rule"]),
+		sqlite_with_rowid=False,
+	)
+
 	# Table for rules' prereqs, functions with veto power over a rule
 	# being followed
 	Table(
@@ -609,6 +623,20 @@ def queries(table):
 	r["load_rule_neighborhoods_tick_to_tick"] = hoodsel.where(
 		generic_tick_to_tick_clause(hood)
 	)
+	batch = table["rule_batch"]
+	batchsel = select(
+		batch.c.rule,
+		batch.c.branch,
+		batch.c.turn,
+		batch.c.tick,
+		batch.c.batch,
+	)
+	r["load_rule_batch_tick_to_end"] = batchsel.where(
+		generic_tick_to_end_clause(batch)
+	)
+	r["load_rule_batch_tick_to_tick"] = batchsel.where(
+		generic_tick_to_tick_clause(batch)
+	)
 	trigsel = select(
 		trig.c.rule, trig.c.branch, trig.c.turn, trig.c.tick, trig.c.triggers
 	)
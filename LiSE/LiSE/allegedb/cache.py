@@ -24,8 +24,15 @@ from .window import (
 	SettingsTurnDict,
 	EntikeySettingsTurnDict,
 )
+from bisect import bisect_left, insort
 from collections import OrderedDict, defaultdict, deque
+from contextlib import nullcontext
 from threading import RLock
+from types import MappingProxyType
+
+
+EMPTY = MappingProxyType({})
+"""Stand-in for dictionaries that aren't there, so reads needn't make one"""
 
 
 class NotInKeyframeError(KeyError):
@@ -176,6 +183,132 @@ class StructuredDefaultDict(dict):
 		raise TypeError("Can't set layer {}".format(self.layer))
 
 
+class HintDict(OrderedDict):
+	"""Results of retrievals, kept in case they're asked for again
+
+	Keys are the arguments to :meth:`Cache._base_retrieve`: the entity,
+	the key, then the branch, turn, and tick.
+
+	Holds no more than ``maxsize`` hints, forgetting the least recently
+	used when full. Counts its ``hits``, ``misses``, and ``evictions``.
+
+	Hints get looked up, stored, and forgotten under ``lock``, which
+	should be the one the cache holds while storing, since triggers
+	may be looking things up in other threads meanwhile.
+
+	"""
+
+	def __init__(self, maxsize: int = 100000, lock=None):
+		super().__init__()
+		self.maxsize = maxsize
+		self.hits = self.misses = self.evictions = 0
+		self._lock = RLock() if lock is None else lock
+		self._entikeys = {}
+		"""Times of hints, by entity and key, then branch
+
+		Each branch's ``(turn, tick)`` pairs are kept sorted, so that
+		:meth:`invalidate` can skip the ones before the time it's given.
+
+		"""
+
+	def __getitem__(self, k):
+		with self._lock:
+			ret = super().__getitem__(k)
+			self.hits += 1
+			self.move_to_end(k)
+		return ret
+
+	def get(self, k, default=None):
+		"""Return the hint for ``k``, counting a miss if there isn't one"""
+		with self._lock:
+			ret = OrderedDict.get(self, k, default)
+			if ret is default:
+				self.misses += 1
+			else:
+				self.hits += 1
+				self.move_to_end(k)
+			return ret
+
+	def __setitem__(self, k, v):
+		with self._lock:
+			if k in self:
+				self.move_to_end(k)
+			else:
+				entikey = k[:-3]
+				branch = k[-3]
+				if entikey in self._entikeys:
+					branches = self._entikeys[entikey]
+					if branch in branches:
+						insort(branches[branch], k[-2:])
+					else:
+						branches[branch] = [k[-2:]]
+				else:
+					self._entikeys[entikey] = {branch: [k[-2:]]}
+			super().__setitem__(k, v)
+			while len(self) > self.maxsize:
+				del self[next(iter(self))]
+				self.evictions += 1
+
+	def __delitem__(self, k):
+		with self._lock:
+			super().__delitem__(k)
+			entikey = k[:-3]
+			branch = k[-3]
+			branches = self._entikeys[entikey]
+			times = branches[branch]
+			del times[bisect_left(times, k[-2:])]
+			if not times:
+				del branches[branch]
+				if not branches:
+					del self._entikeys[entikey]
+
+	def clear(self):
+		with self._lock:
+			super().clear()
+			self._entikeys.clear()
+
+	def invalidate(
+		self,
+		entikey: tuple,
+		branch: str,
+		turn: int,
+		tick: int,
+		branches: dict,
+	) -> None:
+		"""Forget the hints that a value set at this time would shadow
+
+		That's the hints for the same entity and key, at or after the
+		given time, in the given branch or any branch that descends
+		from it after that time. ``branches`` maps each branch to its
+		parent and the time it started, like the ORM's ``_branches``.
+
+		"""
+		with self._lock:
+			if entikey not in self._entikeys:
+				return
+			hinted = self._entikeys[entikey]
+			doomed = []
+			for branc, times in hinted.items():
+				if branc == branch:
+					i = bisect_left(times, (turn, tick))
+					doomed.extend(entikey + (branc,) + tt for tt in times[i:])
+					continue
+				# Climb to the branch that was set, if it's an ancestor,
+				# and find the last time this branch could see it
+				parent = branc
+				while parent != branch:
+					if parent not in branches:
+						break
+					parent, trn, tck = branches[parent][:3]
+					if parent is None:
+						break
+				else:
+					if (trn, tck) >= (turn, tick):
+						doomed.extend(entikey + (branc,) + tt for tt in times)
+			for hint in doomed:
+				del self[hint]
+
+
 class KeyframeError(KeyError):
 	pass
 
@@ -183,52 +316,75 @@ class KeyframeError(KeyError):
 class Cache:
 	"""A data store that's useful for tracking graph revisions."""
 
-	def __init__(self, db, kfkvs=None):
+	def __init__(self, db):
 		super().__init__()
 		self.db = db
-		self.parents = StructuredDefaultDict(3, SettingsTurnDict)
-		"""Entity data keyed by the entities' parents.
+		self.branches = {}
+		"""Entity data keyed by the whole tuple identifying the entity and key
 
-		An entity's parent is what it's contained in. When speaking of a node,
-		this is its graph. When speaking of an edge, the parent is usually the
-		graph and the origin in a pair, though for multigraphs the destination
-		might be part of the parent as well.
+		Values are dictionaries of :class:`SettingsTurnDict`, keyed by
+		branch. They only get made by :meth:`store`, so looking up
+		something that isn't there won't make anything.
 
-		Deeper layers of this cache are keyed by branch and revision.
+		"""
+		self.keys = {}
+		"""Index of ``branches`` by entity, then key within the entity
+
+		For when you need to iterate over the keys an entity has had.
+		The dictionaries of branches are the same ones in ``branches``.
 
 		"""
-		self.keys = StructuredDefaultDict(2, SettingsTurnDict)
-		"""Cache of entity data keyed by the entities themselves.
+		self.parents = {}
+		"""Index of ``keys`` by the entities' parents, then the entities.
 
-		That means the whole tuple identifying the entity is the
-		top-level key in this cache here. The second-to-top level
-		is the key within the entity.
+		An entity's parent is what it's contained in. When speaking of a node,
+		this is its graph. When speaking of an edge, the parent is usually the
+		graph and the origin in a pair, though for multigraphs the destination
+		might be part of the parent as well.
 
-		Deeper layers of this cache are keyed by branch, turn, and tick.
+		``parents[parent][entity]`` is the same dictionary as
+		``keys[parent + (entity,)]``. Entities without parents aren't in here.
 
 		"""
 		self.keycache = PickyDefaultDict(SettingsTurnDict)
 		"""Keys an entity has at a given turn and tick."""
-		self.branches = StructuredDefaultDict(1, SettingsTurnDict)
-		"""A less structured alternative to ``keys``.
+		self.keyframe = {}
+		"""Key-value dictionaries representing my state at a given time
 
-		For when you already know the entity and the key within it,
-		but still need to iterate through history to find the value.
+		Keyed by entity, then branch; the values are
+		:class:`SettingsTurnDict`.
 
 		"""
-		self.keyframe = StructuredDefaultDict(
-			1, SettingsTurnDict, **(kfkvs or {})
-		)
-		"""Key-value dictionaries representing my state at a given time"""
-		self.shallowest = OrderedDict()
-		"""A dictionary for plain, unstructured hinting."""
 		self.settings = PickyDefaultDict(EntikeySettingsTurnDict)
 		"""All the ``entity[key] = value`` settings on some turn"""
 		self.presettings = PickyDefaultDict(EntikeySettingsTurnDict)
 		"""The values prior to ``entity[key] = value`` settings on some turn"""
+		self.reads = None
+		"""If not ``None``, a set that I'll add every key retrieved to
+
+		Keys are tuples beginning with me, followed by the entity and,
+		if it was a single key that got retrieved rather than a whole
+		entity, the key.
+
+		"""
 		self.time_entity = {}
 		self._kc_lru = OrderedDict()
 		self._lock = RLock()
+		self._window_lock = (
+			None if getattr(db, "_threaded", True) else nullcontext()
+		)
+		"""Lock for the :class:`WindowDict` objects in my histories
+
+		``None`` gives each history an :class:`RLock` of its own, shared
+		by its turns. If the ORM won't be used from more than one thread,
+		there's no lock at all.
+
+		"""
+		self.shallowest = HintDict(
+			getattr(db, "_hint_cache_size", 100000),
+			self._lock if self._window_lock is None else self._window_lock,
+		)
+		"""Recent retrievals, for plain, unstructured hinting."""
 		self._store_stuff = (
 			self._lock,
 			self.parents,
@@ -311,7 +467,10 @@ class Cache:
 			raise TypeError("Ticks must be integers")
 		if tick < 0:
 			raise ValueError("Ticks can't be negative")
-		kfg = self.keyframe[graph_ent]
+		if graph_ent in self.keyframe:
+			kfg = self.keyframe[graph_ent]
+		else:
+			kfg = self.keyframe[graph_ent] = {}
 		if branch in kfg:
 			kfgb = kfg[branch]
 			if turn in kfgb:
@@ -319,7 +478,7 @@ class Cache:
 			else:
 				kfgb[turn] = {tick: keyframe}
 		else:
-			d = SettingsTurnDict()
+			d = SettingsTurnDict(None, self._window_lock)
 			d[turn] = {tick: keyframe}
 			kfg[branch] = d
 
@@ -359,7 +518,7 @@ class Cache:
 
 	def _valcache_lookup(self, cache: dict, branch: str, turn: int, tick: int):
 		"""Return the value at the given time in ``cache``"""
-		for b, r, t in self.db._iter_parent_btt(branch, turn, tick):
+		for b, r, t in self.db._parent_btts(branch, turn, tick):
 			if b in cache:
 				if r in cache[b] and cache[b][r].rev_gettable(t):
 					try:
@@ -433,7 +592,7 @@ class Cache:
 							ret = frozenset()
 						# assert ret == get_adds_dels(
 						# keys[parentity], branch, turn, tick)[0]  # slow
-						new_turn_kc = WindowDict()
+						new_turn_kc = WindowDict(None, keycache2._lock)
 						new_turn_kc[tick] = ret
 						keycache2[turn] = new_turn_kc
 						return ret
@@ -527,7 +686,7 @@ class Cache:
 				else:
 					keycache2[turn] = {tick: ret}
 			else:
-				kcc = SettingsTurnDict()
+				kcc = SettingsTurnDict(None, self._window_lock)
 				kcc[turn] = {tick: ret}
 				keycache[keycache_key] = kcc
 			return ret
@@ -603,7 +762,7 @@ class Cache:
 		added = set()
 		deleted = set()
 		kf = self.keyframe.get(entity, None)
-		for key, branches in cache.get(entity, {}).items():
+		for key, branches in cache.get(entity, EMPTY).items():
 			for branc, trn, tck in self.db._iter_parent_btt(
 				branch, turn, tick, stoptime=stoptime
 			):
@@ -710,28 +869,26 @@ class Cache:
 		if loading:
 			self.db._updload(branch, turn, tick)
 		parent = args[:-6]
-		entikey = (entity, key)
 		parentikey = parent + (entity, key)
 		contras = []
 		with lock:
-			if parent:
-				parentity = self_parents[parent][entity]
-				if key in parentity:
-					branches = parentity[key]
-					turns = branches[branch]
-				else:
-					branches = self_branches[parentikey] = self_keys[
-						parent + (entity,)
-					][key] = parentity[key]
-					turns = branches[branch]
+			if parentikey in self_branches:
+				branches = self_branches[parentikey]
 			else:
-				if entikey in self_branches:
-					branches = self_branches[entikey]
-					turns = branches[branch]
+				branches = self_branches[parentikey] = {}
+				keykey = parent + (entity,)
+				if keykey in self_keys:
+					self_keys[keykey][key] = branches
 				else:
-					branches = self_branches[entikey]
-					self_keys[entity,][key] = branches
-					turns = branches[branch]
+					entity_keys = self_keys[keykey] = {key: branches}
+					if parent and parent in self_parents:
+						self_parents[parent][entity] = entity_keys
+					elif parent:
+						self_parents[parent] = {entity: entity_keys}
+			if branch in branches:
+				turns = branches[branch]
+			else:
+				turns = SettingsTurnDict(None, self._window_lock)
 			if planning:
 				if turn in turns and tick < turns[turn].end:
 					raise HistoricKeyError(
@@ -746,7 +903,7 @@ class Cache:
 					)
 				)
 				if contras:
-					self.shallowest = {}
+					self.shallowest.clear()
 				for contra_turn, contra_tick in contras:
 					if (
 						branch,
@@ -772,13 +929,16 @@ class Cache:
 				if tick > db_turn_end[branch, turn]:
 					db_turn_end[branch, turn] = tick
 			self_store_journal(*args)
+			self.shallowest.invalidate(
+				parentikey, branch, turn, tick, db_branches
+			)
 			self.shallowest[parent + (entity, key, branch, turn, tick)] = value
 			if turn in turns:
 				the_turn = turns[turn]
 				the_turn.truncate(tick)
 				the_turn[tick] = value
 			else:
-				new = FuturistWindowDict()
+				new = FuturistWindowDict(None, turns._lock)
 				new[tick] = value
 				turns[turn] = new
 			self_time_entity[branch, turn, tick] = parent, entity, key
@@ -821,8 +981,8 @@ class Cache:
 			if (parent and parent[0] == character)
 			or (not parent and entity == character)
 		}
-		todel_shallow = {k for k in self.shallowest if k[0] == character}
 		with lock:
+			todel_shallow = {k for k in self.shallowest if k[0] == character}
 			for k in todel_shallow:
 				del self.shallowest[k]
 			for branch, turn, tick, parent, entity, key in todel:
@@ -850,8 +1010,8 @@ class Cache:
 			) in time_entity.items()
 			if branc == branch
 		}
-		todel_shallow = {k for k in self.shallowest if k[-2] == branch}
 		with lock:
+			todel_shallow = {k for k in self.shallowest if k[-3] == branch}
 			for k in todel_shallow:
 				del self.shallowest[k]
 			for branc, turn, tick, parent, entity, key in todel:
@@ -870,6 +1030,28 @@ class Cache:
 						(*parent, entity, key, branc, turn, tick)
 					]
 
+	def _remove_entikey(self, parent: tuple, entity: Hashable, key: Hashable):
+		"""Forget that this key in this entity ever had any history"""
+		branches = self.branches
+		keys = self.keys
+		parents = self.parents
+		branchkey = parent + (entity, key)
+		keykey = parent + (entity,)
+		if branchkey in branches:
+			del branches[branchkey]
+		if keykey in keys:
+			entty = keys[keykey]
+			if key in entty:
+				del entty[key]
+			if not entty:
+				del keys[keykey]
+				if parent in parents:
+					parentt = parents[parent]
+					if entity in parentt:
+						del parentt[entity]
+					if not parentt:
+						del parents[parent]
+
 	def _remove_btt_parentikey(self, branch, turn, tick, parent, entity, key):
 		(
 			_,
@@ -887,37 +1069,12 @@ class Cache:
 		except KeyError:
 			pass
 		branchkey = parent + (entity, key)
-		keykey = parent + (entity,)
-		if parent in parents:
-			parentt = parents[parent]
-			if entity in parentt:
-				entty = parentt[entity]
-				if key in entty:
-					kee = entty[key]
-					if branch in kee:
-						del kee[branch]
-					if not kee:
-						del entty[key]
-				if not entty:
-					del parentt[entity]
-			if not parentt:
-				del parents[parent]
 		if branchkey in branches:
 			entty = branches[branchkey]
 			if branch in entty:
 				del entty[branch]
 			if not entty:
-				del branches[branchkey]
-		if keykey in keys:
-			entty = keys[keykey]
-			if key in entty:
-				kee = entty[key]
-				if branch in kee:
-					del kee[branch]
-				if not kee:
-					del entty[key]
-			if not entty:
-				del keys[keykey]
+				self._remove_entikey(parent, entity, key)
 
 	def remove(self, branch: str, turn: int, tick: int):
 		"""Delete all data from a specific tick"""
@@ -934,29 +1091,7 @@ class Cache:
 		) = self._remove_stuff
 		parent, entity, key = time_entity[branch, turn, tick]
 		branchkey = parent + (entity, key)
-		keykey = parent + (entity,)
 		with lock:
-			if parent in parents:
-				parentt = parents[parent]
-				if entity in parentt:
-					entty = parentt[entity]
-					if key in entty:
-						kee = entty[key]
-						if branch in kee:
-							branhc = kee[branch]
-							if turn in branhc:
-								trn = branhc[turn]
-								del trn[tick]
-								if not trn:
-									del branhc[turn]
-								if not branhc:
-									del kee[branch]
-						if not kee:
-							del entty[key]
-					if not entty:
-						del parentt[entity]
-				if not parentt:
-					del parents[parent]
 			if branchkey in branches:
 				entty = branches[branchkey]
 				if branch in entty:
@@ -970,25 +1105,7 @@ class Cache:
 					if not branhc:
 						del entty[branch]
 				if not entty:
-					del branches[branchkey]
-			if keykey in keys:
-				entty = keys[keykey]
-				if key in entty:
-					kee = entty[key]
-					if branch in kee:
-						branhc = kee[branch]
-						if turn in branhc:
-							trn = entty[turn]
-							if tick in trn:
-								del trn[tick]
-							if not trn:
-								del branhc[turn]
-						if not branhc:
-							del kee[branch]
-					if not kee:
-						del entty[key]
-				if not entty:
-					del keys[keykey]
+					self._remove_entikey(parent, entity, key)
 			branhc = settings[branch]
 			pbranhc = presettings[branch]
 			trn = branhc[turn]
@@ -1003,7 +1120,7 @@ class Cache:
 			if not pbranhc:
 				del settings[branch]
 				del presettings[branch]
-			self.shallowest = OrderedDict()
+			self.shallowest.clear()
 			remove_keycache(parent + (entity, branch), turn, tick)
 
 	def _remove_keycache(self, entity_branch: tuple, turn: int, tick: int):
@@ -1040,24 +1157,14 @@ class Cache:
 				branhc.truncate(turn, direction)
 
 		with lock:
-			for entities in parents.values():
-				for keys in entities.values():
-					for branches in keys.values():
-						if branch not in branches:
-							continue
-						truncate_branhc(branches[branch])
-			for branches in branches.values():
-				if branch not in branches:
-					continue
-				truncate_branhc(branches[branch])
-			for keys in keys.values():
-				for branches in keys.values():
-					if branch not in branches:
-						continue
-					truncate_branhc(branches[branch])
+			# ``parents`` and ``keys`` index the same histories as
+			# ``branches``, so there's no need to look through them
+			for entty in branches.values():
+				if branch in entty:
+					truncate_branhc(entty[branch])
 			truncate_branhc(settings[branch])
 			truncate_branhc(presettings[branch])
-			self.shallowest = OrderedDict()
+			self.shallowest.clear()
 			for entity_branch in keycache:
 				if entity_branch[-1] == branch:
 					truncate_branhc(keycache[entity_branch])
@@ -1137,21 +1244,27 @@ class Cache:
 		use outside try-blocks, which have some performance overhead.
 
 		"""
+		reads = self.reads
+		if reads is not None:
+			reads.add((self, *args[:-3]))
 		shallowest = self.shallowest
-		if retrieve_hint and args in shallowest:
-			return shallowest[args]
+		if retrieve_hint:
+			# the hints can't contain themselves, so that means a miss
+			hint = shallowest.get(args, shallowest)
+			if hint is not shallowest:
+				return hint
 		entity: tuple = args[:-4]
 		key: Hashable
 		branch: str
 		turn: int
 		tick: int
 		key, branch, turn, tick = args[-4:]
-		keyframes = self.keyframe.get(entity, {})
+		keyframes = self.keyframe.get(entity, EMPTY)
 		branches = self.branches
 		entikey = entity + (key,)
 		if entikey in branches:
 			branchentk = branches[entikey]
-			for b, r, t in self.db._iter_parent_btt(branch, turn, tick):
+			for b, r, t in self.db._parent_btts(branch, turn, tick):
 				brancs = branchentk.get(b)
 				if brancs is not None and brancs.rev_gettable(r):
 					if r in brancs and brancs[r].rev_gettable(t):
@@ -1297,7 +1410,7 @@ class Cache:
 							)
 		else:
 			kfd = self.db._keyframes_dict
-			for b, r, t in self.db._iter_parent_btt(branch, turn, tick):
+			for b, r, t in self.db._parent_btts(branch, turn, tick):
 				if b in kfd:
 					if b not in keyframes:
 						return NotInKeyframeError("No value", entikey, b, r, t)
@@ -1380,6 +1493,9 @@ class Cache:
 		turn: int
 		tick: int
 		branch, turn, tick = args[-3:]
+		reads = self.reads
+		if reads is not None:
+			reads.add((self, *entity))
 		if self.db._no_kc:
 			yield from self._get_adds_dels(entity, branch, turn, tick)[0]
 			return
@@ -1402,6 +1518,9 @@ class Cache:
 		turn: int
 		tick: int
 		branch, turn, tick = args[-3:]
+		reads = self.reads
+		if reads is not None:
+			reads.add((self, *entity))
 		if self.db._no_kc:
 			return len(self._get_adds_dels(entity, branch, turn, tick)[0])
 		return len(
@@ -1511,15 +1630,7 @@ class EdgesCache(Cache):
 		return self.parents
 
 	def __init__(self, db):
-		def gettest(k):
-			assert len(k) == 3, "Bad key: " + repr(k)
-
-		def settest(k, v):
-			assert len(k) == 3, "Bad key: {}, to be set to {}".format(k, v)
-
-		Cache.__init__(
-			self, db, kfkvs={"gettest": gettest, "settest": settest}
-		)
+		Cache.__init__(self, db)
 		self.destcache = PickyDefaultDict(SettingsTurnDict)
 		self.origcache = PickyDefaultDict(SettingsTurnDict)
 		self.predecessors = StructuredDefaultDict(3, TurnDict)
@@ -1529,7 +1640,7 @@ class EdgesCache(Cache):
 			PickyDefaultDict,
 			OrderedDict,
 			callable,
-			StructuredDefaultDict,
+			dict,
 			callable,
 		] = (
 			self.destcache,
@@ -1557,6 +1668,14 @@ class EdgesCache(Cache):
 			self.successors,
 		)
 
+	def set_keyframe(
+		self, graph_ent: tuple, branch: str, turn: int, tick: int, keyframe
+	):
+		assert len(graph_ent) == 3, "Bad key: {}, to be set to {}".format(
+			graph_ent, keyframe
+		)
+		super().set_keyframe(graph_ent, branch, turn, tick, keyframe)
+
 	def _get_keyframe(
 		self, graph_ent: tuple, branch: str, turn: int, tick: int, copy=True
 	):
@@ -1606,11 +1725,13 @@ class EdgesCache(Cache):
 		# slow and bad.
 		retrieve = self._base_retrieve
 		for items in (
-			self.successors[graph, node].items(),
+			self.successors.get((graph, node), EMPTY).items(),
 			self.predecessors[graph, node].items(),
 		):
 			for dest, idxs in items:  # dest might really be orig
 				for idx, branches in idxs.items():
+					if branch not in branches:
+						continue
 					brnch = branches[branch]
 					if turn in brnch:
 						ticks = brnch[turn]
@@ -1637,6 +1758,9 @@ class EdgesCache(Cache):
 		cache: dict = None,
 	):
 		graph, orig = parentity
+		reads = self.reads
+		if reads is not None:
+			reads.add((self, graph, orig))
 		added = set()
 		deleted = set()
 		cache = cache or self.successors
@@ -1687,6 +1811,9 @@ class EdgesCache(Cache):
 		cache: dict = None,
 	):
 		graph, dest = parentity
+		reads = self.reads
+		if reads is not None:
+			reads.add((self, graph))
 		added = set()
 		deleted = set()
 		cache = cache or self.predecessors
@@ -1733,6 +1860,9 @@ class EdgesCache(Cache):
 		forward: bool,
 	):
 		"""Return a set of destination nodes succeeding ``orig``"""
+		reads = self.reads
+		if reads is not None:
+			reads.add((self, graph, orig))
 		(
 			destcache,
 			destcache_lru,
@@ -1762,6 +1892,11 @@ class EdgesCache(Cache):
 		forward: bool,
 	):
 		"""Return a set of origin nodes leading to ``dest``"""
+		reads = self.reads
+		if reads is not None:
+			# My settings are keyed by origin first, so I can't tell
+			# which of them lead to ``dest`` without looking
+			reads.add((self, graph))
 		(
 			origcache,
 			origcache_lru,
@@ -363,6 +363,65 @@ class TimeSignalDescriptor:
 		)
 
 
+class BranchesDict(dict):
+	"""Parent, start time, and end time of each branch
+
+	Values are tuples of ``(parent, turn_start, tick_start, turn_end,
+	tick_end)``.
+
+	Also keeps track of each branch's ancestry, so that looking up
+	where it came from doesn't mean walking through every parent.
+
+	"""
+
+	__slots__ = ("_ancestry",)
+
+	def __init__(self, *args, **kwargs):
+		super().__init__(*args, **kwargs)
+		self._ancestry = {}
+
+	def __setitem__(self, branch: str, v: tuple) -> None:
+		# Branches' ends change all the time, but their starts don't, so
+		# only the latter need me to work out the ancestry again
+		if branch not in self or dict.__getitem__(self, branch)[:3] != v[:3]:
+			self._ancestry.clear()
+		super().__setitem__(branch, v)
+
+	def __delitem__(self, branch: str) -> None:
+		super().__delitem__(branch)
+		self._ancestry.clear()
+
+	def pop(self, branch: str, *args):
+		self._ancestry.clear()
+		return super().pop(branch, *args)
+
+	def clear(self) -> None:
+		super().clear()
+		self._ancestry.clear()
+
+	def update(self, *args, **kwargs) -> None:
+		super().update(*args, **kwargs)
+		self._ancestry.clear()
+
+	def ancestry(self, branch: str) -> Tuple[Tuple[str, int, int], ...]:
+		"""Return the ``(branch, turn, tick)`` where each ancestor forked
+
+		Starts with ``branch``'s parent and ends with the main branch.
+
+		"""
+		if branch in self._ancestry:
+			return self._ancestry[branch]
+		ancestry = []
+		parent = branch
+		while parent in self:
+			parent, turn, tick, _, _ = dict.__getitem__(self, parent)
+			if parent is None:
+				break
+			ancestry.append((parent, turn, tick))
+		ret = self._ancestry[branch] = tuple(ancestry)
+		return ret
+
+
 class ORM:
 	"""Instantiate this with the same string argument you'd use for a
 	SQLAlchemy ``create_engine`` call. This will be your interface to
@@ -904,9 +963,7 @@ class ORM:
 		] = (edge_objs, self._edge_exists, self._make_edge)
 		self._childbranch: Dict[str, Set[str]] = defaultdict(set)
 		"""Immediate children of a branch"""
-		self._branches: Dict[
-			str, Tuple[Optional[str], int, int, int, int]
-		] = {}
+		self._branches = BranchesDict()
 		"""Parent, start time, and end time of each branch. Includes plans."""
 		self._branch_parents: Dict[str, Set[str]] = defaultdict(set)
 		"""Parents of a branch at any remove"""
@@ -1002,6 +1059,8 @@ class ORM:
 		connect_args: dict = None,
 		main_branch=None,
 		enforce_end_of_time=False,
+		hint_cache_size=100000,
+		threaded=True,
 	):
 		"""Make a SQLAlchemy engine and begin a transaction
 
@@ -1010,8 +1069,16 @@ class ORM:
 		:arg connect_args: Dictionary of
 		keyword arguments to be used for the database connection.
 
+		:arg hint_cache_size: How many recent retrievals each cache
+		remembers, in case they're asked for again.
+
+		:arg threaded: Whether more than one thread might use the caches
+		at once. If not, their histories go without locks.
+
 		"""
 		self.world_lock = RLock()
+		self._hint_cache_size = hint_cache_size
+		self._threaded = threaded
 		connect_args = connect_args or {}
 		self._planning = False
 		self._forward = False
@@ -2163,6 +2230,8 @@ class ORM:
 				cache.truncate(past_branch, early_turn, early_tick, "backward")
 				cache.truncate(past_branch, late_turn, late_tick, "forward")
 				for graph, branches in cache.keyframe.items():
+					if past_branch not in branches:
+						continue
 					turns = branches[past_branch]
 					turns.truncate(late_turn, "forward")
 					try:
@@ -2229,9 +2298,10 @@ class ORM:
 					child
 				)
 			)
-		if self._branches[child][0] == parent:
-			return True
-		return self.is_ancestor_of(parent, self._branches[child][0])
+		for branch, _, _ in self._branches.ancestry(child):
+			if branch == parent:
+				return True
+		return False
 
 	def branches(self) -> set:
 		return set(self._branches)
@@ -2832,28 +2902,33 @@ class ORM:
 		trn = self.turn if turn is None else turn
 		tck = self.tick if tick is None else tick
 		yield branch, trn, tck
-		_branches = self._branches
+		ancestry = self._branches.ancestry(branch)
 		if stoptime:
 			stopbranch, stopturn, stoptick = stoptime
-			stopping = stopbranch == branch
-			while branch in _branches and not stopping:
-				(branch, trn, tck, _, _) = _branches[branch]
-				if branch is None:
-					return
+			if stopbranch == branch:
+				return
+			for branch, trn, tck in ancestry:
 				if branch == stopbranch:
-					stopping = True
-					if trn < stopturn or (
+					if trn > stopturn or (
 						trn == stopturn
-						and (stoptick is None or tck <= stoptick)
+						and stoptick is not None
+						and tck > stoptick
 					):
-						return
-				yield branch, trn, tck
-		else:
-			while branch in _branches:
-				(branch, trn, tck, _, _) = _branches[branch]
-				if branch is None:
+						yield branch, trn, tck
 					return
 				yield branch, trn, tck
+		else:
+			yield from ancestry
+
+	def _parent_btts(
+		self, branch: str, turn: int, tick: int
+	) -> Tuple[Tuple[str, int, int], ...]:
+		"""Private use. Like ``_iter_parent_btt``, but returns a tuple
+
+		Doesn't take defaults or a ``stoptime``. Quicker for that.
+
+		"""
+		return ((branch, turn, tick),) + self._branches.ancestry(branch)
 
 	def _branch_descendants(self, branch=None) -> Iterator[str]:
 		"""Iterate over all branches immediately descended from the current
@@ -1,7 +1,10 @@
 # This file is part of allegedb, an object-relational mapper for versioned graphs.
 # Copyright (c) Zachary Spector. public@zacharyspector.com
 import unittest
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import nullcontext
 from copy import deepcopy
+from time import perf_counter
 from .. import ORM
 
 testkvs = [
@@ -427,5 +430,154 @@ class SetStorageTest(AllegedTest):
 				self.assertEqual(entity[0], set(range(10)))
 
 
+class HintCacheTest(unittest.TestCase):
+	def setUp(self):
+		self.engine = ORM("sqlite:///:memory:")
+
+	def tearDown(self):
+		self.engine.close()
+
+	def test_bounded(self):
+		cache = self.engine._graph_val_cache
+		cache.shallowest.maxsize = 4
+		cache.store("g", "k", "trunk", 0, 0, "v")
+		for turn in range(10):
+			self.assertEqual(cache.retrieve("g", "k", "trunk", turn, 0), "v")
+		self.assertLessEqual(len(cache.shallowest), 4)
+		self.assertGreater(cache.shallowest.evictions, 0)
+		self.assertGreater(cache.shallowest.misses, 0)
+		hits = cache.shallowest.hits
+		cache.retrieve("g", "k", "trunk", 9, 0)
+		self.assertEqual(cache.shallowest.hits, hits + 1)
+
+	def test_shadowed(self):
+		cache = self.engine._graph_val_cache
+		self.engine._branches["b"] = ("trunk", 5, 0, 5, 0)
+		cache.store("g", "k", "trunk", 0, 0, "old")
+		cache.store("g", "other", "trunk", 0, 0, "other")
+		self.assertEqual(cache.retrieve("g", "k", "trunk", 2, 0), "old")
+		self.assertEqual(cache.retrieve("g", "k", "trunk", 4, 0), "old")
+		self.assertEqual(cache.retrieve("g", "k", "b", 7, 0), "old")
+		self.assertEqual(cache.retrieve("g", "other", "b", 7, 0), "other")
+		cache.store("g", "k", "trunk", 3, 0, "new")
+		hinted = {hint[-3:] for hint in cache.shallowest if hint[1] == "k"}
+		self.assertIn(("trunk", 2, 0), hinted)
+		self.assertNotIn(("trunk", 4, 0), hinted)
+		self.assertNotIn(("b", 7, 0), hinted)
+		self.assertIn(("g", "other", "b", 7, 0), cache.shallowest)
+		self.assertEqual(cache.retrieve("g", "k", "trunk", 2, 0), "old")
+		self.assertEqual(cache.retrieve("g", "k", "trunk", 4, 0), "new")
+		self.assertEqual(cache.retrieve("g", "k", "b", 7, 0), "new")
+
+	def test_long_run(self):
+		"""Storing shouldn't get slower as hints pile up for the same key"""
+		g = self.engine.new_digraph("g")
+		g.add_node("n")
+		n = g.node["n"]
+		n["x"] = 0
+		lap_times = []
+		for lap in range(8):
+			start = perf_counter()
+			for _ in range(500):
+				self.engine.turn += 1
+				for _ in range(4):
+					v = n["x"]
+				n["x"] = v + 1
+			lap_times.append(perf_counter() - start)
+		self.assertGreater(len(self.engine._node_val_cache.shallowest), 4000)
+		self.assertLess(lap_times[-1], 4 * min(lap_times[:2]))
+
+	def test_threads(self):
+		"""Hints stay consistent when retrieved from many threads at once"""
+		cache = self.engine._graph_val_cache
+		hints = cache.shallowest
+		hints.maxsize = 50
+		self.assertIs(hints._lock, cache._lock)
+		for k in range(10):
+			cache.store("g", k, "trunk", 0, 0, k)
+
+		def retrieve(k):
+			for turn in range(200):
+				self.assertEqual(cache.retrieve("g", k, "trunk", turn, 0), k)
+
+		with ThreadPoolExecutor(4) as pool:
+			futs = [pool.submit(retrieve, k) for k in range(10)]
+			for turn in range(1, 200, 20):
+				cache.store("g", 0, "trunk", turn, 0, 0)
+			for fut in futs:
+				fut.result()
+		self.assertLessEqual(len(hints), 50)
+		self.assertEqual(
+			sum(
+				len(times)
+				for branches in hints._entikeys.values()
+				for times in branches.values()
+			),
+			len(hints),
+		)
+
+
+class FlatCacheTest(unittest.TestCase):
+	def setUp(self):
+		self.engine = ORM("sqlite:///:memory:")
+
+	def tearDown(self):
+		self.engine.close()
+
+	def test_shared(self):
+		cache = self.engine._node_val_cache
+		cache.store("g", "n", "k", "trunk", 0, 0, "v")
+		branches = cache.branches["g", "n", "k"]
+		self.assertIs(cache.keys["g", "n"]["k"], branches)
+		self.assertIs(cache.parents["g",]["n"], cache.keys["g", "n"])
+		cache.remove("trunk", 0, 0)
+		self.assertEqual(cache.branches, {})
+		self.assertEqual(cache.keys, {})
+		self.assertEqual(cache.parents, {})
+
+	def test_read_no_vivify(self):
+		cache = self.engine._node_val_cache
+		cache.store("g", "n", "k", "trunk", 0, 0, "v")
+		sizes = (
+			len(cache.branches),
+			len(cache.keys),
+			len(cache.parents),
+			len(cache.keyframe),
+		)
+		with self.assertRaises(KeyError):
+			cache.retrieve("g", "m", "k", "trunk", 1, 0)
+		with self.assertRaises(KeyError):
+			cache.retrieve("g", "n", "k", "other", 1, 0)
+		self.assertEqual(
+			cache._get_adds_dels(("g", "m"), "trunk", 1, 0), (set(), set())
+		)
+		self.assertEqual(
+			sizes,
+			(
+				len(cache.branches),
+				len(cache.keys),
+				len(cache.parents),
+				len(cache.keyframe),
+			),
+		)
+		self.assertEqual(list(cache.branches["g", "n", "k"]), ["trunk"])
+
+	def test_window_locks(self):
+		"""A history's turns share a lock, or have none, if unthreaded"""
+		for threaded in (True, False):
+			with ORM("sqlite:///:memory:", threaded=threaded) as orm:
+				cache = orm._node_val_cache
+				for turn in range(5):
+					cache.store("g", "n", "k", "trunk", turn, 0, turn)
+					cache.store("g", "n", "k", "trunk", turn, 1, -turn)
+				turns = cache.branches["g", "n", "k"]["trunk"]
+				locks = {id(turns._lock)}
+				locks.update(id(turns[turn]._lock) for turn in range(5))
+				self.assertEqual(len(locks), 1)
+				self.assertEqual(
+					isinstance(turns._lock, nullcontext), not threaded
+				)
+
+
 if __name__ == "__main__":
 	unittest.main()
@@ -166,3 +166,31 @@ def test_save_load_plan(tmpdbfile):
 		g2.add_node(2)  # contradict plan
 		orm.turn = 0  # end of turn
 		assert 2 not in g2.edge[1]
+
+
+def test_deep_branches(orm):
+	g = orm.new_digraph("graph")
+	g.graph["k"] = "v"
+	for i in range(50):
+		orm.turn += 1
+		orm.branch = f"b{i}"
+	orm.turn += 1
+	assert g.graph["k"] == "v"
+	for i, (branch, turn, tick) in enumerate(orm._branches.ancestry("b49")):
+		parent, turn_start, tick_start, _, _ = orm._branches[
+			"b49" if i == 0 else f"b{49 - i}"
+		]
+		assert (branch, turn, tick) == (parent, turn_start, tick_start)
+	assert len(orm._branches.ancestry("b49")) == 50
+	assert orm.is_ancestor_of("b10", "b49")
+	assert not orm.is_ancestor_of("b49", "b10")
+	stopped = list(orm._iter_parent_btt("b49", 51, 0, stoptime=("b40", 42, 0)))
+	assert [branch for branch, _, _ in stopped] == [
+		f"b{i}" for i in range(49, 40, -1)
+	]
+	# Moving where a branch starts changes the ancestry of its descendants
+	orm._branches["b40"] = ("trunk", 41, 0) + orm._branches["b40"][3:]
+	assert orm._branches.ancestry("b49")[-2:] == (
+		("b40", 42, 0),
+		("trunk", 41, 0),
+	)
@@ -1,6 +1,9 @@
-from ..window import WindowDict
+from ..window import WindowDict, SettingsTurnDict
 from .. import HistoricKeyError, ORM
+from contextlib import nullcontext
 from itertools import cycle
+from random import Random
+import tracemalloc
 import pytest
 
 testvs = ["a", 99, ["spam", "eggs", "ham"], {"foo": "bar", 0: 1, "💧": "🔑"}]
@@ -172,3 +175,71 @@ def test_set():
 		wd[5] = g.node[5]["ham"]
 		assert wd[5] == {"spam": "beans"}
 		assert wd[5] == g.node[5]["ham"]
+
+
+def test_random_access():
+	rand = Random(69105)
+	wd = WindowDict()
+	ref = {}
+	for _ in range(2000):
+		rev = rand.randrange(200)
+		what = rand.random()
+		if what < 0.4:
+			if rand.random() < 0.5:
+				wd[rev] = rev * 2
+			else:
+				wd.set_item(rev, rev * 2, search=True)
+			ref[rev] = rev * 2
+		elif what < 0.5 and rev in ref:
+			wd.del_item(rev, search=rand.random() < 0.5)
+			del ref[rev]
+		earlier = [r for r in ref if r <= rev]
+		if rand.random() < 0.5:
+			get = wd.__getitem__
+		else:
+			get = wd.search
+		if earlier:
+			assert get(rev) == ref[max(earlier)]
+			assert wd.rev_before(rev) == max(earlier)
+		else:
+			with pytest.raises(HistoricKeyError):
+				get(rev)
+		later = [r for r in ref if r > rev]
+		assert wd.rev_after(rev) == (min(later) if later else None)
+		assert list(wd.past()) == sorted(earlier, reverse=True)
+		assert list(wd.future()) == sorted(later)
+		assert list(wd.keys()) == sorted(ref)
+		assert len(wd) == len(ref)
+	wd.truncate(100)
+	assert list(wd) == sorted(r for r in ref if r <= 100)
+	present = max(r for r in ref if r <= 50)
+	wd.truncate(50, "backward")
+	assert list(wd) == sorted(r for r in ref if present <= r <= 100)
+
+
+def test_shared_lock():
+	std = SettingsTurnDict()
+	std.store_at(0, 0, "foo")
+	std.store_at(1, 0, "bar")
+	assert std[0]._lock is std[1]._lock is std._lock
+	wd = WindowDict({0: "foo"}, lock=nullcontext())
+	wd[1] = "bar"
+	assert wd[2] == "bar"
+	assert wd.copy()[2] == "bar"
+
+
+def test_bytes_per_setting():
+	values = [(turn, tick) for turn in range(100) for tick in range(10)]
+	tracemalloc.start()
+	try:
+		before = tracemalloc.get_traced_memory()[0]
+		stds = [SettingsTurnDict() for _ in range(10)]
+		for std in stds:
+			for value in values:
+				std.store_at(*value, value)
+		used = tracemalloc.get_traced_memory()[0] - before
+	finally:
+		tracemalloc.stop()
+	# The values themselves are already allocated, so this is
+	# only what it takes to keep track of them
+	assert used / (len(stds) * len(values)) < 100
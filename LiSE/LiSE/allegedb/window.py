@@ -22,7 +22,8 @@ of the same key and neighboring ones repeatedly and in sequence.
 """
 
 from abc import abstractmethod, ABC
-from collections import deque
+from array import array
+from bisect import bisect_left, bisect_right
 from collections.abc import (
 	Mapping,
 	MutableMapping,
@@ -30,8 +31,7 @@ from collections.abc import (
 	ItemsView,
 	ValuesView,
 )
-from itertools import chain
-from operator import itemgetter, lt, le
+from operator import itemgetter
 from threading import RLock
 from typing import (
 	Union,
@@ -41,8 +41,8 @@ from typing import (
 	Tuple,
 	Any,
 	Iterable,
-	Set,
 	Optional,
+	ContextManager,
 )
 from enum import Enum
 
@@ -113,17 +113,11 @@ class WindowDictKeysView(ABC, KeysView):
 	_mapping: "WindowDict"
 
 	def __contains__(self, rev: int):
-		with self._mapping._lock:
-			return rev in self._mapping._keys
+		return rev in self._mapping
 
 	def __iter__(self):
 		with self._mapping._lock:
-			past = self._mapping._past
-			future = self._mapping._future
-			if past:
-				yield from map(get0, past)
-			if future:
-				yield from map(get0, reversed(future))
+			yield from self._mapping._revs
 
 
 class WindowDictItemsView(ABC, ItemsView):
@@ -132,17 +126,15 @@ class WindowDictItemsView(ABC, ItemsView):
 	_mapping: "WindowDict"
 
 	def __contains__(self, item: Tuple[int, Any]):
-		with self._mapping._lock:
-			return item in self._mapping._past or item in self._mapping._future
+		rev, v = item
+		mapping = self._mapping
+		with mapping._lock:
+			i = mapping._index(rev)
+			return i is not None and mapping._vals[i] == v
 
 	def __iter__(self):
 		with self._mapping._lock:
-			past = self._mapping._past
-			future = self._mapping._future
-			if past:
-				yield from past
-			if future:
-				yield from future
+			yield from zip(self._mapping._revs, self._mapping._vals)
 
 
 class WindowDictPastFutureKeysView(ABC, KeysView):
@@ -151,52 +143,40 @@ class WindowDictPastFutureKeysView(ABC, KeysView):
 	_mapping: Union["WindowDictPastView", "WindowDictFutureView"]
 
 	def __iter__(self):
-		with self._mapping.lock:
-			yield from map(get0, reversed(self._mapping.stack))
+		yield from self._mapping
 
 	def __contains__(self, item: int):
-		with self._mapping.lock:
-			return item in self._mapping and item in map(
-				get0, self._mapping.stack
-			)
+		return item in self._mapping
 
 
 class WindowDictPastFutureItemsView(ABC, ItemsView):
-	_mapping: Union["WindowDictPastView", "WindowDictFutureView"]
+	"""View on a WindowDict's items relative to last lookup"""
 
-	@staticmethod
-	@abstractmethod
-	def _out_of_range(item: tuple, stack: list):
-		pass
+	_mapping: Union["WindowDictPastView", "WindowDictFutureView"]
 
 	def __iter__(self):
-		with self._mapping.lock:
-			yield from reversed(self._mapping.stack)
+		view = self._mapping
+		revs = view._dict._revs
+		vals = view._dict._vals
+		with view._dict._lock:
+			for i in view._range():
+				yield revs[i], vals[i]
 
 	def __contains__(self, item: Tuple[int, Any]):
-		with self._mapping.lock:
-			if self._out_of_range(item, self._mapping.stack):
-				return False
-			i0, i1 = item
-			for j0, j1 in self._mapping.stack:
-				if i0 == j0:
-					return i1 == j1
+		rev, v = item
+		try:
+			return self._mapping[rev] == v
+		except KeyError:
 			return False
 
 
 class WindowDictPastItemsView(WindowDictPastFutureItemsView):
-	@staticmethod
-	def _out_of_range(item: Tuple[int, Any], stack: List[Tuple[int, Any]]):
-		return item[0] < stack[0][0] or item[0] > stack[-1][0]
+	"""View on a WindowDict's past items relative to last lookup"""
 
 
 class WindowDictFutureItemsView(WindowDictPastFutureItemsView):
 	"""View on a WindowDict's future items relative to last lookup"""
 
-	@staticmethod
-	def _out_of_range(item: Tuple[int, Any], stack: List[Tuple[int, Any]]):
-		return item[0] < stack[-1][0] or item[0] > stack[0][0]
-
 
 class WindowDictPastFutureValuesView(ABC, ValuesView):
 	"""Abstract class for views on the past or future values of a WindowDict"""
@@ -204,12 +184,14 @@ class WindowDictPastFutureValuesView(ABC, ValuesView):
 	_mapping: Union["WindowDictPastView", "WindowDictFutureView"]
 
 	def __iter__(self):
-		with self._mapping.lock:
-			yield from map(get1, reversed(self._mapping.stack))
+		view = self._mapping
+		vals = view._dict._vals
+		with view._dict._lock:
+			for i in view._range():
+				yield vals[i]
 
 	def __contains__(self, item: Any):
-		with self._mapping.lock:
-			return item in map(get1, self._mapping.stack)
+		return any(v == item for v in self)
 
 
 class WindowDictValuesView(ABC, ValuesView):
@@ -219,55 +201,61 @@ class WindowDictValuesView(ABC, ValuesView):
 
 	def __contains__(self, value: Any):
 		with self._mapping._lock:
-			return value in map(get1, self._mapping._past) or value in map(
-				get1, self._mapping._future
-			)
+			return value in self._mapping._vals
 
 	def __iter__(self):
 		with self._mapping._lock:
-			past = self._mapping._past
-			future = self._mapping._future
-			if past:
-				yield from map(get1, past)
-			if future:
-				yield from map(get1, future)
+			yield from self._mapping._vals
 
 
 class WindowDictPastFutureView(ABC, Mapping):
-	"""Abstract class for historical views on WindowDict"""
+	"""Abstract class for historical views on WindowDict
 
-	__slots__ = ("stack", "lock")
-	stack: List[Tuple[int, Any]]
+	Covers the revisions on one side of ``rev``, even if the
+	WindowDict gets changed or looked up at some other revision later.
 
-	def __init__(self, stack: List[Tuple[int, Any]], lock: RLock) -> None:
-		self.stack = stack
-		self.lock = lock
+	"""
 
-	def __len__(self) -> int:
-		with self.lock:
-			stack = self.stack
-			if not stack:
-				return 0
-			return len(stack)
+	__slots__ = ("_dict", "_rev")
+	_dict: "WindowDict"
+	_rev: Optional[int]
 
+	def __init__(self, dic: "WindowDict", rev: Optional[int]) -> None:
+		self._dict = dic
+		self._rev = rev
 
-class WindowDictPastView(WindowDictPastFutureView):
-	"""Read-only mapping of just the past of a WindowDict"""
+	def _split(self) -> int:
+		"""Return how many of the revisions are at or before ``rev``"""
+		revs = self._dict._revs
+		if self._rev is None:
+			return len(revs)
+		return bisect_right(revs, self._rev)
+
+	@abstractmethod
+	def _range(self) -> range:
+		"""Indices of my revisions, from nearest ``rev`` to farthest"""
+
+	def __len__(self) -> int:
+		with self._dict._lock:
+			return len(self._range())
 
 	def __iter__(self) -> Iterable[int]:
-		with self.lock:
-			stack = self.stack
-			return map(get0, reversed(stack))
+		with self._dict._lock:
+			return map(self._dict._revs.__getitem__, self._range())
 
 	def __getitem__(self, key: int) -> Any:
-		with self.lock:
-			stack = self.stack
-			if not stack or key < stack[0][0] or key > stack[-1][0]:
-				raise KeyError
-			for rev, value in stack:
-				if rev == key:
-					return value
-			raise KeyError
+		with self._dict._lock:
+			i = self._dict._index(key)
+			if i is None or i not in self._range():
+				raise KeyError("No such revision", key)
+			return self._dict._vals[i]
+
+
+class WindowDictPastView(WindowDictPastFutureView):
+	"""Read-only mapping of just the past of a WindowDict"""
+
+	def _range(self) -> range:
+		return range(self._split() - 1, -1, -1)
 
 	def keys(self) -> WindowDictPastFutureKeysView:
 		return WindowDictPastFutureKeysView(self)
@@ -282,20 +270,8 @@ class WindowDictPastView(WindowDictPastFutureView):
 class WindowDictFutureView(WindowDictPastFutureView):
 	"""Read-only mapping of just the future of a WindowDict"""
 
-	def __iter__(self):
-		with self.lock:
-			stack = self.stack
-			return map(get0, reversed(stack))
-
-	def __getitem__(self, key: int):
-		with self.lock:
-			stack = self.stack
-			if not stack or key < stack[-1][0] or key > stack[0][0]:
-				raise KeyError
-			for rev, value in stack:
-				if rev == key:
-					return value
-			raise KeyError("No such revision", key)
+	def _range(self) -> range:
+		return range(self._split(), len(self._dict._revs))
 
 	def keys(self) -> WindowDictPastFutureKeysView:
 		return WindowDictPastFutureKeysView(self)
@@ -321,6 +297,29 @@ class WindowDictSlice:
 	def __reversed__(self) -> Iterable[Any]:
 		return iter(WindowDictReverseSlice(self.dic, self.slic))
 
+	def _range(self) -> range:
+		"""Indices of the revisions in the slice, earliest first
+
+		Includes the start and not the stop, when the start is earlier;
+		otherwise, includes the stop and not the start.
+
+		"""
+		revs = self.dic._revs
+		start, stop = self.slic.start, self.slic.stop
+		if start is None:
+			left = 0
+		elif stop is not None and start > stop:
+			left = bisect_right(revs, stop)
+		else:
+			left = bisect_left(revs, start)
+		if stop is None:
+			right = len(revs)
+		elif start is not None and start > stop:
+			right = bisect_right(revs, start)
+		else:
+			right = bisect_left(revs, stop)
+		return range(left, right)
+
 	def __iter__(self):
 		dic = self.dic
 		with dic._lock:
@@ -333,64 +332,15 @@ class WindowDictSlice:
 					slic.stop or dic.end + 1,
 					slic.step,
 				):
-					dic._seek(i)
-					yield dic._past[-1][1]
+					yield dic[i]
 				return
-			if slic.start is None and slic.stop is None:
-				yield from map(get1, dic._past)
-				yield from map(get1, reversed(dic._future))
+			if slic.start is not None and slic.start == slic.stop:
+				try:
+					yield dic[slic.stop]
+				except HistoricKeyError:
+					pass
 				return
-			if slic.start is not None and slic.stop is not None:
-				if slic.stop == slic.start:
-					try:
-						yield dic[slic.stop]
-					except HistoricKeyError:
-						pass
-					return
-				past = dic._past
-				future = dic._future
-				if slic.start < slic.stop:
-					left, right = slic.start, slic.stop
-					dic._seek(right)
-					if not past:
-						return
-					if past[-1][0] == right:
-						future.append(past.pop())
-					cmp = lt
-				else:
-					left, right = slic.stop, slic.start
-					dic._seek(right)
-					cmp = le
-				if not past:
-					return
-				it = iter(past)
-				p0, p1 = next(it)
-				while cmp(p0, left):
-					try:
-						p0, p1 = next(it)
-					except StopIteration:
-						return
-				else:
-					yield p1
-				yield from map(get1, it)
-			elif slic.start is None:
-				stac = dic._past + list(reversed(dic._future))
-				while stac and stac[-1][0] >= slic.stop:
-					stac.pop()
-				yield from map(get1, stac)
-				return
-			else:  # slic.stop is None
-				if not dic._past and not dic._future:
-					return
-				chan = chain(dic._past, reversed(dic._future))
-				nxt = next(chan)
-				while nxt[0] < slic.start:
-					try:
-						nxt = next(chan)
-					except StopIteration:
-						return
-				yield get1(nxt)
-				yield from map(get1, chan)
+			yield from map(dic._vals.__getitem__, self._range())
 
 
 class WindowDictReverseSlice:
@@ -417,44 +367,15 @@ class WindowDictReverseSlice:
 					slic.stop or dic.beginning,
 					slic.step,
 				):
-					dic._seek(i)
-					yield dic._past[-1][1]
+					yield dic[i]
 				return
-			if slic.start is None and slic.stop is None:
-				yield from map(get1, dic._future)
-				yield from map(get1, reversed(dic._past))
+			if slic.start is not None and slic.start == slic.stop:
+				yield dic[slic.stop]
 				return
-			if slic.start is not None and slic.stop is not None:
-				if slic.start == slic.stop:
-					dic._seek(slic.stop)
-					yield dic._past[-1][1]
-					return
-				if slic.start < slic.stop:
-					left, right = slic.start, slic.stop
-					dic._seek(right)
-					it = reversed(dic._past)
-					next(it)
-					cmp = lt
-				else:
-					left, right = slic.stop, slic.start
-					dic._seek(right)
-					it = reversed(dic._past)
-					cmp = le
-				for frev, fv in it:
-					if cmp(frev, left):
-						return
-					yield fv
-			elif slic.start is None:
-				stac = dic._past + list(reversed(dic._future))
-				while stac and stac[-1][0] >= slic.stop:
-					stac.pop()
-				yield from map(get1, reversed(stac))
-			else:  # slic.stop is None
-				stac = deque(dic._past)
-				stac.extend(reversed(dic._future))
-				while stac and stac[0][0] < slic.start:
-					stac.popleft()
-				yield from map(get1, reversed(stac))
+			yield from map(
+				dic._vals.__getitem__,
+				reversed(WindowDictSlice(dic, slic)._range()),
+			)
 
 
 class WindowDict(MutableMapping):
@@ -477,32 +398,36 @@ class WindowDict(MutableMapping):
 	Unlike slices of eg. lists, you can slice with a start greater than the stop
 	even if you don't supply a step. That will get you values in reverse order.
 
+	Revisions are stored in an array of 64-bit integers, unless you
+	use some that don't fit, in which case they go in a list instead.
+	Every WindowDict gets its own lock by default; pass ``lock`` to
+	share one with other WindowDicts, or ``contextlib.nullcontext()``
+	to do without, if only one thread will ever touch it.
+
 	"""
 
-	__slots__ = ("_future", "_past", "_keys", "_last", "_lock")
+	__slots__ = ("_revs", "_vals", "_cursor", "_last", "_lock")
 
-	_past: List[Tuple[int, Any]]
-	_future: List[Tuple[int, Any]]
-	_keys: Set[int]
+	# Revisions in ascending order, and the values set at each
+	_revs: Union[array, List[int]]
+	_vals: List[Any]
+	# How many revisions are at or before the last one looked up
+	_cursor: int
 	_last: Optional[int]
 
 	@property
 	def beginning(self) -> Optional[int]:
 		with self._lock:
-			if not self._past:
-				if not self._future:
-					return None
-				return self._future[-1][0]
-			return self._past[0][0]
+			if not self._revs:
+				return None
+			return self._revs[0]
 
 	@property
 	def end(self) -> Optional[int]:
 		with self._lock:
-			if not self._future:
-				if not self._past:
-					return None
-				return self._past[-1][0]
-			return self._future[0][0]
+			if not self._revs:
+				return None
+			return self._revs[-1]
 
 	def future(self, rev: int = None) -> WindowDictFutureView:
 		"""Return a Mapping of items after the given revision.
@@ -510,10 +435,10 @@ class WindowDict(MutableMapping):
 		Default revision is the last one looked up.
 
 		"""
-		if rev is not None:
-			with self._lock:
+		with self._lock:
+			if rev is not None:
 				self._seek(rev)
-		return WindowDictFutureView(self._future, self._lock)
+			return WindowDictFutureView(self, self._last)
 
 	def past(self, rev: int = None) -> WindowDictPastView:
 		"""Return a Mapping of items at or before the given revision.
@@ -521,10 +446,10 @@ class WindowDict(MutableMapping):
 		Default revision is the last one looked up.
 
 		"""
-		if rev is not None:
-			with self._lock:
+		with self._lock:
+			if rev is not None:
 				self._seek(rev)
-		return WindowDictPastView(self._past, self._lock)
+			return WindowDictPastView(self, self._last)
 
 	def search(self, rev: int) -> Any:
 		"""Alternative access for far-away revisions
@@ -537,75 +462,62 @@ class WindowDict(MutableMapping):
 		nearby revisions, same as normal lookups.
 
 		"""
-
-		def recurse(revs: List[Tuple[int, Any]]) -> Any:
-			if len(revs) < 1:
+		with self._lock:
+			self._cursor = i = bisect_right(self._revs, rev)
+			self._last = rev
+			if not i:
 				raise HistoricKeyError(
 					"No data ever for revision", rev, deleted=False
 				)
-			elif len(revs) == 1:
-				if revs[0][0] <= rev:
-					return revs[0]
-				raise HistoricKeyError(
-					"Can't retrieve revision", rev, deleted=True
-				)
-			pivot = len(revs) // 2
-			before = revs[:pivot]
-			after = revs[pivot:]
-			assert before and after
-			if rev < after[0][0]:
-				if rev > before[-1][0]:
-					return before[-1]
-				return recurse(before)
-			elif rev == after[0][0]:
-				return after[0]
-			else:
-				return recurse(after)
-
-		with self._lock:
-			revs = self._past + list(reversed(self._future))
-			if len(revs) == 1:
-				result_rev, result = revs[0]
-				if rev < result_rev:
-					raise HistoricKeyError(
-						"No data ever for revision", rev, deleted=False
-					)
-			else:
-				result_rev, result = recurse(revs)
-			i = revs.index((result_rev, result)) + 1
-			self._past = revs[:i]
-			self._future = list(reversed(revs[i:]))
-			self._last = rev
-			return result
+			return self._vals[i - 1]
 
 	def _seek(self, rev: int) -> None:
 		"""Arrange the caches to help look up the given revision."""
 		if rev == self._last:
 			return
-		past = self._past
-		future = self._future
-		if future:
-			appender = past.append
-			popper = future.pop
-			future_start = future[-1][0]
-			while future_start <= rev:
-				appender(popper())
-				if future:
-					future_start = future[-1][0]
-				else:
-					break
-		if past:
-			popper = past.pop
-			appender = future.append
-			past_end = past[-1][0]
-			while past_end > rev:
-				appender(popper())
-				if past:
-					past_end = past[-1][0]
-				else:
-					break
+		revs = self._revs
+		i = self._cursor
+		n = len(revs)
+		# Stepping to a neighboring revision is the common case, so check
+		# for that before searching
+		if not i or revs[i - 1] <= rev:
+			if i == n or rev < revs[i]:
+				pass
+			elif i + 1 == n or rev < revs[i + 1]:
+				i += 1
+			else:
+				i = bisect_right(revs, rev, i + 2)
+		elif i == 1 or revs[i - 2] <= rev:
+			i -= 1
+		else:
+			i = bisect_right(revs, rev, 0, i - 2)
+		self._cursor = i
 		self._last = rev
 
+	def _index(self, rev: int) -> Optional[int]:
+		"""Return the index of this exact revision, if I have it"""
+		revs = self._revs
+		try:
+			i = bisect_left(revs, rev)
+		except TypeError:
+			return None
+		if i < len(revs) and revs[i] == rev:
+			return i
+		return None
+
+	def _insert_rev(self, i: int, rev: int) -> None:
+		"""Put ``rev`` at index ``i`` of my revisions
+
+		Anything that won't fit in a 64-bit integer gets my revisions
+		moved into a plain list.
+
+		"""
+		try:
+			self._revs.insert(i, rev)
+		except (TypeError, OverflowError):
+			self._revs = list(self._revs)
+			self._revs.insert(i, rev)
+
 	def rev_gettable(self, rev: int) -> bool:
 		beg = self.beginning
 		if beg is None:
@@ -620,38 +532,36 @@ class WindowDict(MutableMapping):
 		"""
 		with self._lock:
 			if search:
-				self.search(rev)
+				self._cursor = bisect_right(self._revs, rev)
+				self._last = rev
 			else:
 				self._seek(rev)
-			if self._past:
-				return self._past[-1][0]
+			if self._cursor:
+				return self._revs[self._cursor - 1]
 
 	def rev_after(self, rev: int, search=False):
 		"""Return the earliest future rev on which the value will change."""
 		with self._lock:
 			if search:
-				self.search(rev)
+				self._cursor = bisect_right(self._revs, rev)
+				self._last = rev
 			else:
 				self._seek(rev)
-			if self._future:
-				return self._future[-1][0]
+			if self._cursor < len(self._revs):
+				return self._revs[self._cursor]
 
 	def initial(self) -> Any:
 		"""Return the earliest value we have"""
 		with self._lock:
-			if self._past:
-				return self._past[0][1]
-			if self._future:
-				return self._future[-1][1]
+			if self._vals:
+				return self._vals[0]
 			raise KeyError("No data")
 
 	def final(self) -> Any:
 		"""Return the latest value we have"""
 		with self._lock:
-			if self._future:
-				return self._future[0][1]
-			if self._past:
-				return self._past[-1][1]
+			if self._vals:
+				return self._vals[-1]
 			raise KeyError("No data")
 
 	def truncate(
@@ -665,21 +575,23 @@ class WindowDict(MutableMapping):
 		"""
 		with self._lock:
 			if search:
-				self.search(rev)
+				self._cursor = bisect_right(self._revs, rev)
+				self._last = rev
 			else:
 				self._seek(rev)
+			i = self._cursor
 			if direction == "forward":
-				self._keys.difference_update(map(get0, self._future))
-				self._future = []
+				del self._revs[i:]
+				del self._vals[i:]
 			elif direction == "backward":
-				if not self._past:
+				if not i:
 					return
-				if self._past[-1][0] == rev:
-					self._keys.difference_update(map(get0, self._past[:-1]))
-					self._past = [self._past[-1]]
-				else:
-					self._keys.difference_update(map(get0, self._past))
-					self._past = []
+				if self._revs[i - 1] == rev:
+					# keep the value set at exactly this revision
+					i -= 1
+				del self._revs[:i]
+				del self._vals[:i]
+				self._cursor -= i
 			else:
 				raise ValueError("Need direction 'forward' or 'backward'")
 
@@ -693,47 +605,50 @@ class WindowDict(MutableMapping):
 		return WindowDictValuesView(self)
 
 	def __bool__(self) -> bool:
-		return bool(self._keys)
+		return bool(self._revs)
 
 	def copy(self):
 		with self._lock:
 			empty = WindowDict.__new__(WindowDict)
-			empty._past = self._past.copy()
-			empty._future = self._future.copy()
-			empty._keys = self._keys.copy()
+			empty._revs = self._revs[:]
+			empty._vals = self._vals.copy()
+			empty._cursor = self._cursor
 			empty._last = self._last
+			empty._lock = RLock()
 			return empty
 
 	def __init__(
-		self, data: Union[List[Tuple[int, Any]], Dict[int, Any]] = None
+		self,
+		data: Union[List[Tuple[int, Any]], Dict[int, Any]] = None,
+		lock: Optional[ContextManager] = None,
 	) -> None:
-		self._lock = RLock()
+		self._lock = RLock() if lock is None else lock
 		with self._lock:
 			if not data:
-				self._past = []
+				items = []
 			elif isinstance(data, Mapping):
-				self._past = list(data.items())
+				items = sorted(data.items(), key=get0)
 			else:
 				# assume it's an orderable sequence of pairs
-				self._past = list(data)
-			self._past.sort()
-			self._future = []
-			self._keys = set(map(get0, self._past))
+				items = sorted(data, key=get0)
+			# Build from tuples, so nothing gets overallocated
+			revs, vals = zip(*items) if items else ((), ())
+			try:
+				self._revs = array("q", revs)
+			except (TypeError, OverflowError):
+				self._revs = list(revs)
+			self._vals = list(vals)
+			self._cursor = len(items)
 			self._last = None
 
 	def __iter__(self) -> Iterable[Any]:
-		if not self:
-			return
-		if self._past:
-			yield from map(get0, self._past)
-		if self._future:
-			yield from map(get0, self._future)
+		yield from self._revs
 
 	def __contains__(self, item: int) -> bool:
-		return item in self._keys
+		return self._index(item) is not None
 
 	def __len__(self) -> int:
-		return len(self._keys)
+		return len(self._revs)
 
 	def __getitem__(self, rev: int) -> Any:
 		if isinstance(rev, slice):
@@ -742,34 +657,30 @@ class WindowDict(MutableMapping):
 			return WindowDictSlice(self, rev)
 		with self._lock:
 			self._seek(rev)
-			past = self._past
-			if not past:
+			if not self._cursor:
 				raise HistoricKeyError(
 					"Revision {} is before the start of history".format(rev)
 				)
-			return past[-1][1]
+			return self._vals[self._cursor - 1]
 
 	def __setitem__(self, rev: int, v: Any) -> None:
 		self.set_item(rev, v)
 
 	def set_item(self, rev: int, v: Any, search=False) -> None:
-		past = self._past
 		with self._lock:
-			if past or self._future:
-				if search:
-					self.search(rev)
-				else:
-					self._seek(rev)
-				if past:
-					if past[-1][0] == rev:
-						past[-1] = (rev, v)
-					else:
-						past.append((rev, v))
-				else:
-					past.append((rev, v))
+			revs = self._revs
+			if search:
+				self._cursor = bisect_right(revs, rev)
+				self._last = rev
+			else:
+				self._seek(rev)
+			i = self._cursor
+			if i and revs[i - 1] == rev:
+				self._vals[i - 1] = v
 			else:
-				past.append((rev, v))
-			self._keys.add(rev)
+				self._insert_rev(i, rev)
+				self._vals.insert(i, v)
+				self._cursor = i + 1
 
 	def __delitem__(self, rev: int) -> None:
 		self.del_item(rev)
@@ -781,90 +692,72 @@ class WindowDict(MutableMapping):
 		# But handle degenerate case.
 		if not self:
 			raise HistoricKeyError("Tried to delete from an empty WindowDict")
-		if self.beginning is None:
-			if self.end is not None and rev > self.end:
-				raise HistoricKeyError(
-					"Rev outside of history: {}".format(rev)
-				)
-		elif self.end is None:
-			if self.beginning is not None and rev < self.beginning:
-				raise HistoricKeyError(
-					"Rev outside of history: {}".format(rev)
-				)
-		elif not self.beginning <= rev <= self.end:
+		if not self.beginning <= rev <= self.end:
 			raise HistoricKeyError("Rev outside of history: {}".format(rev))
 		with self._lock:
 			if search:
-				self.search(rev)
+				self._cursor = bisect_right(self._revs, rev)
+				self._last = rev
 			else:
 				self._seek(rev)
-			past = self._past
-			if not past or past[-1][0] != rev:
+			i = self._cursor
+			if not i or self._revs[i - 1] != rev:
 				raise HistoricKeyError("Rev not present: {}".format(rev))
-			del past[-1]
-			self._keys.remove(rev)
+			del self._revs[i - 1]
+			del self._vals[i - 1]
+			self._cursor = i - 1
 
 	def __repr__(self) -> str:
-		me = {}
-		if self._past:
-			me.update(self._past)
-		if self._future:
-			me.update(self._future)
-		return "{}({})".format(self.__class__.__name__, me)
+		return "{}({})".format(
+			self.__class__.__name__, dict(zip(self._revs, self._vals))
+		)
 
 
 class FuturistWindowDict(WindowDict):
 	"""A WindowDict that does not let you rewrite the past."""
 
-	__slots__ = (
-		"_future",
-		"_past",
-	)
-	_future: List[Tuple[int, Any]]
-	_past: List[Tuple[int, Any]]
+	__slots__ = ()
 
 	def __setitem__(self, rev: int, v: Any) -> None:
 		if hasattr(v, "unwrap") and not hasattr(v, "no_unwrap"):
 			v = v.unwrap()
 		with self._lock:
 			self._seek(rev)
-			past = self._past
-			future = self._future
-			if future:
+			revs = self._revs
+			if self._cursor < len(revs):
 				raise HistoricKeyError(
 					"Already have some history after {}".format(rev)
 				)
-			if not past:
-				past.append((rev, v))
-			elif rev > past[-1][0]:
-				past.append((rev, v))
-			elif rev == past[-1][0]:
-				past[-1] = (rev, v)
+			if not revs or rev > revs[-1]:
+				self._insert_rev(len(revs), rev)
+				self._vals.append(v)
+				self._cursor += 1
+			elif rev == revs[-1]:
+				self._vals[-1] = v
 			else:
 				raise HistoricKeyError(
 					"Already have some history after {} "
 					"(and my seek function is broken?)".format(rev)
 				)
-			self._keys.add(rev)
 
 
 class TurnDict(FuturistWindowDict):
-	__slots__ = ("_future", "_past")
-	_future: List[Tuple[int, Any]]
-	_past: List[Tuple[int, Any]]
+	__slots__ = ()
 	cls = FuturistWindowDict
 
 	def __setitem__(self, turn: int, value: Any) -> None:
 		if type(value) is not FuturistWindowDict:
-			value = FuturistWindowDict(value)
+			value = FuturistWindowDict(value, self._lock)
 		FuturistWindowDict.__setitem__(self, turn, value)
 
 
 class EntikeyWindowDict(WindowDict):
-	__slots__ = ("_past", "_future", "entikeys")
+	__slots__ = ("entikeys",)
 
 	def __init__(
-		self, data: Union[List[Tuple[int, Any]], Dict[int, Any]] = None
+		self,
+		data: Union[List[Tuple[int, Any]], Dict[int, Any]] = None,
+		lock: Optional[ContextManager] = None,
 	) -> None:
 		if data:
 			if hasattr(data, "values") and callable(data.values):
@@ -873,7 +766,7 @@ class EntikeyWindowDict(WindowDict):
 				self.entikeys = {value[:-2] for value in data}
 		else:
 			self.entikeys = set()
-		super().__init__(data)
+		super().__init__(data, lock)
 
 	def __setitem__(self, rev: int, v: tuple) -> None:
 		self.entikeys.add(v[:-2])
@@ -895,16 +788,16 @@ class SettingsTurnDict(WindowDict):
 	it's in effect at every tick in the turn after that one, and every
 	further turn.
 
+	The WindowDicts I make for each turn share my lock.
+
 	"""
 
-	__slots__ = ("_future", "_past")
-	_future: List[Tuple[int, Any]]
-	_past: List[Tuple[int, Any]]
+	__slots__ = ()
 	cls = WindowDict
 
 	def __setitem__(self, turn: int, value: Any) -> None:
 		if not isinstance(value, self.cls):
-			value = self.cls(value)
+			value = self.cls(value, self._lock)
 		WindowDict.__setitem__(self, turn, value)
 
 	def retrieve(self, turn: int, tick: int) -> Any:
@@ -26,7 +26,6 @@ from .allegedb.cache import (
 )
 from .allegedb.window import SettingsTurnDict
 from .util import sort_set
-from collections import OrderedDict
 
 
 class InitializedCache(Cache):
@@ -241,7 +240,6 @@ class RulesHandledCache(object):
 		self.engine = engine
 		self.handled = {}
 		self.handled_deep = StructuredDefaultDict(1, type=WindowDict)
-		self.unhandled = {}
 
 	def get_rulebook(self, *args):
 		raise NotImplementedError
@@ -256,17 +254,6 @@ class RulesHandledCache(object):
 			rule
 		)
 		self.handled_deep[branch][turn][tick] = (entity, rulebook, rule)
-		unhandl = (
-			self.unhandled.setdefault(entity, {})
-			.setdefault(rulebook, {})
-			.setdefault(branch, {})
-		)
-		if turn not in unhandl:
-			unhandl[turn] = list(self.iter_unhandled_rules(branch, turn, tick))
-		try:
-			unhandl[turn].remove(rule)
-		except ValueError:
-			pass
 
 	def retrieve(self, *args):
 		return self.handled[args]
@@ -313,22 +300,34 @@ class UnitRulesHandledCache(RulesHandledCache):
 			return "unit_rulebook", character
 
 	def iter_unhandled_rules(self, branch, turn, tick):
+		# There's no separate index of each character's live units here.
+		# Which nodes are units depends on the branch, turn, and tick, so
+		# such an index would need a history of its own, kept in step
+		# with the unitness cache through keyframes, loading, and
+		# branching. The unitness cache already keeps a dict of each
+		# unit graph's units at every time, so one retrieval per graph
+		# gets them. The rule poller calls this once a turn, before any
+		# unit rule is followed, so usually every live unit has to come
+		# out with every rule anyway.
+		unitness_cache = self.engine._unitness_cache
+		rulebooks_cache = self.engine._rulebooks_cache
+		# Don't use get_handled_rules, which would make an empty set
+		# for every unit, every turn
+		get_handled = self.handled.get
 		for charname in self.engine._graph_cache.iter_keys(branch, turn, tick):
 			rb = self.get_rulebook(charname, branch, turn, tick)
 			try:
-				rules, prio = self.engine._rulebooks_cache.retrieve(
-					rb, branch, turn, tick
-				)
+				rules, prio = rulebooks_cache.retrieve(rb, branch, turn, tick)
 			except KeyError:
 				continue
 			if not rules:
 				continue
-			for graphname in self.engine._unitness_cache.iter_keys(
+			for graphname in unitness_cache.iter_keys(
 				charname, branch, turn, tick
 			):
 				# Seems bad that I have to check twice like this.
 				try:
-					existences = self.engine._unitness_cache.retrieve(
+					existences = unitness_cache.retrieve(
 						charname, graphname, branch, turn, tick
 					)
 				except KeyError:
@@ -336,9 +335,13 @@ class UnitRulesHandledCache(RulesHandledCache):
 				for node, ex in existences.items():
 					if not ex:
 						continue
-					handled = self.get_handled_rules(
-						(charname, graphname), rb, branch, turn
+					handled = get_handled(
+						(charname, graphname, node, rb, branch, turn)
 					)
+					if not handled:
+						for rule in rules:
+							yield prio, charname, graphname, node, rb, rule
+						continue
 					for rule in rules:
 						if rule not in handled:
 							yield prio, charname, graphname, node, rb, rule
@@ -642,7 +645,11 @@ class ThingsCache(Cache):
 				self.retrieve(character, thing, branch, turn, 0)
 			except KeyError:
 				pass
-			return self.keys[(character,)][thing][branch].rev_before(turn)
+			try:
+				turns = self.keys[(character,)][thing][branch]
+			except KeyError:
+				return None
+			return turns.rev_before(turn)
 
 	def turn_after(self, character, thing, branch, turn):
 		with self._lock:
@@ -650,14 +657,18 @@ class ThingsCache(Cache):
 				self.retrieve(character, thing, branch, turn, 0)
 			except KeyError:
 				pass
-			return self.keys[(character,)][thing][branch].rev_after(turn)
+			try:
+				turns = self.keys[(character,)][thing][branch]
+			except KeyError:
+				return None
+			return turns.rev_after(turn)
 
 
 class NodeContentsCache(Cache):
 	name = "node_contents_cache"
 
-	def __init__(self, db, kfkvs=None):
-		super().__init__(db, kfkvs)
+	def __init__(self, db):
+		super().__init__(db)
 		self.loc_settings = StructuredDefaultDict(1, SettingsTurnDict)
 
 	def store(
@@ -719,25 +730,7 @@ class NodeContentsCache(Cache):
 					if not branhc:
 						del branches[branch]
 				if not branches:
-					del self.branches[branchkey]
-			for keykey, keys in list(self.keys.items()):
-				for key, branchs in list(keys.items()):
-					if branch in branchs:
-						branhc = branchs[branch]
-						if turn in branhc:
-							trun = branhc[turn]
-							if tick in trun:
-								del trun[tick]
-							trun.truncate(tick)
-							if not trun:
-								del branhc[turn]
-						branhc.truncate(turn)
-						if not branhc:
-							del branchs[branch]
-					if not branchs:
-						del keys[key]
-				if not keys:
-					del self.keys[keykey]
+					self._remove_entikey((), *branchkey)
 			sets = self.settings[branch]
 			if turn in sets:
 				setsturn = sets[turn]
@@ -773,4 +766,4 @@ class NodeContentsCache(Cache):
 					kc.truncate(turn)
 					if not kc:
 						del self.keycache[entity, brnch]
-			self.shallowest = OrderedDict()
+			self.shallowest.clear()
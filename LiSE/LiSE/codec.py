@@ -0,0 +1,113 @@
+# This file is part of LiSE, a framework for life simulation games.
+# Copyright (c) Zachary Spector, public@zacharyspector.com
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, version 3.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""How messages between LiSE processes get compressed"""
+
+import zlib
+from threading import Lock
+from time import perf_counter
+from typing import Optional, Union
+
+RAW = b"\x00"
+ZLIB = b"\x01"
+
+
+class Codec:
+	"""Compress messages, if they're big enough to be worth it
+
+	Both ends of a connection need the same codec, which is decided
+	when the connection is set up.
+
+	:param level: The zlib compression level, from 0 to 9, or -1 for
+		zlib's default. ``None`` means never compress anything.
+	:param threshold: Messages shorter than this many bytes get sent as
+		they are. Default 1024.
+
+	Keeps ``stats`` on how many bytes go in and come out of the
+	``compress`` and ``decompress`` methods, and how long they took.
+	One codec may be used from several threads at once, so the stats are
+	updated under a lock.
+
+	"""
+
+	__slots__ = ("level", "threshold", "stats", "_lock")
+
+	def __init__(self, level: Optional[int] = -1, threshold: int = 1024):
+		self.level = level
+		self.threshold = threshold
+		self._lock = Lock()
+		self.stats = {
+			"compress": {"calls": 0, "before": 0, "after": 0, "seconds": 0.0},
+			"decompress": {
+				"calls": 0,
+				"before": 0,
+				"after": 0,
+				"seconds": 0.0,
+			},
+		}
+
+	def __getstate__(self):
+		return self.level, self.threshold
+
+	def __setstate__(self, state):
+		self.__init__(*state)
+
+	def __repr__(self):
+		return f"Codec(level={self.level}, threshold={self.threshold})"
+
+	@classmethod
+	def get(cls, codec: Union["Codec", str, None]) -> "Codec":
+		"""Make a codec from a name, or return one that's already made
+
+		``"zlib"`` compresses big messages, and ``"none"`` nothing.
+
+		"""
+		if isinstance(codec, cls):
+			return codec
+		if codec == "zlib":
+			return cls()
+		if codec in ("none", None):
+			return cls(None)
+		raise ValueError(f"Unknown codec: {codec}")
+
+	def _count(self, kind: str, before: int, after: int, start: float):
+		seconds = perf_counter() - start
+		stats = self.stats[kind]
+		with self._lock:
+			stats["calls"] += 1
+			stats["before"] += before
+			stats["after"] += after
+			stats["seconds"] += seconds
+
+	def compress(self, data: bytes) -> bytes:
+		if self.level is None:
+			return data
+		start = perf_counter()
+		if len(data) < self.threshold:
+			ret = RAW + data
+		else:
+			ret = ZLIB + zlib.compress(data, self.level)
+		self._count("compress", len(data), len(ret), start)
+		return ret
+
+	def decompress(self, data: bytes) -> bytes:
+		if self.level is None:
+			return data
+		start = perf_counter()
+		if data[:1] == ZLIB:
+			ret = zlib.decompress(memoryview(data)[1:])
+		else:
+			ret = data[1:]
+		self._count("decompress", len(data), len(ret), start)
+		return ret
@@ -26,19 +26,30 @@ import os
 from concurrent.futures import Executor, Future, ThreadPoolExecutor
 from concurrent.futures import wait as futwait
 from functools import partial
-from multiprocessing import Process, Pipe, Queue
+from multiprocessing import get_context, resource_tracker
+from multiprocessing.shared_memory import SharedMemory
 from operator import itemgetter
-from collections import defaultdict
-from itertools import chain
-from queue import SimpleQueue, Empty
+from collections import OrderedDict, defaultdict
+from itertools import chain, compress, count
+from queue import SimpleQueue
 from threading import Thread, Lock
-from time import sleep
+from time import perf_counter
 from types import FunctionType, ModuleType, MethodType
-from typing import Dict, Union, Tuple, Any, Set, List, Type, Optional
+from typing import (
+	Dict,
+	Union,
+	Tuple,
+	Any,
+	Set,
+	List,
+	Type,
+	Optional,
+	Iterator,
+	Callable,
+)
 from os import PathLike
 from abc import ABC, abstractmethod
 from random import Random
-import zlib
 
 import msgpack
 import numpy as np
@@ -69,6 +80,7 @@ from .allegedb.cache import (
 )
 from .allegedb.window import update_window, update_backward_window
 from .cache import PortalsRulebooksCache
+from .codec import Codec
 from .util import sort_set, AbstractEngine, final_rule, normalize_layout
 from .xcollections import (
 	StringStore,
@@ -92,6 +104,7 @@ from .character import Character, Facade
 from .node import Place, Thing
 from .portal import Portal
 from .query import QueryEngine
+from .rule import EntityBatch, Rule, RulebookPlan
 from . import exc
 
 SlightlyPackedDeltaType = Dict[
@@ -153,13 +166,18 @@ class NextTurn(Signal):
 	called when the simulation runs. Pass them to my ``connect``
 	method.
 
+	With ``delta=False``, don't work out what changed, and return
+	``None`` in place of the delta.
+
 	"""
 
 	def __init__(self, engine: Engine):
 		super().__init__()
 		self.engine = engine
 
-	def __call__(self) -> Tuple[List, DeltaDict]:
+	def __call__(
+		self, *, delta: bool = True
+	) -> Tuple[List, Optional[DeltaDict]]:
 		engine = self.engine
 		for store in engine.stores:
 			if getattr(store, "_need_save", None):
@@ -174,6 +192,8 @@ class NextTurn(Signal):
 				turn=engine.turn,
 				tick=engine.tick,
 			)
+			if not delta:
+				return [], None
 			return [], engine._get_branch_delta(
 				branch=start_branch,
 				turn_from=start_turn,
@@ -211,6 +231,8 @@ class NextTurn(Signal):
 						engine.universal["last_result_idx"] = 0
 						branch, turn, tick = engine._btt()
 						self.send(engine, branch=branch, turn=turn, tick=tick)
+						if not delta:
+							return list(res), None
 						return list(res), engine._get_branch_delta(
 							branch=start_branch,
 							turn_from=start_turn,
@@ -242,13 +264,16 @@ class NextTurn(Signal):
 			turn=engine.turn,
 			tick=engine.tick,
 		)
-		delta = engine._get_branch_delta(
-			branch=engine.branch,
-			turn_from=start_turn,
-			turn_to=engine.turn,
-			tick_from=start_tick,
-			tick_to=engine.tick,
-		)
+		if delta:
+			delta = engine._get_branch_delta(
+				branch=engine.branch,
+				turn_from=start_turn,
+				turn_to=engine.turn,
+				tick_from=start_tick,
+				tick_to=engine.tick,
+			)
+		else:
+			delta = None
 		if results:
 			engine.universal["last_result"] = results
 			engine.universal["last_result_idx"] = 0
@@ -346,7 +371,9 @@ class Engine(AbstractEngine, gORM, Executor):
 	:param threaded_triggers: Whether to evaluate trigger functions in threads.
 		This has performance benefits if you are using a free-threaded build of
 		Python (without a GIL). Defaults to ``True`` when there are workers
-		(see below), ``False`` otherwise.
+		(see below), ``False`` otherwise. If there are no threaded triggers
+		and no workers, the caches don't lock their histories, so don't
+		use the engine from more than one thread at a time then.
 	:param workers: How many subprocesses to use as workers for
 		parallel processing. When ``None`` (the default), use as many
 		subprocesses as we have CPU cores. When ``0``, parallel processing
@@ -357,6 +384,58 @@ class Engine(AbstractEngine, gORM, Executor):
 		side effects. If you don't want this, instead use
 		``workers=1``, which *does* disable parallelism in the case
 		of trigger functions.
+	:param track_trigger_reads: Whether to remember what each trigger
+		function read from the world when it was last evaluated on an
+		entity, and skip evaluating it again until some of that has
+		changed, reusing its previous result instead. Only makes sense
+		if your trigger functions are pure functions of the world state;
+		don't use this if they depend on randomness or the current time.
+		Triggers are then evaluated in this process, one at a time, rather
+		than in threads or worker processes; the workers still do
+		everything else. Default ``False``.
+	:param parallel_actions: Whether to run the actions of rules with
+		the same priority and rulebook in the worker processes, at the
+		same time, rather than one after another. The changes they make
+		are collected and then applied in the usual order. If two actions
+		change the same thing, or make a kind of change that can't be
+		collected this way, or fail, they all get run again in the
+		usual way instead. Only makes sense if those actions don't depend
+		on each other's changes, or on randomness.
+		Has no effect without workers. Default ``False``.
+	:param neighborhood_cache_size: How many neighborhoods, of entities
+		with rules that have a ``neighborhood`` set, to keep in memory
+		between turns. A neighborhood is only looked up again once
+		something in it has moved, or the least recently used
+		neighborhoods have been forgotten to stay within this size.
+		Default 10000.
+	:param hint_cache_size: How many recent lookups each of the
+		caches remembers, so that looking them up again is quick.
+		The least recently used get forgotten. Default 100000.
+	:param profile_rules: Whether to keep count of how many times each
+		trigger, prereq and action has been called by each rule, in each
+		rulebook, how often it returned a true value, and how long it took.
+		See :meth:`rule_profile`. Triggers and actions called in worker
+		processes are timed there, and the timings sent back with their
+		results. Default ``False``.
+	:param worker_start_method: How to start the worker processes; one
+		of the :mod:`multiprocessing` start methods, ``"fork"``,
+		``"forkserver"``, or ``"spawn"``. With ``"fork"``, only available
+		on Unix, the world is packed just once, before starting the
+		workers, and they inherit it, rather than each being sent their
+		own copy after they start. Default ``None``, meaning whatever
+		:mod:`multiprocessing` does by default.
+	:param worker_affinity: How to decide which worker process evaluates
+		the triggers, or runs the actions, for which entity. With
+		``"character"``, each character's entities go to the same worker,
+		so that worker's caches stay warm. Or pass a function that takes
+		an entity and returns a hashable key; entities with the same key
+		go to the same worker. Either way, when a worker would get more
+		than half again its share, the excess goes to the least busy
+		workers. Default ``None``, which splits the entities evenly
+		between the workers, in the order they come.
+	:param worker_codec: How to compress messages to and from the worker
+		processes. A :class:`LiSE.codec.Codec`, or ``"zlib"`` (the default)
+		to compress messages of a kilobyte or more, or ``"none"``.
 
 	"""
 
@@ -410,6 +489,14 @@ class Engine(AbstractEngine, gORM, Executor):
 		enforce_end_of_time: bool = True,
 		threaded_triggers: bool = None,
 		workers: int = None,
+		track_trigger_reads: bool = False,
+		parallel_actions: bool = False,
+		neighborhood_cache_size: int = 10000,
+		hint_cache_size: int = 100000,
+		profile_rules: bool = False,
+		worker_start_method: Optional[str] = None,
+		worker_affinity: Union[str, Callable[[Any], Key], None] = None,
+		worker_codec: Union[Codec, str] = "zlib",
 	):
 		if logfun is None:
 			from logging import getLogger
@@ -432,6 +519,15 @@ class Engine(AbstractEngine, gORM, Executor):
 			raise FileExistsError("Need a directory")
 		self.keep_rules_journal = keep_rules_journal
 		self._keyframe_on_close = keyframe_on_close
+		self._track_trigger_reads = track_trigger_reads
+		self._parallel_actions = parallel_actions
+		self._neighborhood_cache_size = neighborhood_cache_size
+		self.profile_rules = profile_rules
+		self._rule_profile = {}
+		self._rule_profile_lock = Lock()
+		self._trigger_reads_memo = {}
+		self._trigger_reads_changed = {}
+		self._trigger_reads_indexed = None
 		if string:
 			self.string = string
 		else:
@@ -457,12 +553,19 @@ class Engine(AbstractEngine, gORM, Executor):
 		self.schema = schema_cls(self)
 		if connect_string:
 			connect_string = connect_string.split("sqlite:///")[-1]
+		if threaded_triggers is None:
+			threaded_triggers = workers is not None and workers != 0
+		if workers is None:
+			workers = os.cpu_count() or 0
 		super().__init__(
 			connect_string or os.path.join(prefix, "world.db"),
 			clear=clear,
 			connect_args=connect_args,
 			main_branch=main_branch,
 			enforce_end_of_time=enforce_end_of_time,
+			hint_cache_size=hint_cache_size,
+			# The threads that talk to the workers read the caches too
+			threaded=threaded_triggers or workers > 0,
 		)
 		self._things_cache.setdb = self.query.set_thing_loc
 		self._universal_cache.setdb = self.query.universal_set
@@ -473,6 +576,9 @@ class Engine(AbstractEngine, gORM, Executor):
 				self._string_prefix,
 				self.eternal.setdefault("language", "eng"),
 			)
+		for store in (self.trigger, self.prereq, self.action):
+			if hasattr(store, "connect"):
+				store.connect(self._forget_rulebook_plans)
 		self.next_turn = NextTurn(self)
 		self.commit_interval = commit_interval
 		self.query.keyframe_interval = keyframe_interval
@@ -480,6 +586,12 @@ class Engine(AbstractEngine, gORM, Executor):
 		self.query.kf_interval_override = self._detect_kf_interval_override
 		self.flush_interval = flush_interval
 		self._rando = Random()
+		if "random_seed" not in self.eternal:
+			# for random_for, which can't use the shared randomizer's state
+			if random_seed is None:
+				self.eternal["random_seed"] = Random().getrandbits(63)
+			else:
+				self.eternal["random_seed"] = random_seed
 		if "rando_state" in self.universal:
 			self._rando.setstate(self.universal["rando_state"])
 		else:
@@ -496,12 +608,8 @@ class Engine(AbstractEngine, gORM, Executor):
 				self.universal["rando_state"] = rando_state
 		if not self._keyframes_times:
 			self._snap_keyframe_de_novo(*self._btt())
-		if threaded_triggers is None:
-			threaded_triggers = workers is not None and workers != 0
 		if threaded_triggers:
 			self._trigger_pool = ThreadPoolExecutor()
-		if workers is None:
-			workers = os.cpu_count() or 0
 		if workers > 0:
 
 			def sync_log_forever(q):
@@ -511,9 +619,28 @@ class Engine(AbstractEngine, gORM, Executor):
 			for store in self.stores:
 				store.save(reimport=False)
 
-			branches_payload = zlib.compress(self.pack(self._branches))
+			self._worker_codec = Codec.get(worker_codec)
+			branches_payload = self._worker_codec.compress(
+				self.pack(self._branches)
+			)
 			self._worker_last_eternal = dict(self.eternal.items())
-			initial_payload = self._get_worker_kf_payload(-1)
+			self._worker_snapshot: Optional[SharedMemory] = None
+			self._worker_snapshot_size = 0
+			self._worker_snapshot_key = None
+			self._worker_snapshot_lock = Lock()
+			if os.name == "posix":
+				# Share the tracker with the workers, so it's the core
+				# that cleans up the snapshots in shared memory
+				resource_tracker.ensure_running()
+			if worker_affinity == "character":
+				worker_affinity = self._character_affinity
+			self._worker_affinity = worker_affinity
+			ctx = get_context(worker_start_method)
+			if worker_start_method == "fork":
+				# The workers get these when they fork, without pickling
+				inherited = (self._branches, self._pack_worker_snapshot())
+			else:
+				inherited = ()
 
 			self._worker_processes = wp = []
 			self._worker_inputs = wi = []
@@ -521,17 +648,26 @@ class Engine(AbstractEngine, gORM, Executor):
 			self._worker_locks = wlk = []
 			self._worker_log_queues = wl = []
 			self._worker_log_threads = wlt = []
-			self._top_uid = 0
+			# Futures get their uids from several threads, and next() on
+			# a count is atomic, where reading and adding to an int isn't
+			self._uids = count()
 			for i in range(workers):
-				inpipe_there, inpipe_here = Pipe(duplex=False)
-				outpipe_here, outpipe_there = Pipe(duplex=False)
-				logq = Queue()
+				inpipe_there, inpipe_here = ctx.Pipe(duplex=False)
+				outpipe_here, outpipe_there = ctx.Pipe(duplex=False)
+				logq = ctx.Queue()
 				logthread = Thread(
 					target=sync_log_forever, args=(logq,), daemon=True
 				)
-				proc = Process(
+				proc = ctx.Process(
 					target=worker_subprocess,
-					args=(prefix, inpipe_there, outpipe_there, logq),
+					args=(
+						prefix,
+						inpipe_there,
+						outpipe_there,
+						logq,
+						self._worker_codec,
+						*inherited,
+					),
 				)
 				wi.append(inpipe_here)
 				wo.append(outpipe_here)
@@ -541,42 +677,77 @@ class Engine(AbstractEngine, gORM, Executor):
 				wp.append(proc)
 				logthread.start()
 				proc.start()
-				with wlk[-1]:
-					inpipe_here.send_bytes(branches_payload)
-					inpipe_here.send_bytes(initial_payload)
-			self._how_many_futs_running = 0
-			self._fut_manager_thread = Thread(
-				target=self._manage_futs, daemon=True
-			)
-			self._futs_to_start: SimpleQueue[Future] = SimpleQueue()
+				if not inherited:
+					with wlk[-1]:
+						inpipe_here.send_bytes(branches_payload)
+			if not inherited:
+				for lock in wlk:
+					lock.acquire()
+				self._load_worker_snapshot(list(range(workers)))
+				for lock in wlk:
+					lock.release()
+			# Not bounded, because submit() gets called from the threads
+			# that drain this queue, by callbacks of the futures they
+			# finish. With a bound, those threads could all block on a
+			# full queue, and nothing would drain it.
+			self._futs_to_start: SimpleQueue[Optional[Future]] = SimpleQueue()
 			self._uid_to_fut: dict[int, Future] = {}
-			self._fut_manager_thread.start()
+			self._fut_threads = [
+				Thread(target=self._run_futs_forever, args=(i,), daemon=True)
+				for i in range(workers)
+			]
+			for fut_thread in self._fut_threads:
+				fut_thread.start()
 			self.trigger.connect(self._reimport_trigger_functions)
+			self.action.connect(self._reimport_action_functions)
 			self.function.connect(self._reimport_worker_functions)
 			self.method.connect(self._reimport_worker_methods)
+			for store in self.stores:
+				if hasattr(store, "connect"):
+					store.connect(self._forget_worker_snapshot)
 			self._worker_updated_btts = [self._btt()] * workers
 		self._rules_iter = self._follow_rules()
 
 	def _call_in_subprocess(
-		self, uid, method, func_name, future: Future, *args, **kwargs
+		self, i, uid, method, func_name, future: Future, *args, **kwargs
 	):
-		i = uid % len(self._worker_inputs)
-		argbytes = zlib.compress(
+		argbytes = self._worker_codec.compress(
 			self.pack((uid, method, (func_name, *args), kwargs))
 		)
 		with self._worker_locks[i]:
 			self._update_worker_process_state(i)
 			self._worker_inputs[i].send_bytes(argbytes)
 			output = self._worker_outputs[i].recv_bytes()
-		got_uid, result = self.unpack(zlib.decompress(output))
+		got_uid, result = self.unpack(self._worker_codec.decompress(output))
 		assert got_uid == uid
-		self._how_many_futs_running -= 1
-		del self._uid_to_fut[uid]
 		if isinstance(result, Exception):
 			future.set_exception(result)
 		else:
 			future.set_result(result)
 
+	def _run_futs_forever(self, i: int) -> None:
+		"""Run submitted futures in worker ``i``, until I get ``None``
+
+		There's one of these threads per worker, and they all take from
+		the same queue, so whichever worker is free next runs the
+		next future. They block on the queue and on the worker's pipe,
+		and so don't use any CPU while waiting.
+
+		"""
+		while True:
+			fut = self._futs_to_start.get()
+			if fut is None:
+				return
+			if fut.set_running_or_notify_cancel():
+				method, func_name, args, kwargs = fut._call
+				try:
+					self._call_in_subprocess(
+						i, fut.uid, method, func_name, fut, *args, **kwargs
+					)
+				except Exception as ex:
+					fut.set_exception(ex)
+			self._uid_to_fut.pop(fut.uid, None)
+
 	def snap_keyframe(
 		self, silent=False, update_worker_processes=True
 	) -> Optional[dict]:
@@ -592,46 +763,38 @@ class Engine(AbstractEngine, gORM, Executor):
 			raise RuntimeError("LiSE was launched with no worker processes")
 		if fn.__module__ == "function":
 			method = "_call_function"
+			store = self.function
 		elif fn.__module__ == "method":
 			method = "_call_method"
+			store = self.method
 		else:
 			raise ValueError(
 				"Function is not stored in this LiSE engine. "
 				"Use the engine's attributes `function` and `method` to store it."
 			)
-		uid = self._top_uid
+		# Make sure the workers have the function before they're asked
+		# to call it. Saving tells them to reimport.
+		store.save_if_changed()
+		uid = next(self._uids)
 		ret = Future()
 		ret.uid = uid
-		ret._t = Thread(
-			target=self._call_in_subprocess,
-			args=(uid, method, fn.__name__, ret, *args),
-			kwargs=kwargs,
-		)
-		self._top_uid += 1
+		ret._call = (method, fn.__name__, args, kwargs)
 		self._uid_to_fut[uid] = ret
 		self._futs_to_start.put(ret)
 		return ret
 
-	def _manage_futs(self):
-		while True:
-			while self._how_many_futs_running < len(self._worker_processes):
-				try:
-					fut = self._futs_to_start.get()
-				except Empty:
-					break
-				if not fut.running() and fut.set_running_or_notify_cancel():
-					fut._t.start()
-					self._how_many_futs_running += 1
-			sleep(0.001)
-
 	def shutdown(self, wait=True, *, cancel_futures=False) -> None:
 		if not hasattr(self, "_worker_processes"):
 			return
 		if cancel_futures:
-			for fut in self._uid_to_fut.values():
+			for fut in list(self._uid_to_fut.values()):
 				fut.cancel()
 		if wait:
-			futwait(self._uid_to_fut.values())
+			futwait(list(self._uid_to_fut.values()))
+		for _ in self._fut_threads:
+			self._futs_to_start.put(None)
+		for fut_thread in self._fut_threads:
+			fut_thread.join()
 		self._uid_to_fut = {}
 		for i, (lock, pipein, pipeout, proc) in enumerate(
 			zip(
@@ -644,11 +807,15 @@ class Engine(AbstractEngine, gORM, Executor):
 			with lock:  # deadlock here.
 				pipein.send_bytes(b"shutdown")
 				recvd = pipeout.recv_bytes()
-				assert (
-					recvd == b"done"
-				), f"expected 'done', got {self.unpack(zlib.decompress(recvd))}"
+				assert recvd == b"done", (
+					f"expected 'done', got {self.unpack(self._worker_codec.decompress(recvd))}"
+				)
 				proc.join()
 				proc.close()
+		if self._worker_snapshot is not None:
+			self._worker_snapshot.close()
+			self._worker_snapshot.unlink()
+			self._worker_snapshot = None
 
 	def _detect_kf_interval_override(self):
 		if getattr(self, "_no_kc", False):
@@ -658,72 +825,159 @@ class Engine(AbstractEngine, gORM, Executor):
 			self._kf_overridden = False
 			return False
 
+	def _each_worker_when_free(self) -> Iterator[int]:
+		"""Iterate over the indices of the workers, holding each one's lock
+
+		Workers that aren't busy come first. Then I wait for the rest,
+		one at a time.
+
+		"""
+		busy = []
+		for i, lock in enumerate(self._worker_locks):
+			if not lock.acquire(blocking=False):
+				busy.append(i)
+				continue
+			try:
+				yield i
+			finally:
+				lock.release()
+		for i in busy:
+			with self._worker_locks[i]:
+				yield i
+
+	def _broadcast_to_workers(self, payload: bytes) -> None:
+		"""Send the same already-encoded message to every worker"""
+		for i in self._each_worker_when_free():
+			self._worker_inputs[i].send_bytes(payload)
+
 	def _reimport_trigger_functions(self, *args, attr, **kwargs):
 		if attr is not None:
 			return
-		payload = zlib.compress(self.pack((-1, "_reimport_triggers", (), {})))
-		for lock, pipe in zip(self._worker_locks, self._worker_inputs):
-			with lock:
-				pipe.send_bytes(payload)
+		self._broadcast_to_workers(
+			self._worker_codec.compress(
+				self.pack((-1, "_reimport_triggers", (), {}))
+			)
+		)
+
+	def _reimport_action_functions(self, *args, attr, **kwargs):
+		if attr is not None:
+			return
+		self._broadcast_to_workers(
+			self._worker_codec.compress(
+				self.pack((-1, "_reimport_actions", (), {}))
+			)
+		)
 
 	def _reimport_worker_functions(self, *args, attr, **kwargs):
 		if attr is not None:
 			return
-		payload = zlib.compress(self.pack((-1, "_reimport_functions", (), {})))
-		for lock, pipe in zip(self._worker_locks, self._worker_inputs):
-			with lock:
-				pipe.send_bytes(payload)
+		self._broadcast_to_workers(
+			self._worker_codec.compress(
+				self.pack((-1, "_reimport_functions", (), {}))
+			)
+		)
 
 	def _reimport_worker_methods(self, *args, attr, **kwargs):
 		if attr is not None:
 			return
-		payload = zlib.compress(self.pack((-1, "_reimport_methods", (), {})))
-		for lock, pipe in zip(self._worker_locks, self._worker_inputs):
-			with lock:
-				pipe.send_bytes(payload)
-
-	def _get_worker_kf_payload(self, uid: int = -1) -> bytes:
-		# I'm not using the uid at the moment, because this doesn't return anything
-		return zlib.compress(
-			self.pack(
-				(
-					uid,
-					"_upd_from_game_start",
-					(
-						None,
-						None,
-						None,
-						None,
-						(
-							self.snap_keyframe(update_worker_processes=False),
-							dict(self.eternal.items()),
-							dict(self.function.iterplain()),
-							dict(self.method.iterplain()),
-							dict(self.trigger.iterplain()),
-							dict(self.prereq.iterplain()),
-							dict(self.action.iterplain()),
-						),
-					),
-					{},
-				)
+		self._broadcast_to_workers(
+			self._worker_codec.compress(
+				self.pack((-1, "_reimport_methods", (), {}))
 			)
 		)
 
+	def _forget_worker_snapshot(self, *args, **kwargs) -> None:
+		self._worker_snapshot_key = None
+
+	def _pack_worker_snapshot(self) -> bytes:
+		return self.pack(
+			(
+				self.snap_keyframe(update_worker_processes=False),
+				dict(self.eternal.items()),
+				dict(self.function.iterplain()),
+				dict(self.method.iterplain()),
+				dict(self.trigger.iterplain()),
+				dict(self.prereq.iterplain()),
+				dict(self.action.iterplain()),
+			)
+		)
+
+	def _publish_worker_snapshot(self) -> Tuple[str, int]:
+		"""Put the whole world state in shared memory for the workers
+
+		Only packs it again if the time, the eternal mapping, or any of
+		the function stores changed since last time.
+
+		Return the name of the shared memory block, and how many bytes
+		of it hold the snapshot.
+
+		"""
+		btt = self._btt()
+		eternal = dict(self.eternal.items())
+		if self._worker_snapshot_key == (btt, eternal):
+			return self._worker_snapshot.name, self._worker_snapshot_size
+		payload = self._pack_worker_snapshot()
+		size = len(payload)
+		shm = SharedMemory(create=True, size=max(size, 1))
+		shm.buf[:size] = payload
+		old = self._worker_snapshot
+		self._worker_snapshot = shm
+		self._worker_snapshot_size = size
+		self._worker_snapshot_key = (btt, eternal)
+		if old is not None:
+			# Every worker that was sent the old snapshot has loaded it
+			old.close()
+			old.unlink()
+		return shm.name, size
+
+	def _load_worker_snapshot(self, workers: List[int]) -> None:
+		"""Have some workers replace their world state with a snapshot
+
+		The snapshot is only packed once, into shared memory, and each
+		worker reads it from there. Wait for them all to finish loading.
+
+		You need to hold the locks for all the ``workers`` already.
+
+		"""
+		with self._worker_snapshot_lock:
+			name, size = self._publish_worker_snapshot()
+			sent = []
+			for i in workers:
+				uid = next(self._uids)
+				self._worker_inputs[i].send_bytes(
+					self._worker_codec.compress(
+						self.pack(
+							(uid, "_upd_from_snapshot", (name, size), {})
+						)
+					)
+				)
+				sent.append((i, uid))
+			for i, uid in sent:
+				got_uid, result = self.unpack(
+					self._worker_codec.decompress(
+						self._worker_outputs[i].recv_bytes()
+					)
+				)
+				assert got_uid == uid
+				if isinstance(result, Exception):
+					raise result
+
 	def _call_a_subproxy(self, uid, method: str, *args, **kwargs):
-		argbytes = zlib.compress(self.pack((uid, method, args, kwargs)))
+		argbytes = self._worker_codec.compress(
+			self.pack((uid, method, args, kwargs))
+		)
 		i = uid % len(self._worker_inputs)
 		with self._worker_locks[i]:
 			self._worker_inputs[i].send_bytes(argbytes)
 			output = self._worker_outputs[i].recv_bytes()
-		got_uid, ret = self.unpack(zlib.decompress(output))
+		got_uid, ret = self.unpack(self._worker_codec.decompress(output))
 		assert got_uid == uid
 		if isinstance(ret, Exception):
 			raise ret
 		return ret
 
 	def _call_any_subproxy(self, method: str, *args, **kwargs):
-		uid = self._top_uid
-		self._top_uid += 1
+		uid = next(self._uids)
 		return self._call_a_subproxy(uid, method, *args, **kwargs)
 
 	def _call_every_subproxy(self, method: str, *args, **kwargs):
@@ -731,18 +985,18 @@ class Engine(AbstractEngine, gORM, Executor):
 		for lock in self._worker_locks:
 			lock.acquire()
 		uids = []
-		for _ in range(len(self._worker_processes)):
-			uids.append(self._top_uid)
-			argbytes = zlib.compress(
-				self.pack((self._top_uid, method, args, kwargs))
+		for i in range(len(self._worker_processes)):
+			uid = next(self._uids)
+			uids.append((i, uid))
+			argbytes = self._worker_codec.compress(
+				self.pack((uid, method, args, kwargs))
 			)
-			i = self._top_uid % len(self._worker_processes)
-			self._top_uid += 1
 			self._worker_inputs[i].send_bytes(argbytes)
-		for uid in uids:
-			i = uid % len(self._worker_processes)
+		for i, uid in uids:
 			outbytes = self._worker_outputs[i].recv_bytes()
-			got_uid, retval = self.unpack(zlib.decompress(outbytes))
+			got_uid, retval = self.unpack(
+				self._worker_codec.decompress(outbytes)
+			)
 			assert got_uid == uid
 			if isinstance(retval, Exception):
 				raise retval
@@ -751,6 +1005,203 @@ class Engine(AbstractEngine, gORM, Executor):
 			lock.release()
 		return ret
 
+	@staticmethod
+	def _character_affinity(entity) -> Key:
+		return entity.character.name
+
+	def _route_to_workers(self, batch: list) -> List[List[int]]:
+		"""Decide which worker gets which items of ``batch``
+
+		``batch`` is a list of pairs, each with an entity second.
+		Return a list, for each worker, of the indices of the items
+		it gets.
+
+		"""
+		n = len(self._worker_processes)
+		share = -(-len(batch) // n)  # ceiling division
+		affinity = self._worker_affinity
+		if affinity is None:
+			return [
+				list(range(i, min(i + share, len(batch))))
+				for i in range(0, len(batch), share)
+			]
+		routed = [[] for _ in range(n)]
+		for j, (_, entity) in enumerate(batch):
+			routed[hash(affinity(entity)) % n].append(j)
+		# Work stealing: nobody gets much more than their share
+		limit = share + share // 2
+		for busy in routed:
+			while len(busy) > limit:
+				idle = min(routed, key=len)
+				if len(idle) >= share:
+					break
+				idle.append(busy.pop())
+		return routed
+
+	def _call_subproxies_in_chunks(
+		self, method: str, batch: list, **kwargs
+	) -> List[Tuple[List[int], Any]]:
+		"""Split ``batch`` between the workers, and call ``method`` on them
+
+		``batch`` is split into one chunk per worker, according to
+		the ``worker_affinity`` I was started with, and each chunk is sent
+		in a single message, along with any ``kwargs``. Return a list of pairs of the indices in
+		``batch`` of each chunk, and what the worker returned for it.
+
+		"""
+		if not batch:
+			return []
+		routed = [
+			(i, idxs)
+			for i, idxs in enumerate(self._route_to_workers(batch))
+			if idxs
+		]
+		for lock in self._worker_locks:
+			lock.acquire()
+		try:
+			uids = []
+			for i, idxs in routed:
+				uid = next(self._uids)
+				uids.append(uid)
+				chunk = [batch[j] for j in idxs]
+				self._worker_inputs[i].send_bytes(
+					self._worker_codec.compress(
+						self.pack((uid, method, (chunk,), kwargs))
+					)
+				)
+			ret = []
+			ex = None
+			for (i, idxs), uid in zip(routed, uids):
+				got_uid, result = self.unpack(
+					self._worker_codec.decompress(
+						self._worker_outputs[i].recv_bytes()
+					)
+				)
+				assert got_uid == uid
+				if isinstance(result, Exception):
+					# keep receiving, so the other pipes stay in sync
+					ex = ex or result
+					continue
+				ret.append((idxs, result))
+		finally:
+			for lock in self._worker_locks:
+				lock.release()
+		if ex is not None:
+			raise ex
+		return ret
+
+	def _eval_triggers_in_subprocesses(
+		self,
+		batch: List[Tuple[Tuple[str, ...], Any]],
+		timings: Optional[List[Optional[List[float]]]] = None,
+	) -> List[Optional[bool]]:
+		"""Evaluate a whole batch of triggers in the worker processes
+
+		``batch`` is a list of pairs of trigger function names and the
+		entity to call them on. The workers reply with bitmaps, which I
+		unpack into one boolean per pair, in the same order as ``batch``.
+		Pairs whose triggers failed in the worker, such as by asking
+		for a random number, get ``None`` instead.
+
+		If you pass a list as long as ``batch`` for ``timings``, I'll
+		put in it how many seconds each trigger that got called took,
+		for each pair.
+
+		"""
+		ret = [None] * len(batch)
+		kwargs = {} if timings is None else {"profile": True}
+		for idxs, (bitmap, failed, *times) in self._call_subproxies_in_chunks(
+			"_eval_triggers", batch, **kwargs
+		):
+			results = (
+				np.unpackbits(
+					np.frombuffer(bitmap, dtype=np.uint8), count=len(idxs)
+				)
+				.astype(bool)
+				.tolist()
+			)
+			for i in failed:
+				results[i] = None
+			for j, result in zip(idxs, results):
+				ret[j] = result
+			if times:
+				for j, seconds in zip(idxs, times[0]):
+					timings[j] = seconds
+		return ret
+
+	def _do_actions_in_subprocesses(
+		self, batch: List[Tuple[Tuple[str, ...], Any]], profile: bool = False
+	) -> List[Optional[tuple]]:
+		"""Run a whole batch of actions in the worker processes
+
+		``batch`` is a list of pairs of action function names and the
+		entity to call them on. Nothing gets changed. Instead, return,
+		for each pair, either ``None`` if the actions failed, or a pair
+		of the actions' results and the commands for the changes
+		they want to make.
+
+		With ``profile=True``, the pairs are triples instead, the third
+		item being how many seconds each action that got called took.
+
+		"""
+		ret = [None] * len(batch)
+		kwargs = {"profile": True} if profile else {}
+		for idxs, results in self._call_subproxies_in_chunks(
+			"_do_actions", batch, **kwargs
+		):
+			for j, result in zip(idxs, results):
+				ret[j] = result
+		return ret
+
+	@staticmethod
+	def _worker_write_key(cmd: dict) -> Optional[tuple]:
+		"""Return what a command from a worker's action would change
+
+		Or ``None`` if it's not a command I know how to replay.
+
+		"""
+		command = cmd["command"]
+		if command in ("set_node_stat", "del_node_stat"):
+			return "node", cmd["char"], cmd["node"], cmd["k"]
+		elif command == "set_thing_location":
+			return "node", cmd["char"], cmd["thing"], "location"
+		elif command in ("set_portal_stat", "del_portal_stat"):
+			return "portal", cmd["char"], cmd["orig"], cmd["dest"], cmd["k"]
+		elif command in ("set_character_stat", "del_character_stat"):
+			return "character", cmd["char"], cmd["k"]
+		elif command in ("set_universal", "del_universal"):
+			return "universal", cmd["k"]
+		return None
+
+	def _replay_worker_write(self, cmd: dict) -> None:
+		"""Make a change that an action in a worker process asked for"""
+		command = cmd["command"]
+		if command == "set_node_stat":
+			self.character[cmd["char"]].node[cmd["node"]][cmd["k"]] = cmd["v"]
+		elif command == "del_node_stat":
+			del self.character[cmd["char"]].node[cmd["node"]][cmd["k"]]
+		elif command == "set_thing_location":
+			thing = self.character[cmd["char"]].thing[cmd["thing"]]
+			thing["location"] = cmd["loc"]
+		elif command == "set_portal_stat":
+			portals = self.character[cmd["char"]].portal
+			portal = portals[cmd["orig"]][cmd["dest"]]
+			portal[cmd["k"]] = cmd["v"]
+		elif command == "del_portal_stat":
+			portals = self.character[cmd["char"]].portal
+			portal = portals[cmd["orig"]][cmd["dest"]]
+			del portal[cmd["k"]]
+		elif command == "set_character_stat":
+			self.character[cmd["char"]].stat[cmd["k"]] = cmd["v"]
+		elif command == "del_character_stat":
+			del self.character[cmd["char"]].stat[cmd["k"]]
+		elif command == "set_universal":
+			self.universal[cmd["k"]] = cmd["v"]
+		elif command == "del_universal":
+			del self.universal[cmd["k"]]
+		else:
+			raise ValueError("Can't replay command", command)
+
 	def _init_graph(
 		self,
 		name: Key,
@@ -890,6 +1341,8 @@ class Engine(AbstractEngine, gORM, Executor):
 			self._actions_cache.load(rule_actions)
 		if rule_neighborhoods := loaded.pop("rule_neighborhoods"):
 			self._neighborhoods_cache.load(rule_neighborhoods)
+		if rule_batch := loaded.pop("rule_batch", None):
+			self._batch_cache.load(rule_batch)
 		for graph, rowdict in loaded.items():
 			if rowdict.get("things"):
 				self._things_cache.load(rowdict["things"])
@@ -945,6 +1398,8 @@ class Engine(AbstractEngine, gORM, Executor):
 			self._actions_cache.load(rule_actions)
 		if rule_neighborhoods := loaded.pop("rule_neighborhoods", None):
 			self._neighborhoods_cache.load(rule_neighborhoods)
+		if rule_batch := loaded.pop("rule_batch", None):
+			self._batch_cache.load(rule_batch)
 		for loaded_graph, data in loaded.items():
 			if data.get("things"):
 				self._things_cache.load(data["things"])
@@ -997,7 +1452,9 @@ class Engine(AbstractEngine, gORM, Executor):
 		from .rule import AllRuleBooks, AllRules
 
 		super()._init_caches()
-		self._neighbors_cache = {}
+		self._neighbors_cache = OrderedDict()
+		self._rulebook_plans = {}
+		self._rulebook_plans_time = None
 		self._things_cache = ThingsCache(self)
 		self._node_contents_cache = NodeContentsCache(self)
 		self.character = self.graph = CharacterMapping(self)
@@ -1030,6 +1487,8 @@ class Engine(AbstractEngine, gORM, Executor):
 		self._actions_cache.name = "actions_cache"
 		self._neighborhoods_cache = InitializedEntitylessCache(self)
 		self._neighborhoods_cache.name = "neighborhoods_cache"
+		self._batch_cache = InitializedEntitylessCache(self)
+		self._batch_cache.name = "batch_cache"
 		self._node_rules_handled_cache = NodeRulesHandledCache(self)
 		self._node_rules_handled_cache.name = "node_rules_handled_cache"
 		self._portal_rules_handled_cache = PortalRulesHandledCache(self)
@@ -1111,6 +1570,21 @@ class Engine(AbstractEngine, gORM, Executor):
 	) -> portal_cls:
 		return self.portal_cls(graph, orig, dest)
 
+	def _get_batch_rules_kf(self, branch: str, turn: int, tick: int) -> dict:
+		"""Return a keyframe for the batch cache
+
+		It only has the batch rules in it.
+
+		"""
+		ret = {}
+		for rule in self._rules_cache:
+			try:
+				if self._batch_cache.retrieve(rule, branch, turn, tick):
+					ret[rule] = True
+			except KeyError:
+				pass
+		return ret
+
 	def _copy_kf(self, branch_from, branch_to, turn, tick):
 		super()._copy_kf(branch_from, branch_to, turn, tick)
 		for cache in (
@@ -1118,6 +1592,7 @@ class Engine(AbstractEngine, gORM, Executor):
 			self._triggers_cache,
 			self._prereqs_cache,
 			self._actions_cache,
+			self._batch_cache,
 			self._rulebooks_cache,
 			self._unitness_cache,
 			self._characters_rulebooks_cache,
@@ -1164,6 +1639,7 @@ class Engine(AbstractEngine, gORM, Executor):
 				"actions": self._actions_cache.get_keyframe(
 					branch_to, turn, tick
 				),
+				"batch": self._batch_cache.get_keyframe(branch_to, turn, tick),
 			},
 			self._rulebooks_cache.get_keyframe(branch_to, turn, tick),
 		)
@@ -1199,6 +1675,9 @@ class Engine(AbstractEngine, gORM, Executor):
 		self._triggers_cache.set_keyframe(branch, turn, tick, rule["triggers"])
 		self._prereqs_cache.set_keyframe(branch, turn, tick, rule["prereqs"])
 		self._actions_cache.set_keyframe(branch, turn, tick, rule["actions"])
+		self._batch_cache.set_keyframe(
+			branch, turn, tick, rule.get("batch", {})
+		)
 		self._rulebooks_cache.set_keyframe(branch, turn, tick, rulebook)
 
 		ret = super()._get_keyframe(
@@ -2309,11 +2788,18 @@ class Engine(AbstractEngine, gORM, Executor):
 		self._triggers_cache.set_keyframe(branch, turn, tick, trigs)
 		self._prereqs_cache.set_keyframe(branch, turn, tick, preqs)
 		self._actions_cache.set_keyframe(branch, turn, tick, acts)
+		batch = self._get_batch_rules_kf(branch, turn, tick)
+		self._batch_cache.set_keyframe(branch, turn, tick, batch)
 		self._rulebooks_cache.set_keyframe(branch, turn, tick, rbs)
 		self.query.keyframe_extension_insert(
 			*now,
 			univ,
-			{"triggers": trigs, "prereqs": preqs, "actions": acts},
+			{
+				"triggers": trigs,
+				"prereqs": preqs,
+				"actions": acts,
+				"batch": batch,
+			},
 			rbs,
 		)
 		super()._snap_keyframe_from_delta(then, now, delta)
@@ -2572,60 +3058,58 @@ class Engine(AbstractEngine, gORM, Executor):
 		)
 
 	def _update_all_worker_process_states(self, clobber=False):
-		for lock in self._worker_locks:
-			lock.acquire()
-		kf_payload = None
-		deltas = {}
-		for i in range(len(self._worker_processes)):
-			branch_from, turn_from, tick_from = self._worker_updated_btts[i]
-			old_eternal = self._worker_last_eternal
-			new_eternal = self._worker_last_eternal = dict(
-				self.eternal.items()
-			)
-			eternal_delta = {
-				k: new_eternal.get(k)
-				for k in old_eternal.keys() | new_eternal.keys()
-				if old_eternal.get(k) != new_eternal.get(k)
-			}
-			if not clobber and branch_from == self.branch:
-				if (branch_from, turn_from, tick_from) in deltas:
-					delt = deltas[branch_from, turn_from, tick_from]
-				else:
-					delt = deltas[branch_from, turn_from, tick_from] = (
-						self._get_branch_delta(
-							branch_from,
-							turn_from,
-							tick_from,
-							self.turn,
-							self.tick,
-						)
-					)
+		"""Bring every worker up to the present time
+
+		Workers that were last updated at the same time all get the same
+		delta, so it's only encoded once. Workers in another branch, or
+		all of them if ``clobber``, load a snapshot of the whole world
+		instead.
+
+		"""
+		old_eternal = self._worker_last_eternal
+		new_eternal = self._worker_last_eternal = dict(self.eternal.items())
+		eternal_delta = {
+			k: new_eternal.get(k)
+			for k in old_eternal.keys() | new_eternal.keys()
+			if old_eternal.get(k) != new_eternal.get(k)
+		}
+		branch, turn, tick = now = self._btt()
+		payloads = {}
+		stale = []
+		for i in self._each_worker_when_free():
+			btt_from = self._worker_updated_btts[i]
+			if clobber or btt_from[0] != branch:
+				stale.append(i)
+				continue
+			if btt_from == now and not eternal_delta:
+				continue
+			if btt_from not in payloads:
+				delt = self._get_branch_delta(*btt_from, turn, tick)
 				if eternal_delta:
 					delt["eternal"] = eternal_delta
-				argbytes = zlib.compress(
+				payloads[btt_from] = self._worker_codec.compress(
 					self.pack(
 						(
 							-1,
 							"_upd",
-							(
-								None,
-								self.branch,
-								self.turn,
-								self.tick,
-								(None, delt),
-							),
+							(None, branch, turn, tick, (None, delt)),
 							{},
 						)
 					)
 				)
-				self._worker_inputs[i].send_bytes(argbytes)
-			else:
-				if kf_payload is None:
-					kf_payload = self._get_worker_kf_payload(-1)
-				self._worker_inputs[i].send_bytes(kf_payload)
-			self._worker_updated_btts[i] = self._btt()
-		for lock in self._worker_locks:
-			lock.release()
+			self._worker_inputs[i].send_bytes(payloads[btt_from])
+			self._worker_updated_btts[i] = now
+		if not stale:
+			return
+		for i in stale:
+			self._worker_locks[i].acquire()
+		try:
+			self._load_worker_snapshot(stale)
+			for i in stale:
+				self._worker_updated_btts[i] = now
+		finally:
+			for i in stale:
+				self._worker_locks[i].release()
 
 	def _update_worker_process_state(self, i):
 		branch_from, turn_from, tick_from = self._worker_updated_btts[i]
@@ -2641,7 +3125,7 @@ class Engine(AbstractEngine, gORM, Executor):
 				branch_from, turn_from, tick_from, self.turn, self.tick
 			)
 			delt["eternal"] = eternal_delta
-			argbytes = zlib.compress(
+			argbytes = self._worker_codec.compress(
 				self.pack(
 					(
 						-1,
@@ -2659,9 +3143,109 @@ class Engine(AbstractEngine, gORM, Executor):
 			)
 			self._worker_inputs[i].send_bytes(argbytes)
 		else:
-			self._worker_inputs[i].send_bytes(self._get_worker_kf_payload())
+			self._load_worker_snapshot([i])
 		self._worker_updated_btts[i] = self._btt()
 
+	def _index_trigger_read_changes(self, branch: str, turn: int) -> None:
+		"""Note the last turn on which each key in each cache changed
+
+		Only looks at the turns since the last time this was called,
+		unless we're in a different branch or an earlier turn now, in
+		which case the memos of trigger results get thrown out.
+
+		"""
+		indexed = self._trigger_reads_indexed
+		changed = self._trigger_reads_changed
+		if indexed is None or indexed[0] != branch or indexed[1] > turn:
+			self._trigger_reads_memo.clear()
+			changed.clear()
+			turn_from = turn
+		else:
+			turn_from = indexed[1]
+		for cache in self._caches:
+			if branch not in cache.settings:
+				continue
+			turns = cache.settings[branch]
+			for r in range(turn_from, turn + 1):
+				if r not in turns:
+					continue
+				for tup in turns[r].values():
+					key = (cache, *tup[:-1])
+					for i in range(2, len(key) + 1):
+						changed[key[:i]] = r
+		self._trigger_reads_indexed = (branch, turn)
+
+	def _moved_nodes(self, branch: str, turn: int) -> Dict[Key, Set[Key]]:
+		"""Get the names of nodes that moved on the given turn, by character
+
+		A node "moved" if it was created or deleted, if a portal to or
+		from it was, or if it's a thing that changed location. The
+		thing's old and new locations count as having moved too, since
+		their contents changed.
+
+		"""
+		ret = defaultdict(set)
+		if branch in self._nodes_cache.settings:
+			turns = self._nodes_cache.settings[branch]
+			if turn in turns:
+				for charn, node, _ in turns[turn].values():
+					ret[charn].add(node)
+		if branch in self._edges_cache.settings:
+			turns = self._edges_cache.settings[branch]
+			if turn in turns:
+				for charn, orig, dest, _, _ in turns[turn].values():
+					ret[charn].add(orig)
+					ret[charn].add(dest)
+		for journal in (
+			self._things_cache.settings,
+			self._things_cache.presettings,
+		):
+			if branch not in journal:
+				continue
+			turns = journal[branch]
+			if turn not in turns:
+				continue
+			for charn, thing, loc in turns[turn].values():
+				ret[charn].add(thing)
+				if loc is not None:
+					ret[charn].add(loc)
+		return ret
+
+	def _forget_rulebook_plans(self, *args, **kwargs) -> None:
+		self._rulebook_plans.clear()
+		self._rulebook_plans_time = None
+
+	def _check_rulebook_plans(self, branch: str, turn: int) -> None:
+		"""Forget the rulebook plans, if the rules might've changed since
+
+		They're kept so long as we stay in the same branch and don't go
+		back in time, and the rules journal has nothing in it since they
+		were made.
+
+		"""
+		planned = self._rulebook_plans_time
+		if planned is not None:
+			plan_branch, plan_turn = planned
+			if plan_branch == branch and plan_turn <= turn:
+				for cache in (
+					self._rulebooks_cache,
+					self._triggers_cache,
+					self._prereqs_cache,
+					self._actions_cache,
+					self._neighborhoods_cache,
+					self._batch_cache,
+				):
+					if branch not in cache.settings:
+						continue
+					turns = cache.settings[branch]
+					if any(r in turns for r in range(plan_turn, turn + 1)):
+						break
+				else:
+					self._rulebook_plans_time = (branch, turn)
+					return
+		self._rulebook_plans.clear()
+		self._rulebook_plans_time = (branch, turn)
+
 	def _follow_rules(self):
 		# TODO: roll back changes done by rules that raise an exception
 		# TODO: if there's a paradox while following some rule,
@@ -2674,13 +3258,58 @@ class Engine(AbstractEngine, gORM, Executor):
 
 		branch, turn, tick = self._btt()
 		charmap = self.character
-		rulemap = self.rule
-		pool = getattr(self, "_trigger_pool", None)
+		workers = hasattr(self, "_worker_processes")
+		track_reads = self._track_trigger_reads
+		# The worker processes get all their triggers in one batch,
+		# so there's nothing for the thread pool to do in that case.
+		# Tracking reads means setting them up on the caches, which
+		# every thread would share, and which the workers don't have,
+		# so when tracking, evaluate triggers here, one at a time
+		if workers or track_reads:
+			pool = None
+		else:
+			pool = getattr(self, "_trigger_pool", None)
 		if pool:
 			submit = pool.submit
 		else:
 			submit = partial
 		todo = defaultdict(list)
+		trig_batch = []
+		profile = self._rule_profile if self.profile_rules else None
+		profile_lock = self._rule_profile_lock
+
+		def tally(key: tuple, res_true: bool, elapsed: float) -> None:
+			with profile_lock:
+				if key in profile:
+					stats = profile[key]
+				else:
+					stats = profile[key] = [0, 0, 0.0]
+				stats[0] += 1
+				stats[1] += res_true
+				stats[2] += elapsed
+
+		def profiled(kind: str, rulebook: Key, rule: Rule, fun: FunctionType):
+			"""Wrap ``fun`` to count its calls in the rule profile
+
+			Unless we're not profiling, in which case, return it as-is.
+
+			"""
+			if profile is None:
+				return fun
+
+			def profiling(entity):
+				start = perf_counter()
+				res = fun(entity)
+				elapsed = perf_counter() - start
+				if isinstance(entity, EntityBatch):
+					res_true = bool(np.any(res))
+				else:
+					res_true = bool(res)
+				key = (rulebook, rule.name, kind, fun.__name__)
+				tally(key, res_true, elapsed)
+				return res
+
+			return profiling
 
 		def changed(entity: tuple) -> bool:
 			if len(entity) == 1:
@@ -2707,11 +3336,56 @@ class Engine(AbstractEngine, gORM, Executor):
 				return False
 			return entikey in vbranchesb[turn].entikeys
 
-		if hasattr(self, "_worker_processes") and self.turn > 0:
+		if workers and self.turn > 0:
 			self._update_all_worker_process_states()
 			# Now we can evaluate trigger functions in the worker processes,
 			# in parallel.
 
+		if track_reads:
+			self._index_trigger_read_changes(branch, turn)
+			memos = self._trigger_reads_memo
+			last_changed = self._trigger_reads_changed.get
+			caches = self._caches
+			trigger_store = self.trigger
+			char_cls = self.char_cls
+
+			def eval_trigger_tracking_reads(rulebook, rule, entity) -> bool:
+				if isinstance(entity, char_cls):
+					memo_key = (rule.name, entity.name)
+				elif hasattr(entity, "orig"):
+					memo_key = (
+						rule.name,
+						entity.graph.name,
+						entity.orig,
+						entity.dest,
+					)
+				else:
+					memo_key = (rule.name, entity.graph.name, entity.node)
+				trigger_names = rule.trigger_names
+				if memo_key in memos:
+					memo_turn, memo_names, reads, res = memos[memo_key]
+					if memo_names == trigger_names and all(
+						last_changed(read, -1) < memo_turn for read in reads
+					):
+						return res
+				reads = set()
+				for cache in caches:
+					cache.reads = reads
+				try:
+					res = False
+					for name in trigger_names:
+						trigger = getattr(trigger_store, name)
+						if profiled("triggers", rulebook, rule, trigger)(
+							entity
+						):
+							res = True
+							break
+				finally:
+					for cache in caches:
+						cache.reads = None
+				memos[memo_key] = (turn, trigger_names, reads, res)
+				return res
+
 		def check_triggers(
 			prio, rulebook, rule, handled_fun, entity, neighbors=None
 		):
@@ -2719,13 +3393,30 @@ class Engine(AbstractEngine, gORM, Executor):
 				any(changed(neighbor) for neighbor in neighbors)
 			):
 				return False
-			for trigger in rule.triggers:
-				if hasattr(self, "_worker_processes"):
-					res = self._call_any_subproxy(
-						"_eval_trigger", trigger.__name__, entity
+			if track_reads:
+				if eval_trigger_tracking_reads(rulebook, rule, entity):
+					todo[prio, rulebook].append((rule, handled_fun, entity))
+					return True
+				handled_fun(self.tick)
+				return False
+			if workers:
+				trigger_names = rule.trigger_names
+				if trigger_names:
+					trig_batch.append(
+						(
+							prio,
+							rulebook,
+							rule,
+							handled_fun,
+							entity,
+							trigger_names,
+						)
 					)
-				else:
-					res = trigger(entity)
+					return None
+				handled_fun(self.tick)
+				return False
+			for trigger in rule.triggers:
+				res = profiled("triggers", rulebook, rule, trigger)(entity)
 				if res:
 					todo[prio, rulebook].append((rule, handled_fun, entity))
 					return True
@@ -2733,20 +3424,20 @@ class Engine(AbstractEngine, gORM, Executor):
 				handled_fun(self.tick)
 				return False
 
-		def check_prereqs(rule, handled_fun, entity):
+		def check_prereqs(rulebook, rule, handled_fun, entity):
 			if not entity:
 				return False
 			for prereq in rule.prereqs:
-				res = prereq(entity)
+				res = profiled("prereqs", rulebook, rule, prereq)(entity)
 				if not res:
 					handled_fun(self.tick)
 					return False
 			return True
 
-		def do_actions(rule, handled_fun, entity):
+		def do_actions(rulebook, rule, handled_fun, entity):
 			actres = []
 			for action in rule.actions:
-				res = action(entity)
+				res = profiled("actions", rulebook, rule, action)(entity)
 				if res:
 					actres.append(res)
 				if not entity:
@@ -2754,7 +3445,94 @@ class Engine(AbstractEngine, gORM, Executor):
 			handled_fun(self.tick)
 			return actres
 
-		truthfun = self.trigger.truth
+		def batch_mask(funcs, batch, every: bool) -> np.ndarray:
+			"""Which entities in the batch that ``funcs`` approve of
+
+			With ``every=True``, entities need every function's approval;
+			otherwise, any one will do.
+
+			"""
+			n = len(batch)
+			mask = np.full(n, every)
+			for fun in funcs:
+				res = np.broadcast_to(np.asarray(fun(batch), dtype=bool), (n,))
+				if every:
+					mask &= res
+					if not mask.any():
+						break
+				else:
+					mask |= res
+					if mask.all():
+						break
+			return mask
+
+		def check_batch_prereqs(rulebook, rule, handleds, batch):
+			if not rule.prereqs:
+				return handleds, batch
+			mask = batch_mask(
+				[
+					profiled("prereqs", rulebook, rule, prereq)
+					for prereq in rule.prereqs
+				],
+				batch,
+				True,
+			)
+			for handled, ok in zip(handleds, mask):
+				if not ok:
+					handled(self.tick)
+			return (
+				[handled for handled, ok in zip(handleds, mask) if ok],
+				EntityBatch(self, list(compress(batch, mask))),
+			)
+
+		def do_batch_actions(rulebook, rule, handleds, batch):
+			actres = []
+			for action in rule.actions:
+				res = profiled("actions", rulebook, rule, action)(batch)
+				if isinstance(res, dict):
+					batch.update(res)
+				elif res:
+					actres.append(res)
+			for handled in handleds:
+				handled(self.tick)
+			return actres
+
+		batches = {}
+
+		def add_to_batch(prio, rulebook, rule, handled, entity, always):
+			"""Put ``entity`` in the batch for ``rule``, if it's due
+
+			Like :func:`check_triggers`, skip entities whose neighborhoods
+			haven't changed, unless the rulebook is ``always`` triggered.
+
+			"""
+			if not always and rule.neighborhood is not None:
+				neighbors = get_effective_neighbors(entity, rule.neighborhood)
+				if neighbors is not None and not (
+					any(changed(neighbor) for neighbor in neighbors)
+				):
+					return
+			if (prio, rulebook, rule.name) in batches:
+				_, _, handleds, entities = batches[prio, rulebook, rule.name]
+			else:
+				handleds = []
+				entities = []
+				batches[prio, rulebook, rule.name] = (
+					rule,
+					always,
+					handleds,
+					entities,
+				)
+			handleds.append(handled)
+			entities.append(entity)
+
+		self._check_rulebook_plans(branch, turn)
+		plans = self._rulebook_plans
+
+		def get_plan(rulebook: Key) -> RulebookPlan:
+			if rulebook not in plans:
+				plans[rulebook] = RulebookPlan(self.rulebook[rulebook])
+			return plans[rulebook]
 
 		trig_futs = []
 		for (
@@ -2767,7 +3545,8 @@ class Engine(AbstractEngine, gORM, Executor):
 		):
 			if charactername not in charmap:
 				continue
-			rule = rulemap[rulename]
+			plan = get_plan(rulebook)
+			rule = plan.rules[rulename]
 			handled = partial(
 				self._handled_char,
 				charactername,
@@ -2777,7 +3556,12 @@ class Engine(AbstractEngine, gORM, Executor):
 				turn,
 			)
 			entity = charmap[charactername]
-			if truthfun in self.rulebook[rulebook]:
+			if rule.batch:
+				add_to_batch(
+					prio, rulebook, rule, handled, entity, plan.always
+				)
+				continue
+			if plan.always:
 				todo[prio, rulebook].append((rule, handled, entity))
 				continue
 			trig_futs.append(
@@ -2791,7 +3575,7 @@ class Engine(AbstractEngine, gORM, Executor):
 		make_node = self._make_node
 		node_objs = self._node_objs
 
-		def get_neighbors(
+		def find_neighbors(
 			entity: Union[place_cls, thing_cls, portal_cls],
 			neighborhood: Optional[int],
 		) -> Optional[List[Union[Tuple[Key], Tuple[Key, Key]]]]:
@@ -2849,17 +3633,6 @@ class Engine(AbstractEngine, gORM, Executor):
 
 			if neighborhood is None:
 				return None
-			if hasattr(entity, "name"):
-				cache_key = (charn, entity.name, *btt)
-			else:
-				cache_key = (
-					charn,
-					entity.origin.name,
-					entity.destination.name,
-					*btt,
-				)
-			if cache_key in self._neighbors_cache:
-				return self._neighbors_cache[cache_key]
 			if hasattr(entity, "name"):
 				neighbors = [(entity.name,)]
 				while hasattr(entity, "location"):
@@ -2914,7 +3687,74 @@ class Engine(AbstractEngine, gORM, Executor):
 								neighbors.append(neighbor_portal)
 								seen.add(neighbor_portal)
 				i = j
-			self._neighbors_cache[cache_key] = neighbors
+			return neighbors
+
+		moved_memo = {}
+		neighbors_cache = self._neighbors_cache
+		neighbors_cache_size = self._neighborhood_cache_size
+
+		def moved_since(
+			charn: Key,
+			neighbors: List[Union[Tuple[Key], Tuple[Key, Key]]],
+			turn_from: int,
+		) -> bool:
+			"""Whether any of the neighbors moved since the start of a turn"""
+			names = set(chain.from_iterable(neighbors))
+			for r in range(turn_from, turn + 1):
+				if r == turn:
+					# actions may still be moving things this turn
+					tick_now = self.tick
+					if moved_memo.get("tick") != tick_now:
+						moved_memo["tick"] = tick_now
+						moved_memo[r] = self._moved_nodes(branch, r)
+					moved = moved_memo[r]
+				elif r in moved_memo:
+					moved = moved_memo[r]
+				else:
+					moved = moved_memo[r] = self._moved_nodes(branch, r)
+				if charn in moved and not names.isdisjoint(moved[charn]):
+					return True
+			return False
+
+		def get_neighbors(
+			entity: Union[place_cls, thing_cls, portal_cls],
+			neighborhood: Optional[int],
+		) -> Optional[List[Union[Tuple[Key], Tuple[Key, Key]]]]:
+			"""Get a list of neighbors within the neighborhood, if possible from cache
+
+			The cache is kept between turns. Neighborhoods in it are
+			only looked up again when something in them has moved.
+
+			"""
+			if neighborhood is None:
+				return None
+			charn = entity.character.name
+			if hasattr(entity, "name"):
+				cache_key = (charn, entity.name, neighborhood)
+			else:
+				cache_key = (
+					charn,
+					entity.origin.name,
+					entity.destination.name,
+					neighborhood,
+				)
+			if cache_key in neighbors_cache:
+				cached_branch, cached_turn, neighbors = neighbors_cache[
+					cache_key
+				]
+				if (
+					cached_branch == branch
+					and cached_turn <= turn
+					and not moved_since(charn, neighbors, cached_turn)
+				):
+					neighbors_cache[cache_key] = (branch, turn, neighbors)
+					neighbors_cache.move_to_end(cache_key)
+					return neighbors
+			neighbors = find_neighbors(entity, neighborhood)
+			neighbors_cache[cache_key] = (branch, turn, neighbors)
+			neighbors_cache.move_to_end(cache_key)
+			while len(neighbors_cache) > neighbors_cache_size:
+				neighbors_cache.popitem(last=False)
 			return neighbors
 
 		def get_effective_neighbors(entity, neighborhood):
@@ -2931,13 +3771,22 @@ class Engine(AbstractEngine, gORM, Executor):
 				# everything's "created" at the start of the game,
 				# and therefore, there's been a "change" to the neighborhood
 				return None
+			this_turn_neighbors = get_neighbors(entity, neighborhood)
+			parent, turn_start = self._branches[branch_now][:2]
+			if (parent is None or turn_start < turn_now - 1) and not (
+				moved_since(
+					entity.character.name, this_turn_neighbors, turn_now - 1
+				)
+			):
+				# Nothing here moved, so the neighborhood's the same as
+				# last turn, and there's no need to go look at last turn
+				return this_turn_neighbors
 			with self.world_lock:
 				self._load_at(branch_now, turn_now - 1, 0)
 				self._oturn -= 1
 				self._otick = 0
-				last_turn_neighbors = get_neighbors(entity, neighborhood)
+				last_turn_neighbors = find_neighbors(entity, neighborhood)
 				self._set_btt(branch_now, turn_now, tick_now)
-				this_turn_neighbors = get_neighbors(entity, neighborhood)
 			if set(last_turn_neighbors) != set(this_turn_neighbors):
 				return None
 			return this_turn_neighbors
@@ -2974,7 +3823,8 @@ class Engine(AbstractEngine, gORM, Executor):
 				(charn, graphn, avn, branch, turn, tick)
 			) in (KeyError, None):
 				continue
-			rule = rulemap[rulen]
+			plan = get_plan(rulebook)
+			rule = plan.rules[rulen]
 			handled = partial(
 				self._handled_av,
 				charn,
@@ -2986,7 +3836,12 @@ class Engine(AbstractEngine, gORM, Executor):
 				turn,
 			)
 			entity = get_node(graphn, avn)
-			if truthfun in self.rulebook[rulebook]:
+			if rule.batch:
+				add_to_batch(
+					prio, rulebook, rule, handled, entity, plan.always
+				)
+				continue
+			if plan.always:
 				todo[prio, rulebook].append((rule, handled, entity))
 				continue
 			trig_futs.append(
@@ -3013,7 +3868,8 @@ class Engine(AbstractEngine, gORM, Executor):
 		):
 			if not node_exists(charn, thingn) or not is_thing(charn, thingn):
 				continue
-			rule = rulemap[rulen]
+			plan = get_plan(rulebook)
+			rule = plan.rules[rulen]
 			handled = partial(
 				handled_char_thing,
 				charn,
@@ -3024,7 +3880,12 @@ class Engine(AbstractEngine, gORM, Executor):
 				turn,
 			)
 			entity = get_thing(charn, thingn)
-			if truthfun in self.rulebook[rulebook]:
+			if rule.batch:
+				add_to_batch(
+					prio, rulebook, rule, handled, entity, plan.always
+				)
+				continue
+			if plan.always:
 				todo[prio, rulebook].append((rule, handled, entity))
 				continue
 			trig_futs.append(
@@ -3050,7 +3911,8 @@ class Engine(AbstractEngine, gORM, Executor):
 		):
 			if not node_exists(charn, placen) or is_thing(charn, placen):
 				continue
-			rule = rulemap[rulen]
+			plan = get_plan(rulebook)
+			rule = plan.rules[rulen]
 			handled = partial(
 				handled_char_place,
 				charn,
@@ -3061,7 +3923,12 @@ class Engine(AbstractEngine, gORM, Executor):
 				turn,
 			)
 			entity = get_place(charn, placen)
-			if truthfun in self.rulebook[rulebook]:
+			if rule.batch:
+				add_to_batch(
+					prio, rulebook, rule, handled, entity, plan.always
+				)
+				continue
+			if plan.always:
 				todo[prio, rulebook].append((rule, handled, entity))
 				continue
 			trig_futs.append(
@@ -3090,7 +3957,8 @@ class Engine(AbstractEngine, gORM, Executor):
 		):
 			if not edge_exists(charn, orign, destn):
 				continue
-			rule = rulemap[rulen]
+			plan = get_plan(rulebook)
+			rule = plan.rules[rulen]
 			handled = partial(
 				handled_char_port,
 				charn,
@@ -3102,7 +3970,12 @@ class Engine(AbstractEngine, gORM, Executor):
 				turn,
 			)
 			entity = get_edge(charn, orign, destn)
-			if truthfun in self.rulebook[rulebook]:
+			if rule.batch:
+				add_to_batch(
+					prio, rulebook, rule, handled, entity, plan.always
+				)
+				continue
+			if plan.always:
 				todo[prio, rulebook].append((rule, handled, entity))
 				continue
 			trig_futs.append(
@@ -3128,12 +4001,18 @@ class Engine(AbstractEngine, gORM, Executor):
 		):
 			if not node_exists(charn, noden):
 				continue
-			rule = rulemap[rulen]
+			plan = get_plan(rulebook)
+			rule = plan.rules[rulen]
 			handled = partial(
 				handled_node, charn, noden, rulebook, rulen, branch, turn
 			)
 			entity = get_node(charn, noden)
-			if truthfun in self.rulebook[rulebook]:
+			if rule.batch:
+				add_to_batch(
+					prio, rulebook, rule, handled, entity, plan.always
+				)
+				continue
+			if plan.always:
 				todo[prio, rulebook].append((rule, handled, entity))
 				continue
 			trig_futs.append(
@@ -3160,7 +4039,8 @@ class Engine(AbstractEngine, gORM, Executor):
 		):
 			if not edge_exists(charn, orign, destn):
 				continue
-			rule = rulemap[rulen]
+			plan = get_plan(rulebook)
+			rule = plan.rules[rulen]
 			handled = partial(
 				handled_portal,
 				charn,
@@ -3172,7 +4052,12 @@ class Engine(AbstractEngine, gORM, Executor):
 				turn,
 			)
 			entity = get_edge(charn, orign, destn)
-			if truthfun in self.rulebook[rulebook]:
+			if rule.batch:
+				add_to_batch(
+					prio, rulebook, rule, handled, entity, plan.always
+				)
+				continue
+			if plan.always:
 				todo[prio, rulebook].append((rule, handled, entity))
 				continue
 			trig_futs.append(
@@ -3191,8 +4076,69 @@ class Engine(AbstractEngine, gORM, Executor):
 		else:
 			for part in trig_futs:
 				part()
+		if trig_batch:
+			timings = [None] * len(trig_batch)
+			triggered = self._eval_triggers_in_subprocesses(
+				[
+					(trigger_names, entity)
+					for (*_, entity, trigger_names) in trig_batch
+				],
+				None if profile is None else timings,
+			)
+			for trig, res, times in zip(trig_batch, triggered, timings):
+				prio, rulebook, rule, handled, entity, names = trig
+				if res is not None and times is not None:
+					# the triggers after the first true one weren't called
+					for i, (name, elapsed) in enumerate(zip(names, times)):
+						tally(
+							(rulebook, rule.name, "triggers", name),
+							res and i == len(times) - 1,
+							elapsed,
+						)
+				if res is None:
+					# the worker couldn't do it, so do it here
+					res = any(
+						profiled("triggers", rulebook, rule, trigger)(entity)
+						for trigger in rule.triggers
+					)
+				if res:
+					todo[prio, rulebook].append((rule, handled, entity))
+				else:
+					handled(self.tick)
+		# Batch rules get their triggers called once for all their entities
+		for (prio, rulebook, _), (
+			rule,
+			always,
+			handleds,
+			entities,
+		) in batches.items():
+			batch = EntityBatch(self, entities)
+			if always:
+				todo[prio, rulebook].append((rule, handleds, batch))
+				continue
+			mask = batch_mask(
+				[
+					profiled("triggers", rulebook, rule, trigger)
+					for trigger in rule.triggers
+				],
+				batch,
+				False,
+			)
+			for handled, triggered in zip(handleds, mask):
+				if not triggered:
+					handled(self.tick)
+			if mask.any():
+				todo[prio, rulebook].append(
+					(
+						rule,
+						list(compress(handleds, mask)),
+						EntityBatch(self, list(compress(entities, mask))),
+					)
+				)
 
 		def fmtent(entity):
+			if isinstance(entity, EntityBatch):
+				return repr(entity)
 			if isinstance(entity, self.char_cls):
 				return entity.name
 			elif hasattr(entity, "name"):
@@ -3203,20 +4149,113 @@ class Engine(AbstractEngine, gORM, Executor):
 					f"[{entity.origin.name}][{entity.destination.name}]"
 				)
 
+		def do_actions_in_subprocesses(entries):
+			"""Run the actions in the workers, and check they don't conflict
+
+			Return their results and the changes they want to make,
+			or ``None`` if they have to be run here after all.
+
+			"""
+			self._update_all_worker_process_states()
+			results = self._do_actions_in_subprocesses(
+				[(rule.action_names, entity) for (rule, _, entity) in entries],
+				profile is not None,
+			)
+			written = set()
+			for result in results:
+				if result is None:
+					return None
+				keys = set()
+				for cmd in result[1]:
+					key = self._worker_write_key(cmd)
+					if key is None or key in written:
+						return None
+					keys.add(key)
+				written.update(keys)
+			return results
+
+		parallel_actions = workers and self._parallel_actions
 		for prio_rulebook in sort_set(todo.keys()):
-			for rule, handled, entity in todo[prio_rulebook]:
+			rulebook = prio_rulebook[1]
+			entries = todo[prio_rulebook]
+			if (
+				parallel_actions
+				and len(entries) > 1
+				and not any(
+					isinstance(entity, EntityBatch)
+					for (_, _, entity) in entries
+				)
+			):
+				ready = [
+					(rule, handled, entity)
+					for (rule, handled, entity) in entries
+					if entity
+					and check_prereqs(rulebook, rule, handled, entity)
+				]
+				results = do_actions_in_subprocesses(ready)
+				if results is None:
+					self.debug(
+						"couldn't run actions in parallel, running them in serial"
+					)
+					# the workers are out of sync now
+					self._update_all_worker_process_states(clobber=True)
+					for rule, handled, entity in ready:
+						if not entity:
+							continue
+						try:
+							yield do_actions(rulebook, rule, handled, entity)
+						except StopIteration:
+							raise InnerStopIteration
+					continue
+				for (rule, handled, _), (actres, writes, *times) in zip(
+					ready, results
+				):
+					for cmd in writes:
+						self._replay_worker_write(cmd)
+					if times:
+						for name, elapsed in zip(rule.action_names, times[0]):
+							tally(
+								(rulebook, rule.name, "actions", name),
+								False,
+								elapsed,
+							)
+					handled(self.tick)
+					yield actres
+				continue
+			for rule, handled, entity in entries:
+				if isinstance(entity, EntityBatch):
+					# some of them might've been deleted by now
+					live = [bool(ent) for ent in entity]
+					handled = list(compress(handled, live))
+					entity = EntityBatch(self, list(compress(entity, live)))
+					if not entity:
+						continue
+					self.debug(
+						f"checking prereqs for batch rule {rule.name} "
+						f"on {fmtent(entity)}"
+					)
+					handled, entity = check_batch_prereqs(
+						rulebook, rule, handled, entity
+					)
+					if not entity:
+						continue
+					try:
+						yield do_batch_actions(rulebook, rule, handled, entity)
+					except StopIteration:
+						raise InnerStopIteration
+					continue
 				if not entity:
 					continue
 				self.debug(
 					f"checking prereqs for rule {rule.name} on entity {fmtent(entity)}"
 				)
-				if check_prereqs(rule, handled, entity):
+				if check_prereqs(rulebook, rule, handled, entity):
 					self.debug(
 						f"prereqs for rule {rule.name} on entity "
 						f"{fmtent(entity)} satisfied, will run actions"
 					)
 					try:
-						yield do_actions(rule, handled, entity)
+						yield do_actions(rulebook, rule, handled, entity)
 						self.debug(
 							f"actions for rule {rule.name} on entity "
 							f"{fmtent(entity)} have run without incident"
@@ -3244,6 +4283,73 @@ class Engine(AbstractEngine, gORM, Executor):
 	# self._rules_iter = self._follow_rules()
 	# return ex
 
+	def advance_turns(
+		self, n: int, delta: bool = False
+	) -> Tuple[List, Optional[DeltaDict]]:
+		"""Simulate ``n`` turns, without working out what changed each turn
+
+		Return the results of the last turn simulated, and, with
+		``delta=True``, one delta describing every change over all the
+		turns. Otherwise, the delta is ``None``.
+
+		Stops early if a rule returns a ``"stop"`` tuple, as
+		:meth:`next_turn` would.
+
+		"""
+		branch, turn_from, tick_from = self._btt()
+		results = []
+		for _ in range(n):
+			results, _ = self.next_turn(delta=False)
+			if results and results[0] == "stop":
+				break
+		if not delta:
+			return results, None
+		return results, self._get_branch_delta(
+			branch=branch,
+			turn_from=turn_from,
+			turn_to=self.turn,
+			tick_from=tick_from,
+			tick_to=self.tick,
+		)
+
+	def rule_profile(
+		self,
+	) -> Dict[Key, Dict[str, Dict[str, Dict[str, Dict[str, Any]]]]]:
+		"""Return what's been counted about rules, with ``profile_rules=True``
+
+		It's a nested dictionary, keyed by rulebook, then rule name,
+		then one of ``"triggers"``, ``"prereqs"``, or ``"actions"``,
+		then function name. At the bottom are dictionaries with the
+		number of ``"calls"`` to the function on behalf of that rule, the
+		total ``"seconds"`` they took, and, for triggers and prereqs,
+		how many of them returned ``"true"``.
+
+		This is only kept in memory. The rules journal is world history,
+		by branch and turn, but how long a rule takes depends on the
+		machine running it, so the profile isn't saved there. Keep what
+		this returns yourself, if you want to compare runs.
+
+		"""
+		ret = {}
+		with self._rule_profile_lock:
+			for (rulebook, rule, kind, fun), (
+				calls,
+				trues,
+				seconds,
+			) in self._rule_profile.items():
+				stats = {"calls": calls, "seconds": seconds}
+				if kind != "actions":
+					stats["true"] = trues
+				ret.setdefault(rulebook, {}).setdefault(rule, {}).setdefault(
+					kind, {}
+				)[fun] = stats
+		return ret
+
+	def reset_rule_profile(self) -> None:
+		"""Forget everything that's been counted for :meth:`rule_profile`"""
+		with self._rule_profile_lock:
+			self._rule_profile.clear()
+
 	def new_character(
 		self, name: Key, data: Graph = None, layout: bool = False, **kwargs
 	) -> Character:
@@ -3402,6 +4508,8 @@ class Engine(AbstractEngine, gORM, Executor):
 		self._triggers_cache.set_keyframe(branch, turn, tick, trigs)
 		self._prereqs_cache.set_keyframe(branch, turn, tick, preqs)
 		self._actions_cache.set_keyframe(branch, turn, tick, acts)
+		batch = self._get_batch_rules_kf(branch, turn, tick)
+		self._batch_cache.set_keyframe(branch, turn, tick, batch)
 		thing_graphs = all_graphs.copy()
 		for charname in all_graphs:
 			thing_graphs.discard(charname)
@@ -3459,7 +4567,12 @@ class Engine(AbstractEngine, gORM, Executor):
 			turn,
 			tick,
 			universal,
-			{"triggers": trigs, "prereqs": preqs, "actions": acts},
+			{
+				"triggers": trigs,
+				"prereqs": preqs,
+				"actions": acts,
+				"batch": batch,
+			},
 			rbs,
 		)
 		super()._snap_keyframe_de_novo(branch, turn, tick)
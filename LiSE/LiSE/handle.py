@@ -50,7 +50,12 @@ from .engine import (
 )
 from .node import Node
 from .portal import Portal
-from .util import AbstractCharacter, BadTimeException, timer
+from .util import (
+	AbstractCharacter,
+	BadTimeException,
+	MsgpackExtensionType,
+	timer,
+)
 
 SlightlyPackedDeltaType = Dict[
 	bytes,
@@ -84,6 +89,22 @@ def prepacked(fun: Callable) -> Callable:
 	return fun
 
 
+def concat_prepacked(r: Union[bytes, dict, tuple, list]) -> bytes:
+	"""Pack the return value of a ``prepacked`` method into msgpack bytes"""
+	if isinstance(r, dict):
+		return concat_d(r)
+	elif isinstance(r, tuple):
+		pacr = msgpack.Packer()
+		pacr.pack_ext_type(
+			MsgpackExtensionType.tuple.value,
+			msgpack.Packer().pack_array_header(len(r)) + b"".join(r),
+		)
+		return pacr.bytes()
+	elif isinstance(r, list):
+		return msgpack.Packer().pack_array_header(len(r)) + b"".join(r)
+	return r
+
+
 class EngineHandle:
 	"""A wrapper for a :class:`LiSE.Engine` object that runs in the same
 	process, but with an API built to be used in a command-processing
@@ -121,6 +142,7 @@ class EngineHandle:
 		self.unpack = self._real.unpack
 
 		self._cache_arranger_started = False
+		self.codec = None
 		if do_game_start:
 			self.do_game_start()
 
@@ -296,6 +318,27 @@ class EngineHandle:
 		slightly_packed_delta, packed_delta = self._pack_delta(delta)
 		return pack(ret), packed_delta
 
+	@prepacked
+	def advance_turns(
+		self, n: int, delta: bool = False
+	) -> Tuple[bytes, bytes]:
+		"""Simulate ``n`` turns. Return the last results, and maybe a delta
+
+		The delta is ``None`` unless ``delta=True``.
+
+		"""
+		pack = self.pack
+		self.debug(
+			"calling advance_turns({}) at {}, {}, {}".format(
+				n, *self._real._btt()
+			)
+		)
+		ret, delta = self._real.advance_turns(n, delta=delta)
+		if delta is None:
+			return pack(ret), pack(None)
+		slightly_packed_delta, packed_delta = self._pack_delta(delta)
+		return pack(ret), packed_delta
+
 	def _get_slow_delta(
 		self,
 		btt_from: Tuple[str, int, int] = None,
@@ -439,6 +482,51 @@ class EngineHandle:
 	def close(self):
 		self._real.close()
 
+	def get_codec_stats(self) -> dict:
+		"""Return the stats of the codecs used to talk to other processes
+
+		That's the ``"core"`` codec, for talking to the proxy, if there
+		is one, and the ``"workers"`` codec, if there are workers.
+
+		"""
+		ret = {}
+		if self.codec is not None:
+			ret["core"] = self.codec.stats
+		if hasattr(self._real, "_worker_codec"):
+			ret["workers"] = self._real._worker_codec.stats
+		return ret
+
+	@prepacked
+	def run_commands(self, commands: List[dict]) -> List[bytes]:
+		"""Run several commands in order. Return their packed results.
+
+		Each command is a dictionary of the kind that the proxy would
+		otherwise send one at a time. If one of them raises an exception,
+		that's its result, and the commands after it don't run.
+
+		"""
+		ret = []
+		for instruction in commands:
+			instruction = dict(instruction)
+			method = getattr(self, instruction.pop("command"))
+			branching = instruction.pop("branching", False)
+			try:
+				try:
+					r = method(**instruction)
+				except OutOfTimelineError:
+					if not branching:
+						raise
+					self.increment_branch()
+					r = method(**instruction)
+			except Exception as ex:
+				ret.append(self.pack(ex))
+				break
+			if hasattr(method, "prepacked"):
+				ret.append(concat_prepacked(r))
+			else:
+				ret.append(self.pack(r))
+		return ret
+
 	def get_btt(self):
 		return self._real._btt()
 
@@ -702,6 +790,14 @@ class EngineHandle:
 	def call_randomizer(self, method: str, *args, **kwargs) -> Any:
 		return getattr(self._real._rando, method)(*args, **kwargs)
 
+	def rule_profile(
+		self,
+	) -> Dict[Key, Dict[str, Dict[str, Dict[str, Dict[str, Any]]]]]:
+		return self._real.rule_profile()
+
+	def reset_rule_profile(self) -> None:
+		self._real.reset_rule_profile()
+
 	def install_module(self, module: str) -> None:
 		import_module(module).install(self._real)
 
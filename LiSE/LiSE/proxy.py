@@ -25,6 +25,7 @@ call its ``start`` method with the same arguments you'd give a real
 
 """
 
+import asyncio
 import os
 import sys
 import logging
@@ -34,27 +35,24 @@ from collections.abc import Mapping, MutableMapping, MutableSequence
 from functools import partial, cached_property
 from threading import Thread, Lock
 from multiprocessing import Process, Pipe, Queue, ProcessError
-from concurrent.futures import ThreadPoolExecutor
+from multiprocessing.shared_memory import SharedMemory
+from concurrent.futures import Future, ThreadPoolExecutor
+from contextlib import asynccontextmanager, contextmanager
 from queue import Empty
-from time import monotonic
+from time import monotonic, perf_counter
 from types import MethodType
 from typing import Hashable, Tuple, Optional, Iterator, List, Union
 
 import networkx as nx
+import numpy as np
 from blinker import Signal
-import zlib
 import msgpack
 
 from .allegedb import OutOfTimelineError, Key
 from .allegedb.cache import PickyDefaultDict, StructuredDefaultDict
 from .allegedb.wrap import DictWrapper, ListWrapper, SetWrapper, UnwrappingDict
 from .character import Facade
-from .util import (
-	getatt,
-	AbstractEngine,
-	MsgpackExtensionType,
-	AbstractCharacter,
-)
+from .util import getatt, AbstractEngine, AbstractCharacter
 from .xcollections import (
 	AbstractLanguageDescriptor,
 	FunctionStore,
@@ -62,7 +60,9 @@ from .xcollections import (
 )
 from .node import NodeContent, UserMapping, Place, Thing
 from .portal import Portal
+from .codec import Codec
 from .exc import WorkerProcessReadOnlyError
+from .ringbuffer import RingBuffer
 
 
 class CachingProxy(MutableMapping, Signal):
@@ -2542,6 +2542,17 @@ class EngineProxy(AbstractEngine):
 		self._replace_state_with_kf(start_kf)
 		self._initialized = True
 
+	def _upd_from_snapshot(self, name: str, size: int) -> None:
+		"""Load the world state the core put in shared memory"""
+		shm = SharedMemory(name)
+		buf = shm.buf[:size]
+		try:
+			snapshot = self.unpack(buf)
+		finally:
+			buf.release()
+			shm.close()
+		self._upd_from_game_start(None, None, None, None, snapshot)
+
 	def switch_main_branch(self, branch: str) -> None:
 		if self._worker:
 			raise WorkerProcessReadOnlyError(
@@ -2775,8 +2786,10 @@ class EngineProxy(AbstractEngine):
 		submit_func=None,
 		threads=None,
 		prefix=None,
+		codec: Union[Codec, str] = "zlib",
 	):
 		self.closed = False
+		self.codec = Codec.get(codec)
 		if submit_func:
 			self._submit = submit_func
 		else:
@@ -2811,6 +2824,8 @@ class EngineProxy(AbstractEngine):
 			self.function = FunctionStore(os.path.join(prefix, "function.py"))
 			self.string = StringStore(self, prefix)
 			self._worker = True
+		self._write_log = None
+		self._pipeline = None
 
 		self._node_stat_cache = StructuredDefaultDict(1, UnwrappingDict)
 		self._portal_stat_cache = StructuredDefaultDict(2, UnwrappingDict)
@@ -2873,9 +2888,103 @@ class EngineProxy(AbstractEngine):
 	def _reimport_triggers(self):
 		self.trigger.reimport()
 
+	def _reimport_actions(self):
+		self.action.reimport()
+
 	def _eval_trigger(self, name, entity):
 		return getattr(self.trigger, name)(entity)
 
+	def _eval_triggers(
+		self,
+		batch: List[Tuple[Tuple[str, ...], Union[Facade, Portal]]],
+		profile: bool = False,
+	) -> Union[
+		Tuple[bytes, List[int]], Tuple[bytes, List[int], List[List[float]]]
+	]:
+		"""Evaluate the triggers for a chunk of (rule, entity) pairs
+
+		``batch`` is a list of pairs of trigger function names and
+		the entity to call them on. Return a bitmap with a 1 for each
+		entity where any of its triggers returned a true value, and
+		a list of the indices of the pairs whose triggers failed,
+		so that the core can evaluate those itself.
+
+		With ``profile=True``, also return, for each pair, how many
+		seconds each of the triggers that got called took. Only the
+		last of them can have returned a true value.
+
+		"""
+		results = []
+		failed = []
+		timings = []
+		trigger = self.trigger
+		for i, (trigger_names, entity) in enumerate(batch):
+			times = []
+			try:
+				for name in trigger_names:
+					start = perf_counter()
+					res = getattr(trigger, name)(entity)
+					times.append(perf_counter() - start)
+					if res:
+						results.append(True)
+						break
+				else:
+					results.append(False)
+			except Exception:
+				results.append(False)
+				failed.append(i)
+			timings.append(times)
+		bitmap = np.packbits(np.array(results, dtype=bool)).tobytes()
+		if profile:
+			return bitmap, failed, timings
+		return bitmap, failed
+
+	def _do_actions(
+		self,
+		batch: List[Tuple[Tuple[str, ...], Union[Facade, Portal]]],
+		profile: bool = False,
+	) -> List[Optional[tuple]]:
+		"""Run the actions for a chunk of (rule, entity) pairs
+
+		``batch`` is a list of pairs of action function names and
+		the entity to call them on. The changes they make are kept
+		here, rather than sent to the core. Return, for each pair,
+		the actions' results and the commands the core would've
+		received, or ``None`` if any of the actions failed.
+
+		With ``profile=True``, each pair also gets how many seconds
+		each of the actions that got called took.
+
+		"""
+		ret = []
+		action = self.action
+		for action_names, entity in batch:
+			self._write_log = writes = []
+			self._worker = False
+			times = []
+			try:
+				results = []
+				for name in action_names:
+					start = perf_counter()
+					res = getattr(action, name)(entity)
+					times.append(perf_counter() - start)
+					if res:
+						results.append(res)
+					if not entity:
+						break
+				self.pack(results)  # make sure we can send them back
+			except Exception:
+				ret.append(None)
+				continue
+			finally:
+				self._worker = True
+				self._write_log = None
+			if profile:
+				ret.append((results, writes, times))
+			else:
+				ret.append((results, writes))
+		return ret
+
 	def _call_function(self, name: str, *args, **kwargs):
 		return getattr(self.function, name)(*args, **kwargs)
 
@@ -2889,16 +2998,26 @@ class EngineProxy(AbstractEngine):
 		self.method.reimport()
 
 	def send_bytes(self, obj, blocking=True, timeout=-1):
-		compressed = zlib.compress(obj)
+		obj = self.codec.compress(obj)
 		self._handle_out_lock.acquire(blocking, timeout)
-		self._handle_out.send_bytes(compressed)
+		self._handle_out.send_bytes(obj)
 		self._handle_out_lock.release()
 
 	def recv_bytes(self, blocking=True, timeout=-1):
 		self._handle_in_lock.acquire(blocking, timeout)
 		data = self._handle_in.recv_bytes()
 		self._handle_in_lock.release()
-		return zlib.decompress(data)
+		return self.codec.decompress(data)
+
+	def codec_stats(self) -> dict:
+		"""How much compressing messages has saved, and what it's cost
+
+		Return a dictionary with the stats of the codec here in the
+		``"proxy"``, and those of the ``"core"``, and the core's
+		``"workers"``, if it has any.
+
+		"""
+		return dict(proxy=self.codec.stats, **self.handle("get_codec_stats"))
 
 	def debug(self, msg):
 		self.logger.debug(msg)
@@ -2938,6 +3057,12 @@ class EngineProxy(AbstractEngine):
 		``handle``.`.
 
 		"""
+		if self._write_log is not None:
+			if cmd:
+				kwargs["command"] = cmd
+			kwargs.pop("branching", None)
+			self._write_log.append(kwargs)
+			return
 		if self._worker:
 			return
 		if self.closed:
@@ -2949,6 +3074,10 @@ class EngineProxy(AbstractEngine):
 		else:
 			raise TypeError("No command")
 		assert not kwargs.get("silent")
+		if self._pipeline is not None:
+			fut = Future()
+			self._pipeline.append((kwargs, cb, fut))
+			return fut
 		self.debug(f"EngineProxy: sending {cmd}")
 		start_ts = monotonic()
 		with self._round_trip_lock:
@@ -2960,11 +3089,7 @@ class EngineProxy(AbstractEngine):
 				(command, branch, turn, tick), monotonic() - start_ts
 			)
 		)
-		if (branch, turn, tick) != self._btt():
-			self._branch = branch
-			self._turn = turn
-			self._tick = tick
-			self.time.send(self, branch=branch, turn=turn, tick=tick)
+		self._update_time(branch, turn, tick)
 		if isinstance(r, Exception):
 			raise r
 		if cmd != command:
@@ -2975,6 +3100,105 @@ class EngineProxy(AbstractEngine):
 			cb(command=command, branch=branch, turn=turn, tick=tick, result=r)
 		return r
 
+	@contextmanager
+	def batch(self):
+		"""Send all the commands in this context at once, at the end
+
+		Rather than waiting for the core to respond to each in turn.
+		Inside, :meth:`handle` returns a :class:`Future` for each command,
+		rather than its result; so only use this when you don't need the
+		results right away, such as when setting lots of stats.
+
+		If one of the commands raises an exception, the commands after
+		it don't run, and I raise it at the end of the ``with`` block.
+
+		If the ``with`` block itself raises, none of its commands are
+		sent, and their futures are cancelled.
+
+		"""
+		if self._pipeline is not None:
+			yield
+			return
+		self._pipeline = pipeline = []
+		try:
+			yield
+		except BaseException:
+			self._pipeline = None
+			self._cancel_pipeline(pipeline)
+			raise
+		self._pipeline = None
+		if pipeline:
+			self._handle_pipeline(pipeline)
+
+	@staticmethod
+	def _cancel_pipeline(
+		pipeline: List[Tuple[dict, Optional[callable], Future]],
+	) -> None:
+		for _, _, fut in pipeline:
+			fut.cancel()
+
+	def _handle_pipeline(
+		self, pipeline: List[Tuple[dict, Optional[callable], Future]]
+	) -> None:
+		self.debug(f"EngineProxy: sending {len(pipeline)} commands")
+		start_ts = monotonic()
+		with self._round_trip_lock:
+			self.send_bytes(
+				self.pack(
+					{
+						"command": "run_commands",
+						"commands": [kwargs for (kwargs, _, _) in pipeline],
+					}
+				)
+			)
+			received = self.recv_bytes()
+		self.debug(
+			"EngineProxy: received {} results in {:,.2f} seconds".format(
+				len(pipeline), monotonic() - start_ts
+			)
+		)
+		self._resolve_pipeline(pipeline, received)
+
+	def _resolve_pipeline(
+		self,
+		pipeline: List[Tuple[dict, Optional[callable], Future]],
+		received: bytes,
+	) -> None:
+		command, branch, turn, tick, results = self.unpack(received)
+		self._update_time(branch, turn, tick)
+		if isinstance(results, Exception):
+			for _, _, fut in pipeline:
+				fut.set_exception(results)
+			raise results
+		ex = None
+		for i, (kwargs, cb, fut) in enumerate(pipeline):
+			if i >= len(results):
+				fut.cancel()
+				continue
+			r = results[i]
+			if isinstance(r, Exception):
+				fut.set_exception(r)
+				ex = r
+				continue
+			if cb:
+				cb(
+					command=kwargs["command"],
+					branch=branch,
+					turn=turn,
+					tick=tick,
+					result=r,
+				)
+			fut.set_result(r)
+		if ex is not None:
+			raise ex
+
+	def _update_time(self, branch: str, turn: int, tick: int) -> None:
+		if (branch, turn, tick) != self._btt():
+			self._branch = branch
+			self._turn = turn
+			self._tick = tick
+			self.time.send(self, branch=branch, turn=turn, tick=tick)
+
 	def _unpack_recv(self):
 		ret = self.unpack(self.recv_bytes())
 		return ret
@@ -3048,6 +3272,11 @@ class EngineProxy(AbstractEngine):
 		return received
 
 	def _upd_caches(self, command, branch, turn, tick, result):
+		for _ in self._iter_upd_caches(result):
+			pass
+
+	def _iter_upd_caches(self, result) -> Iterator[None]:
+		"""Apply a delta to my caches, yielding after each character"""
 		result, deltas = result
 		self.eternal._update_cache(deltas.pop("eternal", {}))
 		self.universal._update_cache(deltas.pop("universal", {}))
@@ -3085,6 +3314,7 @@ class EngineProxy(AbstractEngine):
 				self._char_cache[char] = CharacterProxy(self, char)
 			chara = self.character[char]
 			chara._apply_delta(chardelta)
+			yield
 		for char in to_delete & self._char_cache.keys():
 			del self._char_cache[char]
 
@@ -3126,6 +3356,12 @@ class EngineProxy(AbstractEngine):
 			perfectionist=perfectionist,
 		)
 
+	def rule_profile(self) -> dict:
+		return self.handle("rule_profile")
+
+	def reset_rule_profile(self) -> None:
+		self.handle("reset_rule_profile")
+
 	def _upd(self, *args, **kwargs):
 		self._upd_caches(*args, **kwargs)
 		self._set_time(*args, no_del=True, **kwargs)
@@ -3135,6 +3371,12 @@ class EngineProxy(AbstractEngine):
 		if cb:
 			cb(*args, **kwargs)
 
+	def _upd_from_kf_and_cb(self, cb, *args, **kwargs):
+		self._set_time(*args, **kwargs)
+		self._pull_kf_now()
+		if cb:
+			cb(*args, **kwargs)
+
 	# TODO: make this into a Signal, like it is in the LiSE core
 	def next_turn(self, cb=None):
 		if self._worker:
@@ -3145,6 +3387,27 @@ class EngineProxy(AbstractEngine):
 			raise TypeError("Uncallable callback")
 		return self.handle("next_turn", cb=partial(self._upd_and_cb, cb))
 
+	def advance_turns(self, n: int, delta: bool = False, cb=None):
+		"""Simulate ``n`` turns
+
+		Without ``delta=True``, the core doesn't tell me what changed,
+		so I get a keyframe of the new state instead.
+
+		"""
+		if self._worker:
+			raise WorkerProcessReadOnlyError(
+				"Tried to change the world state in a worker process"
+			)
+		if cb and not callable(cb):
+			raise TypeError("Uncallable callback")
+		if delta:
+			upd = self._upd_and_cb
+		else:
+			upd = self._upd_from_kf_and_cb
+		return self.handle(
+			"advance_turns", n=n, delta=delta, cb=partial(upd, cb)
+		)
+
 	def time_travel(self, branch, turn, tick=None, cb=None):
 		"""Move to a different point in the timestream
 
@@ -3315,13 +3578,219 @@ class EngineProxy(AbstractEngine):
 				yield thing.name
 
 
-def engine_subprocess(args, kwargs, input_pipe, output_pipe, logq, loglevel):
+class AsyncEngineProxy:
+	"""Control a LiSE core from an :mod:`asyncio` event loop
+
+	Wraps an :class:`EngineProxy`, and keeps its caches up to date, so
+	that reading the world through it, as in
+	``engine.character["physical"].place["kobold"]["hp"]``, still works,
+	and never blocks. Anything that has to wait for the core is a
+	coroutine here instead. Several of these can share one event loop,
+	each with its own core.
+
+	Don't call methods of the wrapped proxy that talk to the core, such
+	as setting a stat, while one of my coroutines is waiting on it;
+	use :meth:`set_stat`, or make the changes inside ``async with``
+	:meth:`batch`.
+
+	"""
+
+	def __init__(self, engine: EngineProxy):
+		self.engine = engine
+		self._lock = None
+
+	def __getattr__(self, item):
+		return getattr(self.engine, item)
+
+	@property
+	def _command_lock(self) -> asyncio.Lock:
+		# Made on first use, so that it belongs to the running loop
+		if self._lock is None:
+			self._lock = asyncio.Lock()
+		return self._lock
+
+	async def _recv_bytes(self) -> bytes:
+		loop = asyncio.get_running_loop()
+		conn = self.engine._handle_in
+		if hasattr(conn, "fileno"):
+			readable = loop.create_future()
+
+			def ready():
+				if not readable.done():
+					readable.set_result(None)
+
+			try:
+				loop.add_reader(conn.fileno(), ready)
+			except NotImplementedError:
+				pass  # Windows; fall back to a thread
+			else:
+				try:
+					await readable
+				finally:
+					loop.remove_reader(conn.fileno())
+				return self.engine.recv_bytes()
+		return await loop.run_in_executor(None, self.engine.recv_bytes)
+
+	async def _round_trip(self, kwargs: dict) -> tuple:
+		engine = self.engine
+		lock = engine._round_trip_lock
+		if not lock.acquire(blocking=False):
+			await asyncio.get_running_loop().run_in_executor(
+				None, lock.acquire
+			)
+		try:
+			engine.send_bytes(engine.pack(kwargs))
+			received = await self._recv_bytes()
+		finally:
+			lock.release()
+		return received
+
+	async def _send(self, kwargs: dict) -> bytes:
+		if self.engine.closed:
+			raise RedundantProcessError(f"Already closed: {id(self)}")
+		self.engine.debug(f"AsyncEngineProxy: sending {kwargs['command']}")
+		# Once sent, a command's response has to be received, even if
+		# whoever sent it has been cancelled, or the next command would
+		# get it instead
+		return await asyncio.shield(self._round_trip(kwargs))
+
+	async def _handle(self, kwargs: dict) -> tuple:
+		received = await self._send(kwargs)
+		command, branch, turn, tick, r = self.engine.unpack(received)
+		self.engine._update_time(branch, turn, tick)
+		if isinstance(r, Exception):
+			raise r
+		if kwargs["command"] != command:
+			raise RuntimeError(
+				f"Sent command {kwargs['command']}, "
+				f"but received results for {command}"
+			)
+		return command, branch, turn, tick, r
+
+	async def handle(self, cmd=None, **kwargs):
+		"""Send a command to the LiSE core, and return its result
+
+		Like :meth:`EngineProxy.handle`, but without callbacks.
+
+		"""
+		if "command" not in kwargs:
+			if not cmd:
+				raise TypeError("No command")
+			kwargs["command"] = cmd
+		async with self._command_lock:
+			return (await self._handle(kwargs))[-1]
+
+	async def _apply_delta(self, command, branch, turn, tick, result):
+		# Let the loop run between characters, so a big delta doesn't
+		# freeze the UI
+		for _ in self.engine._iter_upd_caches(result):
+			await asyncio.sleep(0)
+		self.engine._set_time(command, branch, turn, tick, result)
+
+	async def next_turn(self):
+		"""Simulate a turn, and update my caches with what changed"""
+		async with self._command_lock:
+			received = await self._handle({"command": "next_turn"})
+			await self._apply_delta(*received)
+		return received[-1]
+
+	async def advance_turns(self, n: int, delta: bool = False):
+		"""Simulate ``n`` turns
+
+		Without ``delta=True``, the core doesn't tell me what changed,
+		so I get a keyframe of the new state instead.
+
+		"""
+		async with self._command_lock:
+			received = await self._handle(
+				{"command": "advance_turns", "n": n, "delta": delta}
+			)
+			if delta:
+				await self._apply_delta(*received)
+			else:
+				self.engine._set_time(*received)
+				kf = await self._handle({"command": "snap_keyframe"})
+				self.engine._replace_state_with_kf(kf[-1])
+		return received[-1]
+
+	async def time_travel(self, branch: str, turn: int, tick: int = None):
+		"""Move to a different point in the timestream
+
+		Needs ``branch`` and ``turn`` arguments. The ``tick`` is
+		optional; if unspecified, you'll travel to the last tick
+		in the turn.
+
+		"""
+		async with self._command_lock:
+			received = await self._handle(
+				{
+					"command": "time_travel",
+					"branch": branch,
+					"turn": turn,
+					"tick": tick,
+				}
+			)
+			await self._apply_delta(*received)
+		return received[-1]
+
+	@asynccontextmanager
+	async def batch(self):
+		"""Collect changes made to the world, and send them at the end
+
+		Inside, change entities through the wrapped proxy as you would
+		normally, and I'll send them to the core all at once when the
+		``async with`` block ends, as in :meth:`EngineProxy.batch`.
+
+		"""
+		engine = self.engine
+		if engine._pipeline is not None:
+			yield
+			return
+		engine._pipeline = pipeline = []
+		try:
+			yield
+		except BaseException:
+			engine._pipeline = None
+			engine._cancel_pipeline(pipeline)
+			raise
+		engine._pipeline = None
+		if pipeline:
+			async with self._command_lock:
+				received = await self._send(
+					{
+						"command": "run_commands",
+						"commands": [kw for (kw, _, _) in pipeline],
+					}
+				)
+				engine._resolve_pipeline(pipeline, received)
+
+	async def set_stat(self, entity: CachingEntityProxy, key, value):
+		"""Set a stat of a character, node, or portal proxy"""
+		async with self.batch():
+			entity[key] = value
+
+	async def del_stat(self, entity: CachingEntityProxy, key):
+		"""Delete a stat of a character, node, or portal proxy"""
+		async with self.batch():
+			del entity[key]
+
+	async def close(self):
+		"""Close the engine in the subprocess"""
+		loop = asyncio.get_running_loop()
+		async with self._command_lock:
+			await loop.run_in_executor(None, self.engine.close)
+
+
+def engine_subprocess(
+	args, kwargs, input_pipe, output_pipe, logq, loglevel, codec="zlib"
+):
 	"""Loop to handle one command at a time and pipe results back"""
-	from .handle import EngineHandle
+	from .handle import EngineHandle, concat_prepacked
 
 	engine_handle = EngineHandle(*args, logq=logq, loglevel=loglevel, **kwargs)
-	compress = zlib.compress
-	decompress = zlib.decompress
+	engine_handle.codec = codec = Codec.get(codec)
+	compress = codec.compress
+	decompress = codec.decompress
 	pack = engine_handle.pack
 
 	while True:
@@ -3377,23 +3846,7 @@ def engine_subprocess(args, kwargs, input_pipe, output_pipe, logq, loglevel):
 			+ pack(engine_handle._real.tick)
 		)
 		if hasattr(getattr(engine_handle, cmd), "prepacked"):
-			if isinstance(r, dict):
-				resp += msgpack.Packer().pack_map_header(len(r))
-				for k, v in r.items():
-					resp += k + v
-			elif isinstance(r, tuple):
-				pacr = msgpack.Packer()
-				pacr.pack_ext_type(
-					MsgpackExtensionType.tuple.value,
-					msgpack.Packer().pack_array_header(len(r)) + b"".join(r),
-				)
-				resp += pacr.bytes()
-			elif isinstance(r, list):
-				resp += msgpack.Packer().pack_array_header(len(r)) + b"".join(
-					r
-				)
-			else:
-				resp += r
+			resp += concat_prepacked(r)
 		else:
 			resp += pack(r)
 		output_pipe.send_bytes(compress(resp))
@@ -3432,14 +3885,35 @@ class WorkerLogger:
 		self._logq.put((50, msg))
 
 
-def worker_subprocess(prefix: str, in_pipe: Pipe, out_pipe: Pipe, logq: Queue):
+def worker_subprocess(
+	prefix: str,
+	in_pipe: Pipe,
+	out_pipe: Pipe,
+	logq: Queue,
+	codec: Codec = None,
+	branches: dict = None,
+	snapshot: bytes = None,
+):
+	"""Serve requests from the core, until it tells me to shut down
+
+	If ``branches`` and ``snapshot`` aren't provided, they are the first
+	two messages the core sends me.
+
+	"""
 	eng = EngineProxy(None, None, WorkerLogger(logq), prefix=prefix)
 	pack = eng.pack
 	unpack = eng.unpack
-	compress = zlib.compress
-	decompress = zlib.decompress
-	eng._branches = eng.unpack(zlib.decompress(in_pipe.recv_bytes()))
+	codec = Codec.get(codec or "zlib")
+	compress = codec.compress
+	decompress = codec.decompress
+	if branches is None:
+		eng._branches = eng.unpack(decompress(in_pipe.recv_bytes()))
+	else:
+		eng._branches = branches
 	eng._initialized = False
+	if snapshot is not None:
+		eng._upd_from_game_start(None, None, None, None, unpack(snapshot))
+		eng._initialized = True
 	while True:
 		inst = in_pipe.recv_bytes()
 		if inst == b"shutdown":
@@ -3469,16 +3943,53 @@ class RedundantProcessError(ProcessError):
 
 
 class EngineProcessManager(object):
-	def __init__(self, *args, **kwargs):
+	"""Start LiSE in a subprocess, and control it through a proxy
+
+	Arguments are passed on to the :class:`LiSE.Engine`, except for
+	``transport``, which is how the proxy talks to the core. The default,
+	``"pipe"``, uses a pair of :class:`multiprocessing.Pipe`. ``"ring"`` uses
+	a pair of :class:`LiSE.ringbuffer.RingBuffer` in shared memory, which
+	is faster, but only works on one machine.
+
+	And except for ``codec``, how to compress the messages; a
+	:class:`LiSE.codec.Codec`, or ``"zlib"`` or ``"none"``. By default,
+	messages through pipes are compressed, and through ring buffers not.
+
+	"""
+
+	def __init__(
+		self,
+		*args,
+		transport: str = "pipe",
+		codec: Union[Codec, str, None] = None,
+		**kwargs,
+	):
 		self._args = args
 		self._kwargs = kwargs
+		self._transport = transport
+		self._codec = codec
 
 	def start(self, *args, **kwargs):
 		"""Start LiSE in a subprocess, and return a proxy to it"""
 		if hasattr(self, "engine_proxy"):
 			raise RedundantProcessError("Already started")
-		(handle_out_pipe_recv, self._handle_out_pipe_send) = Pipe(duplex=False)
-		(handle_in_pipe_recv, handle_in_pipe_send) = Pipe(duplex=False)
+		transport = kwargs.pop("transport", self._transport)
+		codec = kwargs.pop("codec", self._codec)
+		if codec is None:
+			codec = "zlib" if transport == "pipe" else "none"
+		codec = Codec.get(codec)
+		if transport == "pipe":
+			(handle_out_pipe_recv, self._handle_out_pipe_send) = Pipe(
+				duplex=False
+			)
+			(handle_in_pipe_recv, handle_in_pipe_send) = Pipe(duplex=False)
+			self._rings = ()
+		elif transport == "ring":
+			handle_out_pipe_recv = self._handle_out_pipe_send = RingBuffer()
+			handle_in_pipe_recv = handle_in_pipe_send = RingBuffer()
+			self._rings = (handle_out_pipe_recv, handle_in_pipe_recv)
+		else:
+			raise ValueError(f"Unknown transport: {transport}")
 		self.logq = Queue()
 		handlers = []
 		logl = {
@@ -3533,6 +4044,7 @@ class EngineProcessManager(object):
 				handle_in_pipe_send,
 				self.logq,
 				loglevel,
+				codec,
 			),
 		)
 		self._p.start()
@@ -3545,6 +4057,7 @@ class EngineProcessManager(object):
 			handle_in_pipe_recv,
 			self.logger,
 			install_modules,
+			codec=codec,
 		)
 		return self.engine_proxy
 
@@ -3575,7 +4088,28 @@ class EngineProcessManager(object):
 	def shutdown(self):
 		"""Close the engine in the subprocess, then join the subprocess"""
 		self.engine_proxy.close()
+		self._join()
+
+	async def start_async(self, *args, **kwargs) -> AsyncEngineProxy:
+		"""Start LiSE in a subprocess, and return an asyncio proxy to it"""
+		loop = asyncio.get_running_loop()
+		proxy = await loop.run_in_executor(
+			None, partial(self.start, *args, **kwargs)
+		)
+		self.async_engine_proxy = AsyncEngineProxy(proxy)
+		return self.async_engine_proxy
+
+	async def shutdown_async(self):
+		"""Close the engine in the subprocess, without blocking the loop"""
+		await self.async_engine_proxy.close()
+		del self.async_engine_proxy
+		await asyncio.get_running_loop().run_in_executor(None, self._join)
+
+	def _join(self):
 		self._p.join()
+		for ring in self._rings:
+			ring.close()
+			ring.unlink()
 		del self.engine_proxy
 
 	def __enter__(self):
@@ -3583,3 +4117,9 @@ class EngineProcessManager(object):
 
 	def __exit__(self, exc_type, exc_val, exc_tb):
 		self.shutdown()
+
+	async def __aenter__(self):
+		return await self.start_async()
+
+	async def __aexit__(self, exc_type, exc_val, exc_tb):
+		await self.shutdown_async()
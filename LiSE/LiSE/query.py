@@ -1095,6 +1095,7 @@ class ConnectionHolder(query.ConnectionHolder):
 			"rule_prereqs",
 			"rule_actions",
 			"rule_neighborhood",
+			"rule_batch",
 			"turns_completed",
 			"keyframe_extensions",
 		):
@@ -1199,6 +1200,7 @@ class QueryEngine(query.QueryEngine):
 		"rule_prereqs",
 		"rule_actions",
 		"rule_neighborhoods",
+		"rule_batch",
 	]
 
 	def load_windows(self, windows: list) -> dict:
@@ -1588,6 +1590,31 @@ class QueryEngine(query.QueryEngine):
 			turn_to,
 			tick_to,
 		), got
+		assert self._outq.get() == (
+			"begin",
+			"rule_batch",
+			branch,
+			turn_from,
+			tick_from,
+			turn_to,
+			tick_to,
+		)
+		while isinstance(got := self._outq.get(), list):
+			for rule, branch, turn, tick, batch in got:
+				batch = unpack(batch)
+				if "rule_batch" in ret:
+					ret["rule_batch"].append((rule, branch, turn, tick, batch))
+				else:
+					ret["rule_batch"] = [(rule, branch, turn, tick, batch)]
+		assert got == (
+			"end",
+			"rule_batch",
+			branch,
+			turn_from,
+			tick_from,
+			turn_to,
+			tick_to,
+		), got
 
 	def keyframe_extension_insert(
 		self, branch, turn, tick, universal, rules, rulebooks
@@ -1762,6 +1789,9 @@ class QueryEngine(query.QueryEngine):
 	def rule_neighborhood_dump(self):
 		return self._rule_dump("neighborhood")
 
+	def rule_batch_dump(self):
+		return self._rule_dump("batch")
+
 	characters = characters_dump = query.QueryEngine.graphs_dump
 
 	def node_rulebook_dump(self):
@@ -2278,6 +2308,7 @@ class QueryEngine(query.QueryEngine):
 	set_rule_prereqs = partialmethod(_set_rule_something, "prereqs")
 	set_rule_actions = partialmethod(_set_rule_something, "actions")
 	set_rule_neighborhood = partialmethod(_set_rule_something, "neighborhood")
+	set_rule_batch = partialmethod(_set_rule_something, "batch")
 
 	def set_rule(
 		self,
@@ -2289,6 +2320,7 @@ class QueryEngine(query.QueryEngine):
 		prereqs=None,
 		actions=None,
 		neighborhood=None,
+		batch=False,
 	):
 		try:
 			self.call_one("rules_insert", rule)
@@ -2299,6 +2331,7 @@ class QueryEngine(query.QueryEngine):
 		self.set_rule_prereqs(rule, branch, turn, tick, prereqs or [])
 		self.set_rule_actions(rule, branch, turn, tick, actions or [])
 		self.set_rule_neighborhood(rule, branch, turn, tick, neighborhood)
+		self.set_rule_batch(rule, branch, turn, tick, batch)
 
 	def set_rulebook(self, name, branch, turn, tick, rules=None, prio=0.0):
 		name, rules = map(self.pack, (name, rules or []))
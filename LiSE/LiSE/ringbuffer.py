@@ -0,0 +1,132 @@
+# This file is part of LiSE, a framework for life simulation games.
+# Copyright (c) Zachary Spector, public@zacharyspector.com
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, version 3.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""A one-way channel for bytes between two processes, in shared memory
+
+:class:`RingBuffer` has the ``send_bytes``, ``recv_bytes``, and ``close``
+methods of a :class:`multiprocessing.connection.Connection`, so the
+:class:`LiSE.proxy.EngineProxy` can use it instead of a pipe.
+
+"""
+
+from multiprocessing import Event
+from multiprocessing.shared_memory import SharedMemory
+from struct import Struct
+
+# The shared memory starts with two counters: how many bytes have ever
+# been written, and how many bytes have ever been read. Only the writer
+# changes the first, and only the reader changes the second.
+_COUNTER = Struct("Q")
+_HEAD = 0
+_TAIL = _COUNTER.size
+_DATA = _COUNTER.size * 2
+
+
+class RingBuffer:
+	"""Send messages of bytes from one process to another
+
+	Only one process may send, and only one may receive. Messages may
+	be larger than ``capacity``; they're just sent in pieces.
+
+	The process that made the ring buffer should :meth:`unlink` it,
+	when both processes are done with it.
+
+	"""
+
+	def __init__(self, capacity: int = 16 * 1024 * 1024):
+		self.capacity = capacity
+		self._shm = SharedMemory(create=True, size=_DATA + capacity)
+		_COUNTER.pack_into(self._shm.buf, _HEAD, 0)
+		_COUNTER.pack_into(self._shm.buf, _TAIL, 0)
+		self._written = Event()
+		self._read = Event()
+
+	def _write(self, data: memoryview) -> None:
+		buf = self._shm.buf
+		cap = self.capacity
+		n = len(data)
+		done = 0
+		while done < n:
+			(head,) = _COUNTER.unpack_from(buf, _HEAD)
+			(tail,) = _COUNTER.unpack_from(buf, _TAIL)
+			free = cap - (head - tail)
+			if not free:
+				# Wait for the reader, but check again after clearing,
+				# in case it read in the meantime
+				self._read.clear()
+				(tail,) = _COUNTER.unpack_from(buf, _TAIL)
+				if head - tail == cap:
+					self._read.wait()
+				continue
+			k = min(free, n - done)
+			start = head % cap
+			first = min(k, cap - start)
+			buf[_DATA + start : _DATA + start + first] = data[
+				done : done + first
+			]
+			if k > first:
+				buf[_DATA : _DATA + k - first] = data[done + first : done + k]
+			done += k
+			_COUNTER.pack_into(buf, _HEAD, head + k)
+			self._written.set()
+
+	def _read_into(self, out: memoryview) -> None:
+		buf = self._shm.buf
+		cap = self.capacity
+		n = len(out)
+		done = 0
+		while done < n:
+			(head,) = _COUNTER.unpack_from(buf, _HEAD)
+			(tail,) = _COUNTER.unpack_from(buf, _TAIL)
+			if head == tail:
+				self._written.clear()
+				(head,) = _COUNTER.unpack_from(buf, _HEAD)
+				if head == tail:
+					self._written.wait()
+				continue
+			k = min(head - tail, n - done)
+			start = tail % cap
+			first = min(k, cap - start)
+			out[done : done + first] = buf[
+				_DATA + start : _DATA + start + first
+			]
+			if k > first:
+				out[done + first : done + k] = buf[_DATA : _DATA + k - first]
+			done += k
+			_COUNTER.pack_into(buf, _TAIL, tail + k)
+			self._read.set()
+
+	def send_bytes(self, data: bytes) -> None:
+		"""Send a whole message"""
+		self._write(memoryview(_COUNTER.pack(len(data))))
+		with memoryview(data) as view:
+			self._write(view.cast("B"))
+
+	def recv_bytes(self) -> bytes:
+		"""Wait for a whole message, and return it"""
+		length = bytearray(_COUNTER.size)
+		with memoryview(length) as view:
+			self._read_into(view)
+		out = bytearray(_COUNTER.unpack(length)[0])
+		with memoryview(out) as view:
+			self._read_into(view)
+		return bytes(out)
+
+	def close(self) -> None:
+		"""Stop using the shared memory in this process"""
+		self._shm.close()
+
+	def unlink(self) -> None:
+		"""Free the shared memory, once no process is using it"""
+		self._shm.unlink()
@@ -76,19 +76,32 @@ provided they are already present in the correct module. If it's
 inconvenient to get the actual function object, use a string of
 the function's name.
 
+Rules made with ``batch=True``, like ``@entity.rule(batch=True)``, are
+followed for all their entities at once: their functions get an
+:class:`EntityBatch` rather than one entity, which is much faster
+when there are lots of similar entities following the same rule.
+Their ``neighborhood`` and ``always`` work the same as for other rules,
+deciding which entities go in the batch, and whether it needs triggering.
+
 """
 
-from collections.abc import MutableMapping, MutableSequence, Hashable
+from collections.abc import (
+	MutableMapping,
+	MutableSequence,
+	Hashable,
+	Sequence,
+)
 from abc import ABC, abstractmethod
 from functools import partial, cached_property
 from inspect import getsource
 from ast import parse
 from typing import Callable, Optional
 
+import numpy as np
 from astunparse import unparse
 from blinker import Signal
 
-from .util import dedent_source, AbstractEngine
+from .util import dedent_source, AbstractEngine, AbstractCharacter
 from .xcollections import FunctionStore
 from .cache import Cache
 
@@ -292,6 +305,29 @@ class Rule:
 		self.engine._neighborhoods_cache.store(self.name, *btt, neighbors)
 		self.engine.query.set_rule_neighborhood(self.name, *btt, neighbors)
 
+	@property
+	def batch(self) -> bool:
+		"""Whether my functions take all my entities at once
+
+		If so, they get an :class:`EntityBatch` instead of a single entity.
+
+		"""
+		try:
+			return bool(
+				self.engine._batch_cache.retrieve(
+					self.name, *self.engine._btt()
+				)
+			)
+		except KeyError:
+			return False
+
+	@batch.setter
+	def batch(self, batch: bool):
+		batch = bool(batch)
+		btt = self.engine._nbtt()
+		self.engine._batch_cache.store(self.name, *btt, batch)
+		self.engine.query.set_rule_batch(self.name, *btt, batch)
+
 	def __init__(
 		self,
 		engine,
@@ -300,6 +336,7 @@ class Rule:
 		prereqs=None,
 		actions=None,
 		neighborhood=None,
+		batch=False,
 		create=True,
 	):
 		"""Store the engine and my name, make myself a record in the database
@@ -335,6 +372,7 @@ class Rule:
 				prereqs,
 				actions,
 				neighborhood,
+				batch,
 			)
 			self.engine._triggers_cache.store(
 				name, branch, turn, tick, triggers
@@ -344,6 +382,7 @@ class Rule:
 			self.engine._neighborhoods_cache.store(
 				name, branch, turn, tick, neighborhood
 			)
+			self.engine._batch_cache.store(name, branch, turn, tick, batch)
 			# Don't *make* a keyframe -- but if there happens to already *be*
 			# a keyframe at this very moment, add the new rule to it
 			if (branch, turn, tick) in self.engine._keyframes_times:
@@ -464,6 +503,158 @@ class Rule:
 		self.triggers = [self.engine.trigger.truth]
 
 
+class EntityBatch(Sequence):
+	"""Every entity that a batch rule is being followed for, all at once
+
+	Batch rules' triggers, prereqs, and actions get one of these in place
+	of a single entity. Triggers and prereqs should return either one
+	boolean for the whole batch, or a sequence of them, one per entity;
+	the actions run only on those entities that every prereq and some
+	trigger approved of.
+
+	Actions may return a patch: a dictionary mapping stat keys to
+	sequences of new values, one per entity, which will be set in bulk.
+	``None`` values in a patch leave that entity's stat as it was.
+
+	"""
+
+	__slots__ = ("engine", "entities")
+
+	def __init__(self, engine: AbstractEngine, entities: list):
+		self.engine = engine
+		self.entities = entities
+
+	def __repr__(self):
+		return f"<EntityBatch of {len(self.entities)} entities>"
+
+	def __len__(self):
+		return len(self.entities)
+
+	def __getitem__(self, i):
+		if isinstance(i, slice):
+			return EntityBatch(self.engine, self.entities[i])
+		return self.entities[i]
+
+	def __iter__(self):
+		return iter(self.entities)
+
+	@staticmethod
+	def _stats(entity):
+		if isinstance(entity, AbstractCharacter):
+			return entity.stat
+		return entity
+
+	def column(self, key: Hashable, default=None) -> list:
+		"""Return a list of the values of ``key``, one for each entity"""
+		btt = self.engine._btt()
+		ret = []
+		append = ret.append
+		stats = self._stats
+		for entity in self.entities:
+			mapping = stats(entity)
+			if key in getattr(mapping, "_extra_keys", ()):
+				append(mapping.get(key, default))
+				continue
+			try:
+				append(mapping._get_cache(key, *btt))
+			except KeyError:
+				append(default)
+		return ret
+
+	def array(self, key: Hashable, default=None) -> np.ndarray:
+		"""Return a numpy array of the values of ``key``
+
+		One value per entity, in the same order as me.
+
+		"""
+		return np.array(self.column(key, default))
+
+	def update(self, patch: dict) -> None:
+		"""Set stats on every entity in me, in bulk
+
+		``patch`` maps stat keys to sequences of values, one per entity.
+		They're set the same way as ``entity[key] = value`` would,
+		except that values the entity already has are skipped.
+
+		"""
+		n = len(self.entities)
+		btt = self.engine._btt
+		stats = self._stats
+		for key, values in patch.items():
+			if hasattr(values, "tolist"):
+				values = values.tolist()
+			if len(values) != n:
+				raise ValueError(
+					f"Need {n} values for {key}, got {len(values)}"
+				)
+			for entity, value in zip(self.entities, values):
+				if value is None:
+					continue
+				mapping = stats(entity)
+				if key not in getattr(mapping, "_extra_keys", ()):
+					try:
+						if mapping._get_cache(key, *btt()) == value:
+							continue
+					except KeyError:
+						pass
+				mapping[key] = value
+
+
+class RulePlan:
+	"""What a rule does, looked up ahead of time for the rules engine
+
+	Has the rule's trigger, prereq, and action functions themselves,
+	rather than their names, as well as its neighborhood and whether
+	it's a batch rule, so the rules engine doesn't need to look them
+	up again for every entity it follows the rule on.
+
+	"""
+
+	__slots__ = (
+		"rule",
+		"name",
+		"trigger_names",
+		"triggers",
+		"prereqs",
+		"action_names",
+		"actions",
+		"neighborhood",
+		"batch",
+	)
+
+	def __init__(self, rule: Rule):
+		self.rule = rule
+		self.name = rule.name
+		self.trigger_names = tuple(rule.triggers._get())
+		self.triggers = tuple(rule.triggers)
+		self.prereqs = tuple(rule.prereqs)
+		self.action_names = tuple(rule.actions._get())
+		self.actions = tuple(rule.actions)
+		self.neighborhood = rule.neighborhood
+		self.batch = rule.batch
+
+	def __repr__(self):
+		return f"<RulePlan for {self.name}>"
+
+
+class RulebookPlan:
+	"""The plans for all the rules in a rulebook, by name"""
+
+	__slots__ = ("name", "priority", "rules", "always")
+
+	def __init__(self, rulebook: "RuleBook"):
+		engine = rulebook.engine
+		self.name = rulebook.name
+		self.priority = rulebook.priority
+		self.rules = {
+			rulename: RulePlan(engine.rule[rulename]) for rulename in rulebook
+		}
+		self.always = engine.trigger.truth in rulebook
+
+	def __repr__(self):
+		return f"<RulebookPlan for {self.name}>"
+
+
 class RuleBook(MutableSequence, Signal):
 	"""A list of rules to be followed for some Character, or a part of it"""
 
@@ -660,6 +851,7 @@ class RuleMapping(MutableMapping, Signal):
 		*,
 		neighborhood: Optional[int] = -1,
 		always: bool = False,
+		batch: bool = False,
 	):
 		def wrap(name, v, **kwargs):
 			name = name if name is not None else v.__name__
@@ -671,6 +863,8 @@ class RuleMapping(MutableMapping, Signal):
 				r.always()
 			if "neighborhood" in kwargs:
 				r.neighborhood = kwargs["neighborhood"]
+			if kwargs.get("batch"):
+				r.batch = True
 			return r
 
 		kwargs = {}
@@ -678,6 +872,8 @@ class RuleMapping(MutableMapping, Signal):
 			kwargs["always"] = True
 		if neighborhood != -1:
 			kwargs["neighborhood"] = neighborhood
+		if batch:
+			kwargs["batch"] = True
 		if v is None:
 			return partial(wrap, name, **kwargs)
 		return wrap(name, v, **kwargs)
@@ -869,6 +1065,7 @@ class AllRules(MutableMapping, Signal):
 		*,
 		neighborhood: Optional[int] = -1,
 		always=False,
+		batch=False,
 	):
 		def r(name, v, **kwargs):
 			if name is None:
@@ -881,6 +1078,8 @@ class AllRules(MutableMapping, Signal):
 				ret.triggers.append("truth")
 			if "neighborhood" in kwargs:
 				ret.neighborhood = neighborhood
+			if kwargs.get("batch"):
+				ret.batch = True
 			return ret
 
 		kwargs = {}
@@ -888,6 +1087,8 @@ class AllRules(MutableMapping, Signal):
 			kwargs["always"] = True
 		if neighborhood != -1:
 			kwargs["neighborhood"] = neighborhood
+		if batch:
+			kwargs["batch"] = True
 		if v is None:
 			return partial(r, name, **kwargs)
 		return r(name, v, **kwargs)
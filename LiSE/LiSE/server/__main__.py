@@ -26,25 +26,45 @@ accepted by that method.
 Refer to :class:`LiSE.handle.EngineHandle` for documentation on those
 methods.
 
+With ``--stream``, it will instead start a
+:class:`LiSE.server.LiSEStreamServer`, on a Unix socket if you give a
+``--path``, else on ``--host`` and ``--port``.
+
 """
 
-import cherrypy
+import asyncio
 from argparse import ArgumentParser
-from . import LiSEHandleWebService
 
 parser = ArgumentParser()
 parser.add_argument("--prefix", action="store", default=".")
+parser.add_argument("--stream", action="store_true")
+parser.add_argument("--host", action="store", default="localhost")
+parser.add_argument("--port", action="store", type=int, default=8080)
+parser.add_argument("--path", action="store", default=None)
 args = parser.parse_args()
-conf = {
-	"/": {
-		"request.dispatch": cherrypy.dispatch.MethodDispatcher(),
-		"tools.sessions.on": True,
-		"tools.response_headers.on": True,
-		"tools.response_headers.headers": [
-			("Content-Type", "application/json")
-		],
-		"tools.encode.on": True,
-		"tools.encode.encoding": "utf-8",
+if args.stream:
+	from .stream import LiSEStreamServer
+
+	async def serve_forever():
+		async with LiSEStreamServer(args.prefix) as server:
+			listener = await server.serve(args.host, args.port, path=args.path)
+			await listener.serve_forever()
+
+	asyncio.run(serve_forever())
+else:
+	import cherrypy
+	from .web import LiSEHandleWebService
+
+	conf = {
+		"/": {
+			"request.dispatch": cherrypy.dispatch.MethodDispatcher(),
+			"tools.sessions.on": True,
+			"tools.response_headers.on": True,
+			"tools.response_headers.headers": [
+				("Content-Type", "application/json")
+			],
+			"tools.encode.on": True,
+			"tools.encode.encoding": "utf-8",
+		}
 	}
-}
-cherrypy.quickstart(LiSEHandleWebService(args.prefix), "/", conf)
+	cherrypy.quickstart(LiSEHandleWebService(args.prefix), "/", conf)
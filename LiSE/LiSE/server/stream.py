@@ -0,0 +1,501 @@
+# This file is part of LiSE, a framework for life simulation games.
+# Copyright (c) Zachary Spector, public@zacharyspector.com
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, version 3.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""Serve one LiSE core to many clients over a socket, streaming deltas
+
+Every message, either way, is a four-byte, big-endian length, followed
+by that many bytes of msgpack, compressed by a :class:`LiSE.codec.Codec`
+that the server and its clients agree on.
+
+Clients send mappings like the ones :class:`LiSE.proxy.EngineProxy`
+sends: the key ``"command"`` is the name of a method of
+:class:`LiSE.handle.EngineHandle`, and the other keys are its arguments.
+Those go in a queue, and run one at a time. The server responds to each
+with an array of the command's name, the branch, turn, and tick after
+it ran, and its result, in the order they were sent.
+
+A few commands never wait in the queue:
+
+* ``"get_btt"`` responds with the current time.
+* ``"snapshot"`` responds with a keyframe of the world.
+* ``"subscribe"`` does the same, and then, whenever a command changes
+  the world, the client also gets an array of ``"delta"``, the new
+  branch, turn, and tick, and a delta from the time before.
+* ``"unsubscribe"`` stops that.
+
+Some read-only queries are answered from that same keyframe, so they
+don't wait for the engine either, once it's taken:
+
+* ``"node_exists"``, with ``char`` and ``node``, like the
+  :class:`LiSE.handle.EngineHandle` method.
+* ``"universal_copy"``, the universal stats.
+* ``"character_stat_copy"``, with ``char``.
+* ``"node_stat_copy"``, with ``char`` and ``node``.
+* ``"portal_stat_copy"``, with ``char``, ``orig``, and ``dest``.
+
+Those last four aren't methods of :class:`LiSE.handle.EngineHandle`.
+They report the stats as they are in the keyframe, which, for
+characters, includes their rulebooks.
+
+Each delta is packed once, no matter how many clients get it, and so
+is each keyframe, until the world changes again. If taking the keyframe
+fails, everyone waiting for it gets the exception.
+
+"""
+
+import asyncio
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from struct import Struct
+from typing import Callable, Optional, Set, Tuple, Union
+
+import msgpack
+
+from ..allegedb import OutOfTimelineError
+from ..codec import Codec
+from ..engine import NONE
+from ..handle import EngineHandle, concat_prepacked
+from ..util import MsgpackExtensionType
+
+_LENGTH = Struct("!I")
+# Commands that send a delta of their own, which subscribers can share
+_DELTA_COMMANDS = {"next_turn", "advance_turns", "time_travel"}
+
+
+def _node_exists(kf: dict, char, node) -> bool:
+	return bool(kf["nodes"].get(char, {}).get(node, False))
+
+
+def _node_stat_copy(kf: dict, char, node) -> dict:
+	if not _node_exists(kf, char, node):
+		raise KeyError("No such node", char, node)
+	return kf["node_val"].get(char, {}).get(node, {})
+
+
+def _portal_stat_copy(kf: dict, char, orig, dest) -> dict:
+	if not kf["edges"].get(char, {}).get(orig, {}).get(dest, False):
+		raise KeyError("No such portal", char, orig, dest)
+	return kf["edge_val"].get(char, {}).get(orig, {}).get(dest, {})
+
+
+def _character_stat_copy(kf: dict, char) -> dict:
+	if char not in kf["graph_val"]:
+		raise KeyError("No such character", char)
+	return kf["graph_val"][char]
+
+
+# Read-only queries that can be answered from a keyframe
+_SNAPSHOT_READS = {
+	"node_exists": _node_exists,
+	"universal_copy": lambda kf: kf["universal"],
+	"character_stat_copy": _character_stat_copy,
+	"node_stat_copy": _node_stat_copy,
+	"portal_stat_copy": _portal_stat_copy,
+}
+_READ_COMMANDS = {
+	"get_btt",
+	"snapshot",
+	"subscribe",
+	"unsubscribe",
+	*_SNAPSHOT_READS,
+}
+
+
+async def _read_frame(reader: asyncio.StreamReader) -> bytes:
+	(length,) = _LENGTH.unpack(await reader.readexactly(_LENGTH.size))
+	return await reader.readexactly(length)
+
+
+def _pack_response(pack, command: str, btt: tuple, packed: bytes) -> bytes:
+	return (
+		msgpack.Packer().pack_array_header(5)
+		+ pack(command)
+		+ b"".join(map(pack, btt))
+		+ packed
+	)
+
+
+class LiSEStreamServer:
+	"""Run a LiSE core, and let clients use it over a socket
+
+	Arguments are passed on to :class:`LiSE.handle.EngineHandle`, except
+	for ``codec``, which is how to compress messages, and ``logger``.
+
+	The engine runs in a thread of its own, so the event loop keeps
+	answering clients during long turns.
+
+	"""
+
+	def __init__(
+		self,
+		*args,
+		codec: Union[Codec, str] = "zlib",
+		logger: logging.Logger = None,
+		**kwargs,
+	):
+		self._args = args
+		self._kwargs = kwargs
+		self._codec = Codec.get(codec)
+		self.logger = logger or logging.getLogger(__name__)
+		self._engine_thread = ThreadPoolExecutor(1, thread_name_prefix="LiSE")
+		self._handle: Optional[EngineHandle] = None
+		self._server: Optional[asyncio.AbstractServer] = None
+		self._clients: Set[asyncio.Queue] = set()
+		self._subscribers: Set[asyncio.Queue] = set()
+		# The time as of the last delta. In the engine thread, that's
+		# always the present, between commands; in the event loop,
+		# it's the time of the last delta sent to subscribers.
+		self._streamed_btt: Optional[Tuple[str, int, int]] = None
+		self._btt: Optional[Tuple[str, int, int]] = None
+		self._snapshot_frames = {}
+		self._snapshot_waiters = []
+
+	async def serve(
+		self, host: str = "localhost", port: int = 8080, *, path: str = None
+	) -> asyncio.AbstractServer:
+		"""Start the engine, and listen for clients
+
+		On the TCP ``host`` and ``port``, or, if you supply a ``path``,
+		on a Unix domain socket there.
+
+		"""
+		self._loop = loop = asyncio.get_running_loop()
+		await loop.run_in_executor(self._engine_thread, self._start_engine)
+		self._btt = self._streamed_btt
+		if path is None:
+			self._server = await asyncio.start_server(
+				self._serve_client, host, port
+			)
+		else:
+			self._server = await asyncio.start_unix_server(
+				self._serve_client, path
+			)
+		return self._server
+
+	async def close(self) -> None:
+		"""Stop listening, disconnect the clients, and close the engine"""
+		if self._server is not None:
+			self._server.close()
+			await self._server.wait_closed()
+		for outbox in self._clients:
+			outbox.put_nowait(None)
+		if self._handle is not None:
+			await self._loop.run_in_executor(
+				self._engine_thread, self._handle.close
+			)
+		self._engine_thread.shutdown()
+
+	async def __aenter__(self):
+		return self
+
+	async def __aexit__(self, exc_type, exc_val, exc_tb):
+		await self.close()
+
+	def _start_engine(self) -> None:
+		self._handle = EngineHandle(*self._args, **self._kwargs)
+		self._handle.codec = self._codec
+		self._streamed_btt = self._handle._real._btt()
+
+	async def _serve_client(
+		self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+	) -> None:
+		outbox = asyncio.Queue()
+		self._clients.add(outbox)
+		sender = asyncio.ensure_future(self._send_forever(outbox, writer))
+		try:
+			while True:
+				try:
+					frame = await _read_frame(reader)
+				except (asyncio.IncompleteReadError, ConnectionError):
+					break
+				await self._receive(outbox, frame)
+		finally:
+			self._clients.discard(outbox)
+			self._subscribers.discard(outbox)
+			outbox.put_nowait(None)
+			await sender
+
+	@staticmethod
+	async def _send_forever(
+		outbox: asyncio.Queue, writer: asyncio.StreamWriter
+	) -> None:
+		# Each client gets its own queue, so a slow one doesn't hold up
+		# the others
+		try:
+			while (frame := await outbox.get()) is not None:
+				writer.write(_LENGTH.pack(len(frame)) + frame)
+				await writer.drain()
+		except ConnectionError:
+			pass
+		finally:
+			writer.close()
+
+	async def _receive(self, outbox: asyncio.Queue, frame: bytes) -> None:
+		instruction = unpack(self._codec.decompress(frame))
+		cmd = instruction.pop("command", None)
+		if cmd not in _READ_COMMANDS:
+			# Unpack it properly in the engine thread, since that might
+			# need the engine
+			outbox.put_nowait(
+				await self._loop.run_in_executor(
+					self._engine_thread, self._run_write, frame
+				)
+			)
+		elif cmd == "get_btt":
+			outbox.put_nowait(self._respond(cmd, self._handle.pack(self._btt)))
+		elif cmd == "unsubscribe":
+			self._subscribers.discard(outbox)
+			outbox.put_nowait(self._respond(cmd, self._handle.pack(True)))
+		else:
+			if cmd in _SNAPSHOT_READS:
+				send = partial(self._send_read, outbox, cmd, instruction)
+			else:
+				send = partial(self._send_snapshot, outbox, cmd)
+			if "kf" in self._snapshot_frames:
+				send()
+				return
+			# Everyone who wants the snapshot before it's done can share
+			sent = self._loop.create_future()
+			if not self._snapshot_waiters:
+				self._loop.run_in_executor(
+					self._engine_thread, self._take_snapshot
+				)
+			self._snapshot_waiters.append((send, sent))
+			try:
+				await sent
+			except Exception as ex:
+				outbox.put_nowait(self._respond(cmd, self._handle.pack(ex)))
+
+	def _respond(self, cmd: str, packed: bytes) -> bytes:
+		return self._codec.compress(
+			_pack_response(self._handle.pack, cmd, self._btt, packed)
+		)
+
+	def _send_snapshot(self, outbox: asyncio.Queue, cmd: str) -> None:
+		frames = self._snapshot_frames
+		if cmd not in frames:
+			frames[cmd] = self._respond(cmd, frames["kf"])
+		outbox.put_nowait(frames[cmd])
+		if cmd == "subscribe":
+			self._subscribers.add(outbox)
+
+	def _send_read(
+		self, outbox: asyncio.Queue, cmd: str, instruction: dict
+	) -> None:
+		frames = self._snapshot_frames
+		if "data" not in frames:
+			frames["data"] = unpack(frames["kf"])
+		try:
+			r = _SNAPSHOT_READS[cmd](frames["data"], **instruction)
+		except Exception as ex:
+			r = ex
+		outbox.put_nowait(self._respond(cmd, self._handle.pack(r)))
+
+	def _take_snapshot(self) -> None:
+		try:
+			packed = self._handle.pack(self._handle.snap_keyframe())
+		except Exception as ex:
+			self.logger.exception("LiSEStreamServer: couldn't snapshot")
+			self._loop.call_soon_threadsafe(self._fail_snapshot, ex)
+			return
+		self._loop.call_soon_threadsafe(self._set_snapshot, packed)
+
+	def _set_snapshot(self, packed: bytes) -> None:
+		# Runs after any deltas the engine thread sent before taking the
+		# snapshot, and before any it sends after, so the snapshot is of
+		# the present, as far as the loop knows
+		self._snapshot_frames = {"kf": packed}
+		waiters = self._snapshot_waiters
+		self._snapshot_waiters = []
+		for send, sent in waiters:
+			send()
+			sent.set_result(None)
+
+	def _fail_snapshot(self, ex: Exception) -> None:
+		waiters = self._snapshot_waiters
+		self._snapshot_waiters = []
+		for _, sent in waiters:
+			sent.set_exception(ex)
+
+	def _run_write(self, frame: bytes) -> bytes:
+		handle = self._handle
+		instruction = handle.unpack(self._codec.decompress(frame))
+		cmd = instruction.pop("command")
+		branching = instruction.pop("branching", False)
+		instruction.pop("silent", None)
+		self.logger.debug(f"LiSEStreamServer: running {cmd}")
+		try:
+			method = getattr(handle, cmd)
+			try:
+				r = method(**instruction)
+			except OutOfTimelineError:
+				if not branching:
+					raise
+				handle.increment_branch()
+				r = method(**instruction)
+		except Exception as ex:
+			packed = handle.pack(ex)
+		else:
+			if hasattr(method, "prepacked"):
+				packed = concat_prepacked(r)
+			else:
+				packed = handle.pack(r)
+			if cmd in _DELTA_COMMANDS and r[1] != NONE:
+				self._stream(r[1])
+		self._stream()
+		return self._codec.compress(
+			_pack_response(handle.pack, cmd, handle._real._btt(), packed)
+		)
+
+	def _stream(self, packed_delta: bytes = None) -> None:
+		handle = self._handle
+		btt = handle._real._btt()
+		btt_from = self._streamed_btt
+		if btt == btt_from:
+			return
+		self._streamed_btt = btt
+		# Even with no subscribers yet, since one might subscribe before
+		# the loop gets this
+		if packed_delta is None:
+			packed_delta = handle._pack_delta(
+				handle._real.get_delta(btt_from, btt)
+			)[1]
+		frame = self._codec.compress(
+			_pack_response(handle.pack, "delta", btt, packed_delta)
+		)
+		self._loop.call_soon_threadsafe(self._broadcast, btt, frame)
+
+	def _broadcast(self, btt: Tuple[str, int, int], frame: bytes) -> None:
+		self._btt = btt
+		self._snapshot_frames = {}
+		for outbox in self._subscribers:
+			outbox.put_nowait(frame)
+
+
+def _ext_hook(code: int, data: bytes):
+	data = msgpack.unpackb(data, ext_hook=_ext_hook, strict_map_key=False)
+	if code == MsgpackExtensionType.tuple.value:
+		return tuple(data)
+	elif code == MsgpackExtensionType.frozenset.value:
+		return frozenset(data)
+	elif code == MsgpackExtensionType.set.value:
+		return set(data)
+	elif code == MsgpackExtensionType.exception.value:
+		return Exception(data[0], *data[2:])
+	return msgpack.ExtType(code, data)
+
+
+def unpack(data: bytes):
+	"""Unpack what a LiSE core sends, without a LiSE engine
+
+	Tuples and sets come back as such, and exceptions as plain
+	:class:`Exception` with the name of their real type first.
+	Characters and other LiSE entities stay :class:`msgpack.ExtType`.
+
+	"""
+	return msgpack.unpackb(data, ext_hook=_ext_hook, strict_map_key=False)
+
+
+class LiSEStreamClient:
+	"""Talk to a :class:`LiSEStreamServer`
+
+	Make one with :meth:`connect`. Then ``await`` :meth:`handle` to send
+	commands, or :meth:`subscribe`, then iterate over :meth:`deltas`.
+
+	"""
+
+	def __init__(
+		self,
+		reader: asyncio.StreamReader,
+		writer: asyncio.StreamWriter,
+		codec: Union[Codec, str] = "zlib",
+		unpack: Callable[[bytes], object] = unpack,
+	):
+		self._reader = reader
+		self._writer = writer
+		self._codec = Codec.get(codec)
+		self.unpack = unpack
+		self._waiting = []
+		self._deltas = asyncio.Queue()
+		self._receiver = asyncio.ensure_future(self._receive_forever())
+
+	@classmethod
+	async def connect(
+		cls,
+		host: str = "localhost",
+		port: int = 8080,
+		*,
+		path: str = None,
+		codec: Union[Codec, str] = "zlib",
+		unpack: Callable[[bytes], object] = unpack,
+	) -> "LiSEStreamClient":
+		"""Connect to a server by TCP, or to a Unix socket at ``path``"""
+		if path is None:
+			reader, writer = await asyncio.open_connection(host, port)
+		else:
+			reader, writer = await asyncio.open_unix_connection(path)
+		return cls(reader, writer, codec, unpack)
+
+	async def _receive_forever(self) -> None:
+		try:
+			while True:
+				frame = await _read_frame(self._reader)
+				command, branch, turn, tick, result = self.unpack(
+					self._codec.decompress(frame)
+				)
+				if command == "delta":
+					self._deltas.put_nowait((branch, turn, tick, result))
+				else:
+					self._waiting.pop(0).set_result(
+						(command, branch, turn, tick, result)
+					)
+		except (asyncio.IncompleteReadError, ConnectionError) as ex:
+			for fut in self._waiting:
+				fut.set_exception(ex)
+			self._deltas.put_nowait(None)
+
+	async def handle(self, cmd: str = None, **kwargs):
+		"""Send a command, and return its result"""
+		if cmd:
+			kwargs["command"] = cmd
+		packed = msgpack.packb(kwargs)
+		fut = asyncio.get_running_loop().create_future()
+		self._waiting.append(fut)
+		self._writer.write(
+			_LENGTH.pack(len(packed := self._codec.compress(packed))) + packed
+		)
+		await self._writer.drain()
+		command, self.branch, self.turn, self.tick, result = await fut
+		if isinstance(result, Exception):
+			raise result
+		return result
+
+	async def subscribe(self):
+		"""Start getting deltas, and return a keyframe of the world"""
+		return await self.handle("subscribe")
+
+	async def unsubscribe(self) -> None:
+		"""Stop getting deltas"""
+		await self.handle("unsubscribe")
+
+	async def deltas(self):
+		"""Iterate over ``(branch, turn, tick, delta)``, until disconnected"""
+		while (delta := await self._deltas.get()) is not None:
+			yield delta
+
+	async def close(self) -> None:
+		"""Disconnect"""
+		self._writer.close()
+		await self._receiver
@@ -35,6 +35,7 @@ def test_eternal(handle_initialized):
 		b"\xa4turn": b"\x00",
 		b"\xa4tick": b"\x00",
 		b"\xa8language": b"\xa3eng",
+		b"\xabrandom_seed": b"\xce\x00\x01\r\xf1",
 		b"\xa4haha": b"\xa3lol",
 	}
 
@@ -107,3 +108,22 @@ def test_character(handle_initialized):
 	kf2 = handle_initialized.snap_keyframe()
 	del kf2["universal"]
 	assert kf2 == kf0
+
+
+def test_advance_turns(handle_initialized):
+	hand = handle_initialized
+	unpack_delta = hand._real._unpack_slightly_packed_delta
+	branch, turn, tick = hand._real._btt()
+	ret, delta = hand.advance_turns(3)
+	assert hand._real.turn == turn + 3
+	assert hand.unpack(delta) is None
+	btt = hand._real._btt()
+	ret, delta = hand.advance_turns(2, delta=True)
+	assert hand._real.turn == turn + 5
+	slowd = unpack_delta(
+		hand._get_slow_delta(btt_from=btt, btt_to=hand._real._btt())
+	)
+	fastd = hand.unpack(delta)
+	del slowd["universal"]["rando_state"]
+	del fastd["universal"]["rando_state"]
+	assert fastd == slowd
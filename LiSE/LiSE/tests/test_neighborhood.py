@@ -33,6 +33,25 @@ def test_sim_start(three3):
 	assert three3.stat["it_ran"] == 9  # still!
 
 
+def test_batch_sim_start(three3):
+	"""Test that batch rules skip entities whose neighborhoods didn't change"""
+
+	@three3.place.rule(neighborhood=1, always=True, batch=True)
+	def did_it_run(places):
+		univ = places.engine.universal
+		univ["runs"] = univ.get("runs", 0) + len(places)
+		return {"it_ran": [True] * len(places)}
+
+	eng = three3.engine
+	eng.next_turn()
+	assert three3.place[1, 1]["it_ran"]
+	assert eng.universal["runs"] == 9
+	eng.next_turn()
+	assert eng.universal["runs"] == 18
+	eng.next_turn()
+	assert eng.universal["runs"] == 18  # still!
+
+
 @pytest.mark.parametrize(
 	("branched", "rulebook"), product(*[(True, False)] * 2)
 )
@@ -73,3 +92,44 @@ def test_rule_neighborhood(serial_engine, branched, rulebook):
 
 	for outer in [(1, 1), (4, 4)]:
 		assert "trigger_evaluated" not in char.place[outer]
+
+
+def test_neighborhood_cache(tmp_path):
+	from LiSE import Engine
+
+	with Engine(
+		tmp_path,
+		random_seed=69105,
+		workers=0,
+		threaded_triggers=False,
+		neighborhood_cache_size=4,
+	) as eng:
+		three3 = eng.new_character("3x3", grid_2d_8graph(3, 3))
+
+		@three3.place.rule(neighborhood=1, always=True)
+		def count_runs(place):
+			place.character.stat["runs"] = (
+				place.character.stat.get("runs", 0) + 1
+			)
+
+		eng.next_turn()
+		assert three3.stat["runs"] == 9
+		assert len(eng._neighbors_cache) <= 4
+		eng.next_turn()
+		assert three3.stat["runs"] == 9
+		three3.place[0, 0].new_thing("thing")
+		eng.next_turn()
+		# Only the places next to the new thing noticed it
+		assert three3.stat["runs"] == 13
+		assert len(eng._neighbors_cache) <= 4
+		loads = []
+		load_at = eng._load_at
+
+		def count_load_at(*args):
+			loads.append(args)
+			return load_at(*args)
+
+		eng._load_at = count_load_at
+		eng.next_turn()
+		assert three3.stat["runs"] == 13
+		assert not loads  # nothing moved, so no need to look at last turn
@@ -19,6 +19,13 @@ it was followed got recorded correctly.
 
 """
 
+import multiprocessing
+import threading
+
+import pytest
+
+from LiSE import Engine
+
 
 def test_character_dot_rule(engy):
 	"""Test that a rule on a character is polled correctly"""
@@ -210,3 +217,319 @@ def test_post_time_travel_increment(engy):
 	assert engy.tick == 2
 	engy.next_turn()
 	assert engy.tick == 2
+
+
+def test_many_triggers(engy):
+	"""Test that triggers on many entities each get the right result
+
+	With worker processes, these are evaluated in one batch per worker.
+
+	"""
+	char = engy.new_character("char")
+	for i in range(20):
+		place = char.new_place(i)
+		if i % 3 == 0:
+			place["go"] = True
+
+	@char.place.rule
+	def ran(plac):
+		plac["ran"] = True
+
+	@ran.trigger
+	def going(plac):
+		return plac.get("go")
+
+	engy.next_turn()
+	for i in range(20):
+		assert ("ran" in char.place[i]) == (i % 3 == 0)
+
+
+def test_random_trigger(engy):
+	"""Test that triggers can use randomness even with worker processes
+
+	Worker processes don't have the randomizer, so these triggers have
+	to be evaluated in the core.
+
+	"""
+	char = engy.new_character("char")
+	for i in range(5):
+		char.new_place(i)
+
+	@char.place.rule
+	def ran(plac):
+		plac["ran"] = True
+
+	@ran.trigger
+	def lucky(plac):
+		return plac.engine.random() <= 1.0
+
+	engy.next_turn()
+	for i in range(5):
+		assert char.place[i]["ran"]
+
+
+@pytest.mark.parametrize("workers", [0, 2])
+def test_track_trigger_reads(tmp_path, workers):
+	"""Test that triggers are only evaluated again when what they read changed
+
+	Otherwise, their results from last time get reused. Worker processes
+	don't change that.
+
+	"""
+	with Engine(
+		tmp_path,
+		random_seed=69105,
+		workers=workers,
+		track_trigger_reads=True,
+	) as eng:
+		char = eng.new_character("char")
+		for i in range(10):
+			char.new_place(i, go=i % 2 == 0, count=0)
+
+		@char.place.rule
+		def count(plac):
+			plac["count"] += 1
+
+		@count.trigger
+		def going(plac):
+			return plac["go"]
+
+		memos = eng._trigger_reads_memo
+
+		def memo_turn(i):
+			return memos["count", "char", i][0]
+
+		eng.next_turn()
+		assert {memo_turn(i) for i in range(10)} == {1}
+		eng.next_turn()
+		# nobody's "go" changed, so the triggers didn't run again
+		assert {memo_turn(i) for i in range(10)} == {1}
+		char.place[0]["go"] = False
+		char.place[1]["go"] = True
+		eng.next_turn()
+		assert memo_turn(0) == memo_turn(1) == 3
+		assert {memo_turn(i) for i in range(2, 10)} == {1}
+		assert char.place[0]["count"] == 2
+		assert char.place[1]["count"] == 1
+		for i in range(2, 10):
+			assert char.place[i]["count"] == (3 if i % 2 == 0 else 0)
+
+
+def test_parallel_actions(tmp_path):
+	"""Test actions run in the workers, and conflicting ones run serially"""
+	with Engine(
+		tmp_path, random_seed=69105, workers=2, parallel_actions=True
+	) as eng:
+		replayed = []
+		replay = eng._replay_worker_write
+
+		def replay_and_count(cmd):
+			replayed.append(cmd)
+			replay(cmd)
+
+		eng._replay_worker_write = replay_and_count
+		char = eng.new_character("char", count=0)
+		for i in range(10):
+			char.new_place(i, n=i)
+
+		@char.place.rule(always=True)
+		def double(plac):
+			plac["n"] *= 2
+
+		eng.next_turn()
+		assert len(replayed) == 10
+		for i in range(10):
+			assert char.place[i]["n"] == i * 2
+
+		@char.place.rule(always=True)
+		def count(plac):
+			plac.character.stat["count"] += 1
+
+		eng.next_turn()
+		# they all wrote to the character's count, so none of that
+		# should have been replayed
+		assert len(replayed) == 10
+		for i in range(10):
+			assert char.place[i]["n"] == i * 4
+		assert char.stat["count"] == 10
+
+
+def test_worker_snapshot(tmp_path):
+	"""Test that workers get the whole world from shared memory
+
+	That happens when they start, and when the branch changes.
+
+	"""
+	with Engine(tmp_path, random_seed=69105, workers=2) as eng:
+		char = eng.new_character("char")
+		for i in range(5):
+			char.new_place(i)
+
+		@eng.method
+		def count_places(self):
+			return len(self.character["char"].place)
+
+		first_snapshot = eng._worker_snapshot.name
+		eng.branch = "other"
+		char.new_place(5)
+		eng.next_turn()
+		futs = [eng.submit(eng.method.count_places) for _ in range(4)]
+		assert [fut.result() for fut in futs] == [6] * 4
+		assert eng._worker_snapshot.name != first_snapshot
+
+
+@pytest.mark.skipif(
+	"fork" not in multiprocessing.get_all_start_methods(),
+	reason="Can't fork here",
+)
+def test_fork_workers(tmp_path):
+	"""Test that forked workers inherit the world, instead of being sent it"""
+	with Engine(tmp_path, random_seed=69105, workers=0) as eng:
+		char = eng.new_character("char")
+		for i in range(5):
+			char.new_place(i)
+
+		@eng.method
+		def count_places(self):
+			return len(self.character["char"].place)
+
+	with Engine(
+		tmp_path, random_seed=69105, workers=2, worker_start_method="fork"
+	) as eng:
+		assert eng._worker_snapshot is None
+		futs = [eng.submit(eng.method.count_places) for _ in range(4)]
+		assert [fut.result() for fut in futs] == [5] * 4
+
+
+def test_worker_update_encoded_once(tmp_path):
+	"""Test that workers at the same time get the same update message"""
+	with Engine(tmp_path, random_seed=69105, workers=2) as eng:
+		sent = []
+
+		class RecordingPipe:
+			def __init__(self, pipe):
+				self.pipe = pipe
+
+			def send_bytes(self, b):
+				sent.append(b)
+				self.pipe.send_bytes(b)
+
+		eng.new_character("char").new_place("here")
+		pipes = eng._worker_inputs
+		eng._worker_inputs = list(map(RecordingPipe, pipes))
+		eng.character["char"].place["here"]["n"] = 1
+		eng._update_all_worker_process_states()
+		eng._worker_inputs = pipes
+		assert len(sent) == 2
+		assert sent[0] is sent[1]
+
+
+def test_submit_many(tmp_path):
+	"""Test that lots of submitted calls all finish, without lots of threads"""
+	with Engine(tmp_path, random_seed=69105, workers=2) as eng:
+
+		@eng.function
+		def double(n):
+			return n * 2
+
+		threads_before = threading.active_count()
+		futs = [eng.submit(eng.function.double, i) for i in range(500)]
+		assert threading.active_count() == threads_before
+		assert [fut.result() for fut in futs] == [i * 2 for i in range(500)]
+
+
+def test_submit_from_threads(tmp_path):
+	"""Test that futures submitted from several threads at once all finish"""
+	with Engine(tmp_path, random_seed=69105, workers=2) as eng:
+
+		@eng.function
+		def double(n):
+			return n * 2
+
+		futs = [[] for _ in range(8)]
+
+		def submit_some(mine):
+			for i in range(100):
+				mine.append(eng.submit(eng.function.double, i))
+
+		threads = [
+			threading.Thread(target=submit_some, args=(mine,)) for mine in futs
+		]
+		for thread in threads:
+			thread.start()
+		for thread in threads:
+			thread.join()
+		uids = {fut.uid for mine in futs for fut in mine}
+		assert len(uids) == 800
+		for mine in futs:
+			assert [fut.result(timeout=60) for fut in mine] == [
+				i * 2 for i in range(100)
+			]
+
+
+def test_worker_affinity(tmp_path):
+	"""Test that each character's entities go to the same worker
+
+	Except when that would make one worker much busier than the rest.
+
+	"""
+	with Engine(
+		tmp_path, random_seed=69105, workers=2, worker_affinity="character"
+	) as eng:
+		for charn, n in [(0, 10), (1, 2)]:
+			char = eng.new_character(charn)
+			for i in range(n):
+				char.new_place(i, go=i % 2 == 0)
+
+			@char.place.rule
+			def ran(plac):
+				plac["ran"] = True
+
+			@ran.trigger
+			def going(plac):
+				return plac["go"]
+
+		batch = [
+			(None, place)
+			for charn in (0, 1)
+			for place in eng.character[charn].place.values()
+		]
+		first, second = eng._route_to_workers(batch)
+		assert sorted(first + second) == list(range(12))
+		assert len(first) == 9
+		assert all(batch[j][1].character.name == 0 for j in first)
+		assert {batch[j][1].character.name for j in second} == {0, 1}
+		eng.next_turn()
+		for charn in (0, 1):
+			for plac in eng.character[charn].place.values():
+				assert ("ran" in plac) == plac["go"]
+
+
+def test_random_for(engy):
+	"""Test that random_for gives the same numbers in triggers and actions
+
+	Even when the triggers are evaluated in worker processes.
+
+	"""
+	char = engy.new_character("char")
+	for i in range(8):
+		char.new_place(i)
+
+	@char.place.rule
+	def rolled(plac):
+		plac["roll"] = plac.engine.random_for(plac, "rolled").random()
+
+	@rolled.trigger
+	def lucky(plac):
+		return plac.engine.random_for(plac, "rolled").random() < 0.5
+
+	engy.next_turn()
+	rolls = set()
+	for i in range(8):
+		expected = engy.random_for(char.place[i], "rolled").random()
+		rolls.add(expected)
+		if expected < 0.5:
+			assert char.place[i]["roll"] == expected
+		else:
+			assert "roll" not in char.place[i]
+	assert len(rolls) == 8
@@ -12,6 +12,8 @@
 #
 # You should have received a copy of the GNU Affero General Public License
 # along with this program.  If not, see <https://www.gnu.org/licenses/>.
+from concurrent.futures import ThreadPoolExecutor
+from multiprocessing import Process
 from unittest.mock import patch, MagicMock
 
 import networkx as nx
@@ -19,10 +21,13 @@ import networkx as nx
 from LiSE.engine import Engine
 from LiSE.proxy import EngineProcessManager
 from LiSE.handle import EngineHandle
+from LiSE.codec import Codec
+from LiSE.ringbuffer import RingBuffer
 import LiSE.allegedb.tests.test_all
 from LiSE.tests import data
 import pytest
 import LiSE.examples.kobold as kobold
+import asyncio
 import shutil
 import tempfile
 import msgpack
@@ -312,3 +317,175 @@ def test_apply_delta(tmp_path, slow):
 		assert "omg" not in phys.portal[0][1]
 	finally:
 		mang.shutdown()
+
+
+def test_batch(tmp_path):
+	with Engine(tmp_path, workers=0) as eng:
+		char = eng.new_character("char")
+		for i in range(20):
+			char.new_place(i)
+	mang = EngineProcessManager()
+	try:
+		prox = mang.start(tmp_path, workers=0)
+		sent = []
+		send_bytes = prox.send_bytes
+
+		def send_and_count(obj, *args, **kwargs):
+			sent.append(obj)
+			return send_bytes(obj, *args, **kwargs)
+
+		prox.send_bytes = send_and_count
+		char = prox.character["char"]
+		with prox.batch():
+			for i in range(20):
+				char.place[i]["n"] = i
+			fut = prox.handle("get_btt")
+			assert not fut.done()
+		assert len(sent) == 1
+		assert fut.result() == prox._btt()
+		for i in range(20):
+			assert char.place[i]["n"] == i
+		with pytest.raises(AttributeError), prox.batch():
+			char.place[0]["n"] = 100
+			fut = prox.handle("no_such_command")
+			char.place[1]["n"] = 100
+		assert fut.exception()
+		sent.clear()
+		with pytest.raises(ZeroDivisionError), prox.batch():
+			char.place[2]["n"] = 100
+			fut = prox.handle("get_btt")
+			1 / 0
+		assert not sent
+		assert fut.cancelled()
+	finally:
+		mang.shutdown()
+	with Engine(tmp_path, workers=0) as eng:
+		char = eng.character["char"]
+		assert char.place[0]["n"] == 100
+		assert char.place[1]["n"] == 1
+		for i in range(2, 20):
+			assert char.place[i]["n"] == i
+
+
+def echo_forever(ring_in, ring_out):
+	msg = ring_in.recv_bytes()
+	while msg != b"shutdown":
+		ring_out.send_bytes(msg)
+		msg = ring_in.recv_bytes()
+	ring_in.close()
+	ring_out.close()
+
+
+def test_ring_buffer():
+	there, back = RingBuffer(1024), RingBuffer(1024)
+	proc = Process(target=echo_forever, args=(there, back))
+	proc.start()
+	try:
+		for msg in [b"", b"hi", bytes(range(256)) * 20, b"x" * 1024]:
+			there.send_bytes(msg)
+			assert back.recv_bytes() == msg
+		there.send_bytes(b"shutdown")
+		proc.join()
+	finally:
+		for ring in (there, back):
+			ring.close()
+			ring.unlink()
+
+
+def test_ring_transport(tmp_path):
+	with Engine(tmp_path, workers=0) as eng:
+		eng.new_character("char").new_place("here")
+	with EngineProcessManager(tmp_path, workers=0, transport="ring") as prox:
+		assert prox.codec.level is None
+		place = prox.character["char"].place["here"]
+		place["big"] = list(range(100_000))
+		assert prox.character["char"].place["here"]["big"][-1] == 99_999
+		prox.next_turn()
+
+
+def test_codec():
+	codec = Codec(threshold=16)
+	small = b"tiny"
+	big = b"abcd" * 1000
+	assert codec.compress(small) == b"\x00" + small
+	squashed = codec.compress(big)
+	assert len(squashed) < len(big)
+	for msg in (small, big, b""):
+		assert codec.decompress(codec.compress(msg)) == msg
+	stats = codec.stats["compress"]
+	assert stats["calls"] == 5
+	assert stats["before"] == 2 * len(small) + 2 * len(big)
+	assert codec.stats["decompress"]["after"] == len(small) + len(big)
+	nothing = Codec.get("none")
+	assert nothing.compress(big) is big
+	assert nothing.stats["compress"]["calls"] == 0
+	with pytest.raises(ValueError):
+		Codec.get("lzma")
+
+
+def test_codec_threads():
+	codec = Codec(threshold=16)
+	msg = b"abcd" * 10
+
+	def squash(_):
+		for _ in range(2000):
+			codec.compress(msg)
+
+	with ThreadPoolExecutor(8) as pool:
+		list(pool.map(squash, range(8)))
+	assert codec.stats["compress"]["calls"] == 16000
+	assert codec.stats["compress"]["before"] == 16000 * len(msg)
+
+
+def test_codec_stats(tmp_path):
+	with Engine(tmp_path, workers=0) as eng:
+		eng.new_character("char").new_place("here")
+	with EngineProcessManager(tmp_path, workers=0, codec=Codec(0)) as prox:
+		prox.character["char"].place["here"]["big"] = list(range(10_000))
+		stats = prox.codec_stats()
+		assert stats["proxy"]["compress"]["calls"] > 0
+		assert (
+			stats["core"]["decompress"]["before"]
+			== stats["proxy"]["compress"]["after"]
+		)
+		assert "workers" not in stats
+
+
+def test_async_proxy(tmp_path):
+	for name in ("a", "b"):
+		with Engine(tmp_path / name, workers=0) as eng:
+			eng.new_character("physical").new_place("here")["hp"] = 1
+
+	async def play(prefix):
+		async with EngineProcessManager(prefix, workers=0) as aeng:
+			branch = aeng.branch
+			here = aeng.character["physical"].place["here"]
+			await aeng.set_stat(here, "hp", 2)
+			assert here["hp"] == 2
+			await aeng.next_turn()
+			assert aeng.turn == 1
+			async with aeng.batch():
+				here["hp"] = 3
+				here["mp"] = 4
+			await aeng.time_travel(branch, 0)
+			assert here["hp"] == 2
+			assert "mp" not in here
+			await aeng.time_travel(branch, 1)
+			assert here["hp"] == 3
+			assert here["mp"] == 4
+			await aeng.del_stat(here, "mp")
+			assert await aeng.handle(
+				"node_exists", char="physical", node="here"
+			)
+			await aeng.advance_turns(2)
+			assert aeng.turn == 3
+			assert here["hp"] == 3
+			assert "mp" not in here
+
+	async def main():
+		await asyncio.gather(play(tmp_path / "a"), play(tmp_path / "b"))
+
+	asyncio.run(main())
+	with Engine(tmp_path / "a", workers=0) as eng:
+		assert eng.turn == 3
+		assert eng.character["physical"].place["here"]["hp"] == 3
@@ -17,6 +17,9 @@
 import networkx as nx
 import pytest
 
+from LiSE import Engine
+from LiSE.rule import EntityBatch
+
 
 def something_dot_rule_test(something, engy):
 	"""Utility function to test some rule-follower"""
@@ -173,3 +176,155 @@ def test_rule_priority(engy):
 	engy.next_turn()
 
 	assert engy.universal["list"] == ["first", "second", "second", "first"]
+
+
+def test_batch_rule(engy):
+	"""Test that a batch rule gets all its entities at once"""
+	char = engy.new_character("flock")
+	for i in range(10):
+		char.new_place(i, hunger=i)
+
+	@char.place.rule(batch=True)
+	def eat(places):
+		return {"hunger": places.array("hunger") - 5}
+
+	@eat.trigger
+	def hungry(places):
+		return places.array("hunger") >= 5
+
+	@eat.prereq
+	def not_three(places):
+		return [place.name != 7 for place in places]
+
+	assert eat.batch
+	engy.next_turn()
+	for i in range(10):
+		if i == 7:
+			assert char.place[i]["hunger"] == 7
+		elif i >= 5:
+			assert char.place[i]["hunger"] == i - 5
+		else:
+			assert char.place[i]["hunger"] == i
+
+
+def test_batch_update_setitem(serial_engine):
+	"""Test that batch updates refuse what setting one stat would"""
+	char = serial_engine.new_character("char")
+	char.add_portal(0, 1)
+	char.add_portal(1, 0)
+	batch = EntityBatch(serial_engine, list(char.portals()))
+	batch.update({"weight": [1, 2]})
+	assert batch.column("weight") == [1, 2]
+	with pytest.raises(KeyError):
+		batch.update({"origin": [1, 0]})
+
+
+def test_batch_rule_persists(tmp_path):
+	with Engine(tmp_path, workers=0) as eng:
+
+		@eng.rule(batch=True)
+		def batchy(entities):
+			pass
+
+		@eng.rule
+		def not_batchy(entity):
+			pass
+
+	with Engine(tmp_path, workers=0) as eng:
+		assert eng.rule["batchy"].batch
+		assert not eng.rule["not_batchy"].batch
+
+
+def test_rule_profile(engy):
+	"""Test that rules get profiled, whether or not there are workers"""
+	eng = engy
+	eng.profile_rules = True
+	char = eng.new_character("char")
+	for i in range(4):
+		char.new_place(i)
+
+	@char.place.rule
+	def ran(place):
+		place["ran"] = True
+
+	@ran.trigger
+	def even(place):
+		return place.name % 2 == 0
+
+	@ran.prereq
+	def not_zero(place):
+		return place.name != 0
+
+	eng.next_turn()
+	(rulebook,) = eng.rule_profile()
+	prof = eng.rule_profile()[rulebook]["ran"]
+	assert prof["triggers"]["even"]["calls"] == 4
+	assert prof["triggers"]["even"]["true"] == 2
+	assert prof["prereqs"]["not_zero"]["calls"] == 2
+	assert prof["prereqs"]["not_zero"]["true"] == 1
+	assert prof["actions"]["ran"]["calls"] == 1
+	assert "true" not in prof["actions"]["ran"]
+	assert prof["actions"]["ran"]["seconds"] >= 0
+	eng.reset_rule_profile()
+	assert eng.rule_profile() == {}
+
+
+def test_rule_profile_parallel_actions(tmp_path):
+	"""Test that actions run in the worker processes get profiled"""
+	with Engine(
+		tmp_path, workers=2, parallel_actions=True, profile_rules=True
+	) as eng:
+		char = eng.new_character("char")
+		for i in range(4):
+			char.new_place(i)
+
+		@char.place.rule
+		def ran(place):
+			place["ran"] = True
+
+		@ran.trigger
+		def even(place):
+			return place.name % 2 == 0
+
+		eng.next_turn()
+		assert char.place[2]["ran"]
+		(rulebook,) = eng.rule_profile()
+		prof = eng.rule_profile()[rulebook]["ran"]
+		assert prof["triggers"]["even"]["calls"] == 4
+		assert prof["triggers"]["even"]["true"] == 2
+		assert prof["actions"]["ran"]["calls"] == 2
+
+
+def test_rule_changes_between_turns(engy):
+	"""Test that changes to rules take effect on the next turn"""
+	char = engy.new_character("char")
+	place = char.new_place("here", count=0)
+
+	@char.place.rule
+	def count(place):
+		place["count"] += 1
+
+	@count.trigger
+	def never(place):
+		return False
+
+	engy.next_turn()
+	assert place["count"] == 0
+
+	@count.trigger
+	def always(place):
+		return True
+
+	engy.next_turn()
+	assert place["count"] == 1
+
+	@count.action
+	def count_again(place):
+		place["count"] += 10
+
+	engy.next_turn()
+	assert place["count"] == 12
+
+	count.actions.remove("count")
+	engy.next_turn()
+	assert place["count"] == 22
@@ -38,6 +38,9 @@ def test_unit_rule_poll(engy):
 	assert unit["run"]
 	assert "run" not in notunit1
 	assert "run" not in notunit2
+	assert not list(
+		engy._unit_rules_handled_cache.iter_unhandled_rules(*engy._btt())
+	)
 
 
 def test_character_thing_rule_poll(engy):
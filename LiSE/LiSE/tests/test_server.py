@@ -0,0 +1,122 @@
+# This file is part of LiSE, a framework for life simulation games.
+# Copyright (c) Zachary Spector, public@zacharyspector.com
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, version 3.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+import asyncio
+
+import pytest
+
+from LiSE.engine import Engine
+from LiSE.server import LiSEStreamServer, LiSEStreamClient
+
+
+def test_stream_server(tmp_path):
+	with Engine(tmp_path, workers=0) as eng:
+		eng.new_character("physical").new_place("here")["hp"] = 1
+
+	async def main():
+		async with LiSEStreamServer(tmp_path, workers=0) as server:
+			listener = await server.serve(port=0)
+			port = listener.sockets[0].getsockname()[1]
+			viewers = [
+				await LiSEStreamClient.connect(port=port) for _ in range(3)
+			]
+			for viewer in viewers:
+				kf = await viewer.subscribe()
+				assert kf["node_val"]["physical"]["here"]["hp"] == 1
+			player = await LiSEStreamClient.connect(port=port)
+			await player.handle(
+				"set_node_stat", char="physical", node="here", k="hp", v=2
+			)
+			await player.handle("next_turn")
+			assert player.turn == 1
+			for viewer in viewers:
+				deltas = viewer.deltas()
+				branch, turn, tick, delta = await deltas.__anext__()
+				assert turn == 0
+				assert delta["physical"]["node_val"]["here"]["hp"] == 2
+				branch, turn, tick, delta = await deltas.__anext__()
+				assert turn == 1
+				assert await viewer.handle("get_btt") == (branch, turn, tick)
+			await viewers[0].unsubscribe()
+			kf = await viewers[0].handle("snapshot")
+			assert kf["node_val"]["physical"]["here"]["hp"] == 2
+			with pytest.raises(Exception):
+				await player.handle("no_such_command")
+			for client in viewers + [player]:
+				await client.close()
+
+	asyncio.run(main())
+
+
+def test_stream_server_reads(tmp_path):
+	with Engine(tmp_path, workers=0) as eng:
+		phys = eng.new_character("physical", kind="solid")
+		phys.new_place("here")["hp"] = 1
+		phys.new_place("there")
+		phys.add_portal("here", "there", distance=2)
+		eng.universal["weather"] = "rain"
+
+	async def main():
+		async with LiSEStreamServer(tmp_path, workers=0) as server:
+			listener = await server.serve(port=0)
+			port = listener.sockets[0].getsockname()[1]
+			client = await LiSEStreamClient.connect(port=port)
+			real_snap_keyframe = server._handle.snap_keyframe
+
+			def broken_snap_keyframe(silent=False):
+				raise ValueError("no keyframe for you")
+
+			server._handle.snap_keyframe = broken_snap_keyframe
+			with pytest.raises(Exception):
+				await client.handle("snapshot")
+			with pytest.raises(Exception):
+				await client.handle(
+					"node_stat_copy", char="physical", node="here"
+				)
+			server._handle.snap_keyframe = real_snap_keyframe
+			assert await client.handle(
+				"node_exists", char="physical", node="here"
+			)
+			assert not await client.handle(
+				"node_exists", char="physical", node="nowhere"
+			)
+			assert await client.handle(
+				"node_stat_copy", char="physical", node="here"
+			) == {"hp": 1}
+			assert await client.handle(
+				"portal_stat_copy",
+				char="physical",
+				orig="here",
+				dest="there",
+			) == {"distance": 2}
+			with pytest.raises(Exception):
+				await client.handle(
+					"portal_stat_copy",
+					char="physical",
+					orig="there",
+					dest="here",
+				)
+			stats = await client.handle("character_stat_copy", char="physical")
+			assert stats["kind"] == "solid"
+			universal = await client.handle("universal_copy")
+			assert universal["weather"] == "rain"
+			await client.handle(
+				"set_node_stat", char="physical", node="here", k="hp", v=2
+			)
+			assert await client.handle(
+				"node_stat_copy", char="physical", node="here"
+			) == {"hp": 2}
+			await client.close()
+
+	asyncio.run(main())
@@ -33,6 +33,7 @@ from operator import (
 	mod,
 )
 from functools import partial, wraps, cached_property
+from random import Random
 from contextlib import contextmanager
 from textwrap import dedent
 from time import monotonic
@@ -725,6 +726,42 @@ class AbstractEngine(ABC):
 			return True
 		return pct > self.randint(0, 99)
 
+	def random_for(self, entity, rule=None) -> Random:
+		"""Get a randomizer just for this entity, on this turn
+
+		Its numbers depend only on the random seed, the branch and turn,
+		the entity, and the ``rule``, if you give one (by name or
+		otherwise). They don't depend on what other random numbers
+		have been drawn, or in what order. So rules using it can run in
+		any order, or in parallel in worker processes, and still do
+		the same thing when replayed.
+
+		Every call starts the same stream over, so hang on to
+		the randomizer if you need more than one number.
+
+		"""
+		if hasattr(entity, "origin"):
+			key = (
+				entity.character.name,
+				entity.origin.name,
+				entity.destination.name,
+			)
+		elif hasattr(entity, "character"):
+			key = (entity.character.name, entity.name)
+		else:
+			key = (entity.name,)
+		return Random(
+			self.pack(
+				(
+					self.eternal.get("random_seed"),
+					self.branch,
+					self.turn,
+					key,
+					getattr(rule, "name", rule),
+				)
+			)
+		)
+
 	betavariate = get_rando("_rando.betavariate")
 	choice = get_rando("_rando.choice")
 	expovariate = get_rando("_rando.expovariate")
@@ -27,6 +27,7 @@ from collections.abc import MutableMapping
 from copy import deepcopy
 from types import MethodType
 from inspect import getsource
+from threading import RLock
 from ast import parse, Expr, Module
 import json
 import importlib.util
@@ -163,6 +164,10 @@ class FunctionStore(Signal):
 	The keyword arguments will be ``attr``, the name of the function, and ``val``,
 	the function itself.
 
+	Unsaved changes get saved the first time something asks for a function
+	that isn't in the module yet, or when :meth:`save_if_changed` is called.
+	Several threads may do that at once.
+
 	"""
 
 	def __init__(self, filename):
@@ -171,6 +176,7 @@ class FunctionStore(Signal):
 				"FunctionStore can only work with pure Python source code"
 			)
 		super().__init__()
+		self._lock = RLock()
 		self._filename = os.path.abspath(os.path.realpath(filename))
 		try:
 			self.reimport()
@@ -187,7 +193,7 @@ class FunctionStore(Signal):
 		elif self._module:
 			return getattr(self._module, k)
 		elif self._need_save:
-			self.save()
+			self.save_if_changed()
 			return getattr(self._module, k)
 		else:
 			raise AttributeError("No attribute " + repr(k))
@@ -225,12 +231,19 @@ class FunctionStore(Signal):
 		self.send(self, attr=k, val=None)
 
 	def save(self, reimport=True):
-		with open(self._filename, "w", encoding="utf-8") as outf:
-			outf.write("# encoding: utf-8")
-			Unparser(self._ast, outf)
-		self._need_save = False
-		if reimport:
-			self.reimport()
+		with self._lock:
+			with open(self._filename, "w", encoding="utf-8") as outf:
+				outf.write("# encoding: utf-8")
+				Unparser(self._ast, outf)
+			self._need_save = False
+			if reimport:
+				self.reimport()
+
+	def save_if_changed(self) -> None:
+		"""Save, and reimport, if there's anything new since last time"""
+		with self._lock:
+			if self._need_save:
+				self.save()
 
 	def reimport(self):
 		importlib.invalidate_caches()
@@ -240,10 +253,13 @@ class FunctionStore(Signal):
 			del sys.modules[modname]
 		modname = filename[:-3]
 		spec = importlib.util.spec_from_file_location(modname, self._filename)
-		self._module = importlib.util.module_from_spec(spec)
-		sys.modules[modname] = self._module
-		spec.loader.exec_module(self._module)
-		self._ast = parse(self._module.__loader__.get_data(self._filename))
+		module = importlib.util.module_from_spec(spec)
+		sys.modules[modname] = module
+		spec.loader.exec_module(module)
+		# Only now that it's all there, so other threads don't see
+		# a module that's half loaded
+		self._module = module
+		self._ast = parse(module.__loader__.get_data(self._filename))
 		self._ast_idx = {}
 		for i, node in enumerate(self._ast.body):
 			self._ast_idx[node.name] = i